@@ -1,21 +1,39 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 import os
 import sys
 import threading
-import cv2
-import datetime
+import time
 
 # Add the parent directory to the path to import database and utils
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from attendance_system.config import load_config
 from attendance_system.database.db_manager import DatabaseManager
-from attendance_system.utils.face_utils_simple import FaceDetector
+from attendance_system.database.attendance_writer import AttendanceWriter
+from attendance_system.utils.face_tracker import FaceTracker
+from attendance_system.utils import metrics
+from attendance_system.utils.report_export import EXPORT_BATCH_SIZE, export_report
+from attendance_system.utils.bulk_enrollment import enroll_students, write_report
 from attendance_system.utils.ui_utils import (
     center_window, create_styled_button, create_styled_label, create_styled_entry,
     create_form_field, show_message, create_video_frame, VideoCapture, 
-    convert_cv_to_tkinter, get_current_datetime
+    convert_cv_to_pil, LabelFeed, get_current_datetime
 )
+from attendance_system.utils.ui_executor import UiExecutor
+
+# Face samples collected by a burst capture during enrollment
+BURST_SAMPLES = 10
+
+# Size of the attendance camera feed
+DISPLAY_WIDTH = 400
+DISPLAY_HEIGHT = 300
+
+# Filter choice matching every value
+ALL_FILTER = "All"
+
+# Students listed on the dashboard, lowest attendance first
+DASHBOARD_STUDENTS = 100
 
 class AttendanceSystem:
     def __init__(self, root):
@@ -24,17 +42,78 @@ class AttendanceSystem:
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
         center_window(self.root, 800, 600)
         
-        # Initialize database and face detector
+        # Initialize settings and database; the vision stack (OpenCV, numpy,
+        # the recognition engine and its model) is loaded after login
+        self.config = load_config()
+        self.metrics_reporter = self.start_metrics()
         self.db = DatabaseManager()
-        self.face_detector = FaceDetector()
+        self.recognition_engine = None
+        self.engine_lock = threading.Lock()
+        self.warm_up_thread = None
+        
+        # Database work runs off the Tk thread; results come back through the executor
+        self.ui_tasks = UiExecutor(self.root, on_busy=self.set_busy)
+        self.busy_bar = None
         
         # Current user data
         self.current_user = None
         self.current_user_role = None
         
+        self.camera_manager = None
+        self.attendance_writer = None
+        self.recognition_pool = None
+        self.face_trackers = {}
+        self.detection_schedulers = {}
+        self.detection_scales = {}
+        self.camera_rois = {}
+        self.camera_feeds = {}
+        
+        # Face captured for the student being enrolled
+        self.face_encoding = None
+        self.face_samples = []
+        
         # Show login screen
         self.show_login_screen()
     
+    def start_metrics(self):
+        """Turn on instrumentation if configured; returns the running reporter or None"""
+        if not self.config["metrics"]:
+            return None
+        
+        metrics.registry.enabled = True
+        reporter = metrics.MetricsReporter(
+            self.config["metrics_json_log"], self.config["metrics_prometheus_file"],
+            self.config["metrics_interval"]
+        )
+        reporter.start()
+        return reporter
+    
+    def get_recognition_engine(self):
+        """The configured recognition engine, loaded on first use"""
+        with self.engine_lock:
+            if self.recognition_engine is None:
+                from attendance_system.utils.recognition_engine import create_engine_from_config
+                self.recognition_engine = create_engine_from_config(self.config)
+            return self.recognition_engine
+    
+    def start_warm_up(self):
+        """Load the vision stack in the background while the user looks at the main screen"""
+        if self.warm_up_thread is not None:
+            return
+        
+        def warm_up():
+            try:
+                # Imported for their side effect: the first camera action finds them loaded
+                import cv2
+                from PIL import ImageTk
+                from attendance_system.utils import frame_context, motion_gate, recognition_pool
+                self.get_recognition_engine()
+            except Exception as e:
+                print(f"Error warming up the recognition engine: {e}")
+        
+        self.warm_up_thread = threading.Thread(target=warm_up, daemon=True)
+        self.warm_up_thread.start()
+    
     def show_login_screen(self):
         """Show the login screen"""
         # Clear current frame if any
@@ -82,6 +161,7 @@ class AttendanceSystem:
             self.current_user = user_id
             self.current_user_role = role
             self.show_main_screen()
+            self.start_warm_up()
         else:
             show_message("Login Error", "Invalid username or password", "error")
     
@@ -101,6 +181,7 @@ class AttendanceSystem:
             self.create_student_management_tab(notebook)
             self.create_take_attendance_tab(notebook)
             self.create_attendance_reports_tab(notebook)
+            self.create_dashboard_tab(notebook)
         else:
             # Student tabs
             self.create_take_attendance_tab(notebook)
@@ -112,6 +193,21 @@ class AttendanceSystem:
         
         logout_button = create_styled_button(bottom_frame, "Logout", self.logout)
         logout_button.pack(side=tk.RIGHT, padx=5)
+        
+        # Shown while background work is running
+        self.busy_bar = ttk.Progressbar(bottom_frame, mode="indeterminate", length=120)
+        self.set_busy(self.ui_tasks.pending > 0)
+    
+    def set_busy(self, busy):
+        """Show or hide the busy indicator"""
+        if self.busy_bar is None or not self.busy_bar.winfo_exists():
+            return
+        if busy:
+            self.busy_bar.pack(side=tk.LEFT, padx=5)
+            self.busy_bar.start(15)
+        else:
+            self.busy_bar.stop()
+            self.busy_bar.pack_forget()
     
     def create_student_management_tab(self, notebook):
         """Create the student management tab (admin only)"""
@@ -176,6 +272,16 @@ class AttendanceSystem:
         
         clear_button = create_styled_button(button_frame, "Clear Form", self.clear_student_form)
         clear_button.pack(side=tk.LEFT, padx=5)
+        
+        # Bulk enrollment from a CSV manifest and a folder of photos
+        bulk_frame = ttk.LabelFrame(right_frame, text="Bulk Enrollment")
+        bulk_frame.pack(fill=tk.X, padx=5, pady=5)
+        
+        import_button = create_styled_button(bulk_frame, "Import Students...", self.bulk_import_students)
+        import_button.pack(side=tk.LEFT, padx=5, pady=10)
+        
+        self.bulk_status_label = create_styled_label(bulk_frame, "")
+        self.bulk_status_label.pack(side=tk.LEFT, padx=5)
     
     def create_take_attendance_tab(self, notebook):
         """Create the take attendance tab"""
@@ -189,12 +295,17 @@ class AttendanceSystem:
         right_frame = ttk.Frame(tab, padding=5)
         right_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
         
-        # Video display (left side)
+        # Video display (left side): one feed per camera, two per row
         video_frame = ttk.LabelFrame(left_frame, text="Camera Feed")
         video_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
-        self.camera_frame, self.camera_label = create_video_frame(video_frame, 400, 300)
-        self.camera_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        cameras = self.config["cameras"]
+        columns = 1 if len(cameras) == 1 else 2
+        self.display_size = (DISPLAY_WIDTH // columns, DISPLAY_HEIGHT // columns)
+        self.camera_labels = {}
+        for camera_id in range(len(cameras)):
+            camera_frame, self.camera_labels[camera_id] = create_video_frame(video_frame, *self.display_size)
+            camera_frame.grid(row=camera_id // columns, column=camera_id % columns, padx=2, pady=2)
         
         # Control buttons
         control_frame = ttk.Frame(left_frame)
@@ -207,6 +318,14 @@ class AttendanceSystem:
         self.stop_camera_button.pack(side=tk.LEFT, padx=5)
         self.stop_camera_button.configure(state=tk.DISABLED)
         
+        # Pipeline timings while the camera runs
+        self.pipeline_stats_label = create_styled_label(left_frame, "", 8)
+        self.pipeline_stats_label.pack(fill=tk.X, padx=5)
+        
+        # Per-stage latencies when metrics are enabled
+        self.metrics_label = create_styled_label(left_frame, "", 8)
+        self.metrics_label.pack(fill=tk.X, padx=5)
+        
         # Recent detections (right side)
         detection_frame = ttk.LabelFrame(right_frame, text="Recent Detections")
         detection_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -227,10 +346,10 @@ class AttendanceSystem:
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.detection_tree.configure(yscrollcommand=scrollbar.set)
         
-        # Initialize video capture
-        self.video_capture = None
+        # Initialize the cameras
+        self.camera_manager = None
         self.detection_lock = threading.Lock()
-        self.last_detection_time = {}  # To prevent multiple detections in a short time
+        self.marked_students = {}  # student_id -> date marked, shared by all cameras
         
     def create_attendance_reports_tab(self, notebook):
         """Create the attendance reports tab (admin only)"""
@@ -262,6 +381,33 @@ class AttendanceSystem:
         generate_button = create_styled_button(date_frame, "Generate Report", self.generate_attendance_report)
         generate_button.grid(row=0, column=4, padx=20, pady=5)
         
+        # Filters, applied by the database query
+        filter_frame = ttk.Frame(control_frame)
+        filter_frame.pack(fill=tk.X, padx=5, pady=5)
+        
+        department_label = create_styled_label(filter_frame, "Department:")
+        department_label.grid(row=0, column=0, padx=5, pady=5)
+        
+        self.department_combo = ttk.Combobox(filter_frame, state="readonly", width=18)
+        self.department_combo.grid(row=0, column=1, padx=5, pady=5)
+        self.department_combo['values'] = [ALL_FILTER]
+        self.department_combo.set(ALL_FILTER)
+        self.ui_tasks.submit("departments", self.db.get_departments, on_done=self.show_departments)
+        
+        status_label = create_styled_label(filter_frame, "Status:")
+        status_label.grid(row=0, column=2, padx=5, pady=5)
+        
+        self.status_combo = ttk.Combobox(filter_frame, state="readonly", width=10,
+                                         values=(ALL_FILTER, "present", "absent"))
+        self.status_combo.grid(row=0, column=3, padx=5, pady=5)
+        self.status_combo.set(ALL_FILTER)
+        
+        export_button = create_styled_button(filter_frame, "Export...", self.export_attendance_report)
+        export_button.grid(row=0, column=4, padx=20, pady=5)
+        
+        self.report_status_label = create_styled_label(control_frame, "")
+        self.report_status_label.pack(anchor="w", padx=5)
+        
         # Report display
         report_frame = ttk.LabelFrame(tab, text="Attendance Report")
         report_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -277,10 +423,120 @@ class AttendanceSystem:
         
         self.report_tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
-        # Scrollbar
-        scrollbar = ttk.Scrollbar(report_frame, orient="vertical", command=self.report_tree.yview)
+        # Scrollbar; scrolling near the end loads the next page of the report
+        self.report_scrollbar = ttk.Scrollbar(report_frame, orient="vertical", command=self.report_tree.yview)
+        self.report_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.report_tree.configure(yscrollcommand=self.on_report_scroll)
+        
+        self.report_filters = None
+        self.report_next_key = None
+        self.report_rows = 0
+        self.report_loading = False
+    
+    def create_dashboard_tab(self, notebook):
+        """Create the attendance dashboard tab (admin only), read from the rollup tables"""
+        tab = ttk.Frame(notebook, padding=10)
+        notebook.add(tab, text="Dashboard")
+        
+        # Date range, from the start of the month by default
+        control_frame = ttk.Frame(tab)
+        control_frame.pack(fill=tk.X, padx=5, pady=5)
+        
+        today = get_current_datetime()[0]
+        
+        from_label = create_styled_label(control_frame, "From Date:")
+        from_label.grid(row=0, column=0, padx=5, pady=5)
+        
+        self.dashboard_from_entry = create_styled_entry(control_frame)
+        self.dashboard_from_entry.grid(row=0, column=1, padx=5, pady=5)
+        self.dashboard_from_entry.insert(0, today[:8] + "01")
+        
+        to_label = create_styled_label(control_frame, "To Date:")
+        to_label.grid(row=0, column=2, padx=5, pady=5)
+        
+        self.dashboard_to_entry = create_styled_entry(control_frame)
+        self.dashboard_to_entry.grid(row=0, column=3, padx=5, pady=5)
+        self.dashboard_to_entry.insert(0, today)
+        
+        refresh_button = create_styled_button(control_frame, "Refresh", self.refresh_dashboard)
+        refresh_button.grid(row=0, column=4, padx=20, pady=5)
+        
+        self.dashboard_summary_label = create_styled_label(tab, "")
+        self.dashboard_summary_label.pack(anchor="w", padx=5)
+        
+        # Departments and days side by side, students below
+        top_frame = ttk.Frame(tab)
+        top_frame.pack(fill=tk.BOTH, expand=True)
+        
+        self.department_summary_tree = self.create_summary_tree(
+            top_frame, "Departments", ("Department", "Students", "Present", "Absent", "Attendance %"), tk.LEFT
+        )
+        self.daily_summary_tree = self.create_summary_tree(
+            top_frame, "Days", ("Date", "Present", "Absent"), tk.RIGHT
+        )
+        self.student_summary_tree = self.create_summary_tree(
+            tab, f"Lowest Attendance (top {DASHBOARD_STUDENTS}, whole months)",
+            ("Name", "Roll Number", "Department", "Present", "Absent", "Attendance %"), tk.TOP
+        )
+        
+        self.refresh_dashboard()
+    
+    def create_summary_tree(self, parent, title, columns, side):
+        """Create a titled Treeview with a scrollbar for the dashboard"""
+        frame = ttk.LabelFrame(parent, text=title)
+        frame.pack(side=side, fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+        tree = ttk.Treeview(frame, columns=columns, show="headings", height=6)
+        for col in columns:
+            tree.heading(col, text=col)
+            tree.column(col, width=80)
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        scrollbar = ttk.Scrollbar(frame, orient="vertical", command=tree.yview)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.report_tree.configure(yscrollcommand=scrollbar.set)
+        tree.configure(yscrollcommand=scrollbar.set)
+        return tree
+    
+    def refresh_dashboard(self):
+        """Reload the dashboard totals for the selected date range"""
+        from_date = self.dashboard_from_entry.get().strip()
+        to_date = self.dashboard_to_entry.get().strip()
+        
+        if not from_date or not to_date:
+            show_message("Error", "Please enter date range", "error")
+            return
+        
+        self.ui_tasks.submit("dashboard", self.load_dashboard, from_date, to_date,
+                             on_done=self.show_dashboard)
+    
+    def load_dashboard(self, from_date, to_date):
+        """Read the dashboard totals from the rollup tables (worker thread)"""
+        return (
+            self.db.get_department_attendance_summary(from_date, to_date),
+            self.db.get_daily_attendance_summary(from_date, to_date),
+            self.db.get_student_attendance_summary(from_date, to_date, limit=DASHBOARD_STUDENTS),
+        )
+    
+    def show_dashboard(self, summary):
+        """Fill the dashboard with totals read by load_dashboard"""
+        departments, days, students = summary
+        for tree in (self.department_summary_tree, self.daily_summary_tree, self.student_summary_tree):
+            tree.delete(*tree.get_children())
+        
+        for row in departments:
+            self.department_summary_tree.insert("", "end", values=row)
+        for row in days:
+            self.daily_summary_tree.insert("", "end", values=row)
+        for _, name, roll_number, department, present, absent, percentage in students:
+            self.student_summary_tree.insert("", "end", values=(name, roll_number, department, present, absent, percentage))
+        
+        school_days = len(days)
+        enrolled = sum(row[1] for row in departments)
+        present = sum(row[2] for row in departments)
+        overall = 100.0 * present / (enrolled * school_days) if enrolled and school_days else 0.0
+        self.dashboard_summary_label.config(
+            text=f"{school_days} school days, {enrolled} students, overall attendance {overall:.1f}%"
+        )
     
     def create_my_attendance_tab(self, notebook):
         """Create the my attendance tab (student only)"""
@@ -291,80 +547,73 @@ class AttendanceSystem:
         info_frame = ttk.LabelFrame(tab, text="Student Information")
         info_frame.pack(fill=tk.X, padx=5, pady=5)
         
-        # Get student info
-        student_info = self.get_student_info(self.current_user)
+        self.student_info_label = create_styled_label(info_frame, "Loading...")
+        self.student_info_label.pack(padx=10, pady=10)
+        
+        # Attendance history
+        history_frame = ttk.LabelFrame(tab, text="Attendance History")
+        history_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+        # Create Treeview
+        columns = ("Date", "Time", "Status")
+        self.my_attendance_tree = ttk.Treeview(history_frame, columns=columns, show="headings")
+        
+        # Configure headings
+        for col in columns:
+            self.my_attendance_tree.heading(col, text=col)
+            self.my_attendance_tree.column(col, width=120)
+        
+        self.my_attendance_tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+        # Scrollbar
+        scrollbar = ttk.Scrollbar(history_frame, orient="vertical", command=self.my_attendance_tree.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.my_attendance_tree.configure(yscrollcommand=scrollbar.set)
+        
+        # Load the student's info and attendance
+        self.ui_tasks.submit("my_attendance", self.get_student_info, self.current_user,
+                             on_done=self.show_student_info)
+    
+    def get_student_info(self, user_id):
+        """Get student information from user ID"""
+        return self.db.get_student_by_user_id(user_id)
+    
+    def show_student_info(self, student_info):
+        """Show the logged in student's details and load their attendance"""
         if student_info:
-            student_id, user_id, name, roll_num, department, _ = student_info
+            student_id, user_id, name, roll_num, department = student_info
             
             # Display student info
             info_text = f"Name: {name}\nRoll Number: {roll_num}\nDepartment: {department}"
-            info_label = create_styled_label(info_frame, info_text)
-            info_label.pack(padx=10, pady=10)
-            
-            # Attendance history
-            history_frame = ttk.LabelFrame(tab, text="Attendance History")
-            history_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-            
-            # Create Treeview
-            columns = ("Date", "Time", "Status")
-            self.my_attendance_tree = ttk.Treeview(history_frame, columns=columns, show="headings")
-            
-            # Configure headings
-            for col in columns:
-                self.my_attendance_tree.heading(col, text=col)
-                self.my_attendance_tree.column(col, width=120)
-            
-            self.my_attendance_tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-            
-            # Scrollbar
-            scrollbar = ttk.Scrollbar(history_frame, orient="vertical", command=self.my_attendance_tree.yview)
-            scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-            self.my_attendance_tree.configure(yscrollcommand=scrollbar.set)
+            self.student_info_label.config(text=info_text)
             
             # Load student's attendance
             self.load_student_attendance(student_id)
         else:
-            error_label = create_styled_label(info_frame, "Student information not found")
-            error_label.pack(padx=10, pady=10)
-    
-    def get_student_info(self, user_id):
-        """Get student information from user ID"""
-        conn = sqlite3.connect(self.db.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM students WHERE user_id = ?", (user_id,))
-        result = cursor.fetchone()
-        conn.close()
-        return result
+            self.student_info_label.config(text="Student information not found")
     
     def load_student_attendance(self, student_id):
         """Load attendance history for a student"""
-        conn = sqlite3.connect(self.db.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT date, time, status FROM attendance WHERE student_id = ? ORDER BY date DESC, time DESC",
-            (student_id,)
-        )
-        results = cursor.fetchall()
-        conn.close()
-        
-        # Clear current items
-        for item in self.my_attendance_tree.get_children():
-            self.my_attendance_tree.delete(item)
+        def show_attendance(results):
+            # Clear current items
+            self.my_attendance_tree.delete(*self.my_attendance_tree.get_children())
+            
+            # Insert new items
+            self.ui_tasks.fill_tree("my_attendance", self.my_attendance_tree, results)
         
-        # Insert new items
-        for date, time, status in results:
-            self.my_attendance_tree.insert("", "end", values=(date, time, status))
+        self.ui_tasks.submit("my_attendance", self.db.get_student_attendance, student_id,
+                             on_done=show_attendance)
     
     def load_student_list(self):
         """Load student list into the treeview"""
-        # Clear current items
-        for item in self.student_tree.get_children():
-            self.student_tree.delete(item)
+        def show_students(students):
+            # Clear current items
+            self.student_tree.delete(*self.student_tree.get_children())
+            
+            # Large lists are inserted a chunk at a time, keeping the UI responsive
+            self.ui_tasks.fill_tree("students", self.student_tree, students)
         
-        # Get all students
-        students = self.db.get_all_students()
-        for student_id, name, roll_number, department in students:
-            self.student_tree.insert("", "end", values=(student_id, name, roll_number, department))
+        self.ui_tasks.submit("students", self.db.get_all_students, on_done=show_students)
     
     def clear_student_form(self):
         """Clear the student form"""
@@ -373,9 +622,14 @@ class AttendanceSystem:
         self.student_dept_entry.delete(0, tk.END)
         self.student_username_entry.delete(0, tk.END)
         self.student_password_entry.delete(0, tk.END)
+        self.face_encoding = None
+        self.face_samples = []
     
     def capture_student_face(self):
         """Open camera to capture student's face"""
+        from attendance_system.utils.frame_context import FrameContext
+        engine = self.get_recognition_engine()
+        
         # Create a new window for face capture
         capture_window = tk.Toplevel(self.root)
         capture_window.title("Capture Face")
@@ -390,56 +644,84 @@ class AttendanceSystem:
         button_frame.pack(pady=10)
         
         self.face_encoding = None
+        self.face_samples = []  # (face_image, quality) pairs for the templates table
+        burst = {"active": False, "samples": []}
+        
+        def largest_face(faces):
+            """Pick the largest detected face"""
+            largest = None
+            max_area = 0
+            for (x, y, w, h) in faces:
+                if w * h > max_area:
+                    max_area = w * h
+                    largest = (x, y, w, h)
+            return largest
+        
+        def crop_sample(current_frame, faces):
+            """Crop the largest face and score it"""
+            return engine.enroll_sample(current_frame, largest_face(faces))
+        
+        def finish_capture(samples):
+            """Keep the captured samples, the best one as the student's face"""
+            if not capture_window.winfo_exists():
+                return
+            self.face_samples = samples
+            self.face_encoding = max(samples, key=lambda sample: sample[1])[0]
+            show_message("Success", f"{len(samples)} face sample(s) captured successfully!", "info")
+            on_closing()
         
         # Capture button
         def on_capture():
-            # Get the current frame
-            current_frame = video_capture.get_frame()
+            # The frame last shown; the camera itself is read only by the capture thread
+            current_frame = last_frame
             if current_frame is not None:
                 # Detect faces
-                faces = self.face_detector.detect_faces(current_frame)
+                faces = engine.detect(current_frame)
                 
                 if len(faces) > 0:
-                    # Extract the largest face
-                    largest_face = None
-                    max_area = 0
-                    for (x, y, w, h) in faces:
-                        if w * h > max_area:
-                            max_area = w * h
-                            largest_face = (x, y, w, h)
-                    
-                    # Process face for storage
-                    face_img = current_frame[largest_face[1]:largest_face[1]+largest_face[3], 
-                                            largest_face[0]:largest_face[0]+largest_face[2]]
-                    self.face_encoding = face_img  # Store the face image
-                    
-                    show_message("Success", "Face captured successfully!", "info")
-                    capture_window.destroy()
+                    finish_capture([crop_sample(current_frame, faces)])
                 else:
                     show_message("Error", "No face detected in the image", "error")
         
+        # Burst button: collect BURST_SAMPLES frames automatically
+        def on_burst():
+            burst["samples"] = []
+            burst["active"] = True
+            burst_button.configure(state=tk.DISABLED)
+        
         capture_button = create_styled_button(button_frame, "Capture", on_capture)
         capture_button.pack(side=tk.LEFT, padx=5)
         
-        cancel_button = create_styled_button(button_frame, "Cancel", capture_window.destroy)
+        burst_button = create_styled_button(button_frame, "Burst Capture", on_burst)
+        burst_button.pack(side=tk.LEFT, padx=5)
+        
+        cancel_button = create_styled_button(button_frame, "Cancel", lambda: on_closing())
         cancel_button.pack(side=tk.LEFT, padx=5)
         
         # Initialize video capture
         video_capture = VideoCapture()
         video_capture.start()
         
-        # Function to update video frame
+        # Frames are prepared on the capture thread and shown by the Tk thread
+        feed = LabelFeed(video_label)
+        feed.start()
+        
+        # Function to update video frame (capture thread: no Tk calls here)
         last_frame = None
         def update_frame(frame):
             nonlocal last_frame
             last_frame = frame
-            faces = self.face_detector.detect_faces(frame)
-            frame = self.face_detector.draw_faces(frame.copy(), faces)
+            faces = engine.detect(FrameContext(frame))
             
-            # Convert to tkinter format
-            tk_img = convert_cv_to_tkinter(frame)
-            video_label.configure(image=tk_img)
-            video_label.image = tk_img
+            # Collect one sample per frame with a face while bursting
+            if burst["active"] and len(faces) > 0:
+                burst["samples"].append(crop_sample(frame, faces))
+                if len(burst["samples"]) >= BURST_SAMPLES:
+                    burst["active"] = False
+                    self.ui_tasks.call_soon(finish_capture, burst["samples"])
+            
+            # Samples are cropped copies; the frame itself is kept for Capture, so draw on a copy
+            feed.put(convert_cv_to_pil(engine.draw_faces(frame, faces)))
         
         # Start video capture thread
         video_capture.start_update_thread(update_frame)
@@ -447,6 +729,7 @@ class AttendanceSystem:
         # Make sure resources are released when window is closed
         def on_closing():
             video_capture.stop()
+            feed.stop()
             capture_window.destroy()
         
         capture_window.protocol("WM_DELETE_WINDOW", on_closing)
@@ -464,154 +747,465 @@ class AttendanceSystem:
             show_message("Error", "All fields are required", "error")
             return
         
+        # Accounts are created and the model updated in the background
+        self.ui_tasks.submit(None, self.add_student_record, name, roll_number, department,
+                             username, password, self.face_samples, on_done=self.on_student_saved,
+                             on_error=lambda e: show_message("Error", f"Could not save student: {e}", "error"))
+    
+    def add_student_record(self, name, roll_number, department, username, password, face_samples):
+        """Create the student's account, profile and face samples (worker thread)
+        
+        Returns (message, message_type) for the user.
+        """
         # Create student account
         user_id = self.db.add_user(username, password, "student")
         if not user_id:
-            show_message("Error", "Username already exists", "error")
-            return
+            return "Username already exists", "error"
         
         # Add student profile
-        student_id = self.db.add_student(user_id, name, roll_number, department, self.face_encoding)
+        student_id = self.db.add_student(user_id, name, roll_number, department)
         if not student_id:
-            show_message("Error", "Roll number already exists", "error")
+            return "Roll number already exists", "error"
+        
+        if face_samples:
+            # Store every captured sample (the best one becomes the student's
+            # face) and add them to the model without a full retrain
+            self.get_recognition_engine().enroll(self.db, student_id, face_samples)
+            if self.recognition_pool:
+                self.recognition_pool.reload_model()
+        
+        return f"Student {name} added successfully!", "info"
+    
+    def on_student_saved(self, result):
+        """Report the outcome of save_student and refresh the student list"""
+        message, message_type = result
+        if message_type == "error":
+            show_message("Error", message, "error")
             return
         
-        show_message("Success", f"Student {name} added successfully!", "info")
+        show_message("Success", message, "info")
         self.clear_student_form()
         self.load_student_list()
     
+    def bulk_import_students(self):
+        """Enroll the students of a CSV manifest with their photos (see bulk_enroll.py)"""
+        manifest = filedialog.askopenfilename(
+            title="Enrollment Manifest", filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+        )
+        if not manifest:
+            return
+        photo_dir = filedialog.askdirectory(title="Photo Folder", initialdir=os.path.dirname(manifest))
+        if not photo_dir:
+            return
+        report_path = os.path.splitext(manifest)[0] + "_failures.csv"
+        
+        def show_progress(done, total):
+            self.ui_tasks.call_soon(lambda: self.bulk_status_label.config(text=f"{done}/{total} students processed"))
+        
+        def run():
+            # Faces are cropped in worker processes; the model is updated once at the end.
+            # Closing the app meanwhile stops the import early
+            enrolled, failures = enroll_students(
+                self.db, manifest, photo_dir, self.config, self.get_recognition_engine(),
+                progress=show_progress, should_stop=self.ui_tasks.cancelled
+            )
+            if failures:
+                write_report(failures, report_path)
+            if enrolled and self.recognition_pool:
+                self.recognition_pool.reload_model()
+            return enrolled, failures
+        
+        def on_done(result):
+            enrolled, failures = result
+            self.bulk_status_label.config(text="")
+            message = f"{enrolled} students enrolled."
+            if failures:
+                message += f"\n{len(failures)} failures, listed in {report_path}"
+            show_message("Bulk Enrollment", message, "warning" if failures else "info")
+            self.load_student_list()
+        
+        def on_error(error):
+            self.bulk_status_label.config(text="")
+            show_message("Error", f"Bulk enrollment failed: {error}", "error")
+        
+        self.bulk_status_label.config(text="Reading photos...")
+        self.ui_tasks.submit(None, run, on_done=on_done, on_error=on_error)
+    
     def start_camera(self):
-        """Start the camera for attendance detection"""
-        if self.video_capture is None:
-            self.video_capture = VideoCapture()
-            self.video_capture.start()
-            
-            # Get the face data from database and train the recognizer
-            face_data = self.db.get_all_face_encodings()
-            faces, labels = self.face_detector.prepare_faces_for_training(face_data)
-            
-            if faces and labels:
-                self.face_detector.train_recognizer(faces, labels)
+        """Start the cameras for attendance detection"""
+        if self.camera_manager is None:
+            # Usually already loaded by the warm-up thread
+            import cv2
+            from attendance_system.utils.motion_gate import MotionGate, DetectionScheduler
+            from attendance_system.utils.frame_context import FrameContext
+            from attendance_system.utils.camera_manager import CameraManager
+            from attendance_system.utils.adaptive_detection import AdaptiveResolution, roi_box
+            engine = self.get_recognition_engine()
+            display_width, display_height = self.display_size
             
-            # Function to process frames and detect faces
-            def process_frame(frame):
-                # Resize frame for faster processing
-                small_frame = self.face_detector.resize_frame(frame, width=320)
+            # Inference stage: detect and recognize faces, returns boxes in frame coordinates
+            def recognize_faces(camera_id, frame):
+                face_tracker = self.face_trackers[camera_id]
+                # Gray and downscaled views are computed once and shared by all steps
+                frame_context = FrameContext(frame)
+                decision = self.detection_schedulers[camera_id].decide(
+                    frame_context, face_tracker.has_tracks(), face_tracker.is_moving()
+                )
+                if decision == "idle":
+                    return []
+                if decision == "track":
+                    # Boxes of the last detection, reused while the faces hold still
+                    return face_tracker.current_boxes()
                 
-                # Get face locations and processed faces
-                face_locations, face_samples = self.face_detector.get_face_encodings(small_frame)
+                # Detect on a small copy of the region of interest, at the adaptive width
+                scale = self.detection_scales[camera_id]
+                roi = roi_box(self.camera_rois[camera_id], frame.shape)
+                started = time.perf_counter()
+                boxes = None
                 
-                # Draw rectangles on faces
-                for (x, y, w, h) in face_locations:
-                    # Scale back to original size
-                    scale = frame.shape[1] / small_frame.shape[1]
-                    x = int(x * scale)
-                    y = int(y * scale)
-                    w = int(w * scale)
-                    h = int(h * scale)
-                    
-                    # Draw rectangle
-                    cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 255, 0), 2)
+                if self.recognition_pool:
+                    try:
+                        _, faces = self.recognition_pool.recognize(frame, width=scale.get_width(), roi=roi)
+                        tracks = face_tracker.update([box for box, _ in faces])
+                        for track, (box, student_id) in zip(tracks, faces):
+                            if face_tracker.needs_recognition(track):
+                                self.vote_attendance(face_tracker, track, student_id)
+                        boxes = [box for box, _ in faces]
+                    except Exception as e:
+                        print(f"Error in recognition pool, recognizing in-process: {e}")
                 
-                # Process each detected face for attendance
-                for i, face_encoding in enumerate(face_samples):
-                    match_found, student_id = self.face_detector.compare_faces(None, face_encoding)
+                if boxes is None:
+                    boxes = engine.detect_boxes(frame_context, scale.get_width(), roi)
+                    tracks = face_tracker.update(boxes)
                     
-                    if match_found:
-                        self.mark_attendance(student_id)
+                    # Only new or due-for-reverification tracks go through the recognizer, in
+                    # one batch, on full-resolution crops of the faces
+                    due = [(track, box) for track, box in zip(tracks, boxes)
+                           if face_tracker.needs_recognition(track)]
+                    student_ids = engine.recognize_batch(frame, [box for _, box in due])
+                    for (track, _), student_id in zip(due, student_ids):
+                        self.vote_attendance(face_tracker, track, student_id)
                 
-                return frame
+                if self.config["adaptive_resolution"]:
+                    scale.update(time.perf_counter() - started)
+                return boxes
+            
+            # Render stage: draw the latest known face boxes on a fresh frame, at display size
+            def draw_detections(camera_id, frame, boxes):
+                # Shrinking first gives a private copy to draw on and less to convert
+                display = cv2.resize(frame, (display_width, display_height))
+                sx = display_width / frame.shape[1]
+                sy = display_height / frame.shape[0]
+                roi = roi_box(self.camera_rois[camera_id], frame.shape)
+                if roi:
+                    x, y, w, h = roi
+                    cv2.rectangle(display, (int(x * sx), int(y * sy)), (int((x+w) * sx), int((y+h) * sy)), (255, 200, 0), 1)
+                for (x, y, w, h) in boxes or []:
+                    cv2.rectangle(display, (int(x * sx), int(y * sy)), (int((x+w) * sx), int((y+h) * sy)), (0, 255, 0), 2)
+                return display
             
-            # Function to update the video display
-            def update_video_display(frame):
-                tk_img = convert_cv_to_tkinter(frame, 400, 300)
-                self.camera_label.configure(image=tk_img)
-                self.camera_label.image = tk_img
+            # Function to update the video display (render threads: the Tk thread shows the image)
+            def update_video_display(camera_id, frame):
+                self.camera_feeds[camera_id].put(convert_cv_to_pil(frame, display_width, display_height))
             
-            # Start video capture thread
-            self.video_capture.start_update_thread(update_video_display, process_frame)
+            # Every camera feeds one shared, fairly scheduled recognition backend
+            self.camera_manager = CameraManager(recognize_faces, draw_detections, update_video_display)
+            for camera_id, camera in enumerate(self.config["cameras"]):
+                source, roi = (camera["source"], camera.get("roi")) if isinstance(camera, dict) else (camera, None)
+                if self.camera_manager.add_camera(camera_id, source):
+                    self.camera_rois[camera_id] = roi
+            if not self.camera_manager.cameras:
+                self.camera_manager = None
+                show_message("Error", "No camera could be opened", "error")
+                return
+            
+            # Attendance is written in batches from a background thread
+            self.attendance_writer = AttendanceWriter(self.db, on_flush=self.on_attendance_written,
+                                                  on_failure=self.on_attendance_failed)
+            
+            # Names of recognized students are looked up in memory
+            self.ui_tasks.submit("student_cache", self.db.warm_student_cache)
             
             # Update buttons
             self.start_camera_button.configure(state=tk.DISABLED)
             self.stop_camera_button.configure(state=tk.NORMAL)
+            
+            camera_manager = self.camera_manager
+            
+            # Recognition starts once the model is loaded (Tk thread)
+            def start_recognition(_):
+                # Stopped while the model was loading
+                if self.camera_manager is not camera_manager:
+                    return
+                
+                # Recognition runs on a process pool if configured, in-process otherwise
+                self.recognition_pool = self.start_recognition_pool()
+                inference_threads = self.recognition_pool.num_workers if self.recognition_pool else 1
+                
+                for camera_id in self.camera_manager.cameras:
+                    # Faces are tracked across frames; each track is recognized a few times, not every frame
+                    self.face_trackers[camera_id] = FaceTracker()
+                    
+                    # Detection runs every few frames, and not at all on a static empty scene
+                    motion_gate = None
+                    if self.config["motion_gating"]:
+                        motion_gate = MotionGate(min_changed_fraction=self.config["motion_threshold"])
+                    self.detection_schedulers[camera_id] = DetectionScheduler(self.config["detection_stride"], motion_gate)
+                    
+                    # Detection width adapts to the measured processing time
+                    self.detection_scales[camera_id] = AdaptiveResolution(
+                        self.config["target_fps"], self.config["detection_width"],
+                        self.config["min_detection_width"], self.config["max_detection_width"]
+                    )
+                
+                for camera_id in self.camera_manager.cameras:
+                    self.camera_feeds[camera_id] = LabelFeed(self.camera_labels[camera_id])
+                    self.camera_feeds[camera_id].start()
+                
+                # Capture and display run per camera, recognition on shared threads
+                self.camera_manager.start(inference_threads)
+                self.update_pipeline_stats()
+            
+            def on_sync_error(error):
+                if self.camera_manager is camera_manager:
+                    self.stop_camera()
+                show_message("Error", f"Could not load the recognition model: {error}", "error")
+            
+            # Load the saved model off the Tk thread, applying only faces enrolled since it was written
+            self.ui_tasks.submit("camera_sync", engine.sync, self.db,
+                                 on_done=start_recognition, on_error=on_sync_error)
+    
+    def start_recognition_pool(self):
+        """Start the configured recognition worker processes, or None for in-process mode"""
+        num_workers = self.config["recognition_workers"]
+        if num_workers <= 0:
+            return None
+        
+        try:
+            from attendance_system.utils.recognition_pool import RecognitionPool
+            frame_shape = self.camera_manager.frame_shape()
+            return RecognitionPool(num_workers, max_frame_shape=frame_shape, engine_config=self.config)
+        except Exception as e:
+            print(f"Error starting recognition pool, recognizing in-process: {e}")
+            return None
+    
+    def update_pipeline_stats(self):
+        """Show per-camera frame rates and drops, refreshed every second"""
+        if self.camera_manager is None:
+            return
+        
+        lines = []
+        for camera_id, stats in self.camera_manager.get_stats().items():
+            lines.append(f"Camera {camera_id + 1}: {stats['capture_fps']:.0f} FPS | Recognition "
+                         f"{stats['inference_fps']:.1f} FPS, {stats['inference_ms']:.0f} ms | "
+                         f"Dropped {stats['drop_rate'] * 100:.0f}% | Latency {stats['latency_ms']:.0f} ms | "
+                         f"Detect at {self.detection_scales[camera_id].get_width()} px")
+        
+        faces = sum(t.get_stats()['faces'] for t in self.face_trackers.values())
+        recognitions = sum(t.get_stats()['recognitions'] for t in self.face_trackers.values())
+        decisions = [s.get_stats() for s in self.detection_schedulers.values()]
+        cache = self.db.student_cache.stats()
+        lines.append(f"Faces {faces} / recognized {recognitions} | "
+                     f"Detect {sum(d['detect'] for d in decisions)} / track {sum(d['track'] for d in decisions)} / "
+                     f"idle {sum(d['idle'] for d in decisions)} | "
+                     f"Student cache {cache['hit_rate'] * 100:.0f}% hits, {cache['size']} cached")
+        self.pipeline_stats_label.configure(text="\n".join(lines))
+        if metrics.registry.enabled:
+            self.metrics_label.configure(text=metrics.format_overlay(metrics.registry.snapshot()))
+        self.root.after(1000, self.update_pipeline_stats)
     
     def stop_camera(self):
-        """Stop the camera"""
-        if self.video_capture:
-            self.video_capture.stop()
-            self.video_capture = None
+        """Stop the cameras"""
+        if self.camera_manager:
+            self.camera_manager.stop()
+            self.camera_manager = None
+            self.face_trackers = {}
+            self.detection_schedulers = {}
+            self.detection_scales = {}
+            self.camera_rois = {}
+            
+            if self.recognition_pool:
+                self.recognition_pool.close()
+                self.recognition_pool = None
+            
+            # Write out the attendance still queued
+            self.attendance_writer.close()
+            self.attendance_writer = None
             
             # Update buttons
             self.start_camera_button.configure(state=tk.NORMAL)
             self.stop_camera_button.configure(state=tk.DISABLED)
             
             # Clear camera display
-            self.camera_label.configure(image='')
+            for feed in self.camera_feeds.values():
+                feed.stop()
+            self.camera_feeds = {}
+            self.pipeline_stats_label.configure(text="")
+            self.metrics_label.configure(text="")
+    
+    def vote_attendance(self, face_tracker, track, student_id):
+        """Count a recognition for a face track; mark attendance once its identity is decided"""
+        identity = face_tracker.add_vote(track, student_id)
+        if identity is not None:
+            self.mark_attendance(identity)
     
     def mark_attendance(self, student_id):
-        """Mark attendance for a student"""
+        """Mark attendance for a student, once a day whichever camera saw them"""
         with self.detection_lock:
             # Get current time
             date_str, time_str = get_current_datetime()
             
-            # Avoid duplicate detections within 5 seconds
-            if student_id in self.last_detection_time:
-                last_time = self.last_detection_time[student_id]
-                if (datetime.datetime.now() - last_time).total_seconds() < 5:
-                    return
-            
-            # Update last detection time
-            self.last_detection_time[student_id] = datetime.datetime.now()
+            # A student passing several cameras (or the same one again) is recorded once
+            if self.marked_students.get(student_id) == date_str:
+                return
             
+            # Queue the write; the capture thread never waits on the database.
+            # A dropped record is retried the next time the student is seen
+            if self.attendance_writer.submit(student_id, date_str, time_str):
+                self.marked_students[student_id] = date_str
+    
+    def on_attendance_failed(self, records):
+        """Let records the background writer could not write be marked again (writer thread)"""
+        with self.detection_lock:
+            for student_id, date_str, time_str, status in records:
+                if self.marked_students.get(student_id) == date_str:
+                    del self.marked_students[student_id]
+    
+    def on_attendance_written(self, records):
+        """Show attendance records written by the background writer (writer thread)"""
+        for student_id, date_str, time_str, status in records:
             # Get student info
             student = self.db.get_student_by_id(student_id)
             if student:
-                student_id, user_id, name, roll_number, department, _ = student
+                student_id, user_id, name, roll_number, department = student
                 
-                # Mark attendance in database
-                self.db.mark_attendance(student_id, date_str, time_str)
-                
-                # Add to detection tree
-                self.detection_tree.insert("", 0, values=(time_str, name, roll_number, "Present"))
+                # Add to detection tree on the Tk thread
+                values = (time_str, name, roll_number, status.capitalize())
+                self.ui_tasks.call_soon(lambda values=values: self.detection_tree.insert("", 0, values=values))
     
-    def generate_attendance_report(self):
-        """Generate attendance report for the selected date range"""
+    def get_report_filters(self):
+        """Report filters from the report controls, or None if the date range is missing"""
         from_date = self.from_date_entry.get().strip()
         to_date = self.to_date_entry.get().strip()
         
         if not from_date or not to_date:
             show_message("Error", "Please enter date range", "error")
+            return None
+        
+        department = self.department_combo.get()
+        status = self.status_combo.get()
+        return {
+            "from_date": from_date,
+            "to_date": to_date,
+            "department": None if department == ALL_FILTER else department,
+            "status": None if status == ALL_FILTER else status,
+        }
+    
+    def generate_attendance_report(self):
+        """Generate attendance report for the selected date range and filters"""
+        filters = self.get_report_filters()
+        if filters is None:
             return
         
-        # Get report data
-        report_data = self.db.get_attendance_report(from_date, to_date)
-        
         # Clear current items
-        for item in self.report_tree.get_children():
-            self.report_tree.delete(item)
+        self.report_tree.delete(*self.report_tree.get_children())
+        
+        # Rows are loaded a page at a time as the report is scrolled
+        self.report_filters = filters
+        self.report_next_key = None
+        self.report_rows = 0
+        self.load_report_page()
+        
+        # Pick up departments of students enrolled since the tab was built
+        self.ui_tasks.submit("departments", self.db.get_departments, on_done=self.show_departments)
+    
+    def show_departments(self, departments):
+        self.department_combo['values'] = [ALL_FILTER] + departments
+    
+    def load_report_page(self):
+        """Fetch the next page of the current report in the background"""
+        # A newer report supersedes the pages still being read for the old one
+        self.report_loading = True
+        self.report_status_label.config(text=f"{self.report_rows} rows, loading...")
+        self.ui_tasks.submit("report", self.db.get_attendance_report_page,
+                             **self.report_filters, after=self.report_next_key,
+                             on_done=self.show_report_page, on_error=self.on_report_error)
+    
+    def show_report_page(self, page):
+        """Append a page of the report to the report tree"""
+        rows, self.report_next_key = page
+        self.report_loading = False
+        for row in rows:
+            self.report_tree.insert("", "end", values=row)
+        self.report_rows += len(rows)
+        
+        more = " (scroll for more)" if self.report_next_key else ""
+        self.report_status_label.config(text=f"{self.report_rows} rows{more}")
+    
+    def on_report_error(self, error):
+        self.report_loading = False
+        self.report_status_label.config(text=f"Error loading report: {error}")
+    
+    def on_report_scroll(self, first, last):
+        """Update the report scrollbar and load more rows when the end comes into view"""
+        self.report_scrollbar.set(first, last)
+        if self.report_next_key is not None and not self.report_loading and float(last) > 0.9:
+            self.load_report_page()
+    
+    def export_attendance_report(self):
+        """Export the whole report for the selected filters to a CSV or Parquet file"""
+        filters = self.get_report_filters()
+        if filters is None:
+            return
+        
+        path = filedialog.asksaveasfilename(
+            title="Export Attendance Report",
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv"), ("Parquet files", "*.parquet")],
+        )
+        if not path:
+            return
         
-        # Insert new items
-        for name, roll_number, department, date, time, status in report_data:
-            self.report_tree.insert("", "end", values=(name, roll_number, department, date, time, status))
+        # Streamed from the database, never held in memory as a whole, on a worker thread
+        def export():
+            return export_report(report_rows(), path)
+        
+        # Stops between rows once the app is closing, instead of keeping it alive until done
+        def report_rows():
+            for row in self.db.iter_attendance_report(page_size=EXPORT_BATCH_SIZE, **filters):
+                if self.ui_tasks.cancelled():
+                    raise RuntimeError("Export cancelled")
+                yield row
+        
+        self.ui_tasks.submit(
+            None, export,
+            on_done=lambda count: show_message("Success", f"Exported {count} rows to {path}"),
+            on_error=lambda e: show_message("Error", f"Export failed: {e}", "error"),
+        )
     
     def logout(self):
         """Logout and show login screen"""
-        if self.video_capture:
+        if self.camera_manager:
             self.stop_camera()
         
+        # Results of queries still running are for widgets about to be destroyed
+        self.ui_tasks.cancel()
+        
         self.current_user = None
         self.current_user_role = None
         self.show_login_screen()
     
     def on_closing(self):
         """Handle closing event"""
-        if self.video_capture:
+        if self.camera_manager:
             self.stop_camera()
+        if self.metrics_reporter:
+            self.metrics_reporter.stop()
+        self.ui_tasks.shutdown()
+        self.db.close()
         self.root.destroy()
 
 if __name__ == "__main__":
-    import sqlite3  # Import here to avoid circular import
-    
     root = tk.Tk()
     app = AttendanceSystem(root)
     root.mainloop() 
\ No newline at end of file
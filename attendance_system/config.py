@@ -0,0 +1,51 @@
+import json
+import os
+
+# Deployment settings, overridable per site with a JSON file
+CONFIG_PATH = os.environ.get('ATTENDANCE_CONFIG', 'attendance_config.json')
+
+DEFAULTS = {
+    # Camera sources of the attendance tab: device indexes, video files or stream URLs,
+    # or {"source": ..., "roi": [x, y, w, h]} to detect only in a region of interest
+    # given as fractions of the image, e.g. the doorway
+    "cameras": [0],
+    # Recognition worker processes; 0 runs recognition in the camera process
+    "recognition_workers": 0,
+    # Run the face detector every N frames while faces are tracked
+    "detection_stride": 3,
+    # Skip detection on a static scene; fraction of changed pixels that counts as motion
+    "motion_gating": True,
+    "motion_threshold": 0.01,
+    # Width of the frame copy faces are detected on; with adaptive_resolution it
+    # moves between the min and max to keep detection + recognition at target_fps
+    "detection_width": 320,
+    "adaptive_resolution": True,
+    "target_fps": 10,
+    "min_detection_width": 160,
+    "max_detection_width": 960,
+    # Face detector backend: haar, lbp, dnn or yunet (see utils/face_detectors.py),
+    # and its options, e.g. {"input_width": 320}
+    "face_detector": "haar",
+    "face_detector_options": {},
+    # Recognition engine: lbph (fast) or embedding (dlib, more accurate), and its
+    # options, e.g. {"tolerance": 0.5, "index_kind": "ivf"}
+    "recognition_engine": "lbph",
+    "recognition_engine_options": {},
+    # Stage timings, counters and queue depths (off: no overhead); written every
+    # metrics_interval seconds to a JSON-lines log and a Prometheus text file
+    "metrics": False,
+    "metrics_interval": 10,
+    "metrics_json_log": "metrics.jsonl",
+    "metrics_prometheus_file": "metrics.prom",
+}
+
+def load_config(path=CONFIG_PATH):
+    """Load settings from the JSON config file on top of the defaults"""
+    config = dict(DEFAULTS)
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                config.update(json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"Error loading config {path}: {e}")
+    return config
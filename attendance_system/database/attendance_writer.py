@@ -0,0 +1,145 @@
+import queue
+import threading
+import time
+from attendance_system.utils import metrics
+
+# Flush when this many records are waiting, or after this long, whichever is first
+FLUSH_BATCH_SIZE = 50
+FLUSH_INTERVAL = 0.5  # seconds
+
+# Records waiting to be written before submit() starts dropping them
+MAX_PENDING = 1000
+
+_STOP = object()
+
+class AttendanceWriter:
+    """Write attendance from a background thread in batched transactions
+
+    submit() never blocks: records go onto a bounded queue and a dedicated
+    thread coalesces them per (student_id, date) and writes each batch with
+    DatabaseManager.mark_attendance_batch in one transaction. close() writes
+    everything still queued before returning.
+    """
+
+    def __init__(self, db, on_flush=None, on_failure=None, batch_size=FLUSH_BATCH_SIZE,
+                 flush_interval=FLUSH_INTERVAL, max_pending=MAX_PENDING):
+        self.db = db
+        # Called from the writer thread with the records of each written batch
+        self.on_flush = on_flush
+        # Called from the writer thread with the records of each batch that could not be written
+        self.on_failure = on_failure
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.stats_lock = threading.Lock()
+        self.counters = {
+            "submitted": 0,
+            "dropped": 0,      # queue full: the capture thread did not wait
+            "coalesced": 0,    # repeats of a (student, date) within one batch
+            "written": 0,
+            "failed": 0,
+            "batches": 0,
+            "max_queue_depth": 0,
+            "last_flush_ms": 0.0,
+        }
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def submit(self, student_id, date, time_str, status="present"):
+        """Queue an attendance record; returns False if it had to be dropped"""
+        try:
+            self.queue.put_nowait((student_id, date, time_str, status))
+        except queue.Full:
+            self._count("dropped")
+            metrics.registry.inc("attendance_dropped")
+            return False
+
+        self._count("submitted")
+        depth = self.queue.qsize()
+        metrics.registry.set_gauge("attendance_queue_depth", depth)
+        with self.stats_lock:
+            if depth > self.counters["max_queue_depth"]:
+                self.counters["max_queue_depth"] = depth
+        return True
+
+    def close(self, timeout=None):
+        """Stop the writer thread after flushing every queued record"""
+        if not self.thread.is_alive():
+            return
+        # Blocking put: the sentinel must not be dropped
+        self.queue.put(_STOP)
+        self.thread.join(timeout)
+
+    def stats(self):
+        """Counters plus the current queue depth"""
+        with self.stats_lock:
+            stats = dict(self.counters)
+        stats["queue_depth"] = self.queue.qsize()
+        return stats
+
+    def _count(self, name, amount=1):
+        with self.stats_lock:
+            self.counters[name] += amount
+
+    def _run(self):
+        """Collect records until the batch is full or the interval elapsed, then flush"""
+        try:
+            self._collect()
+        finally:
+            # The thread's connection would otherwise stay open until the database closes
+            self.db.connections.close_thread()
+
+    def _collect(self):
+        stopping = False
+        while not stopping:
+            batch = []
+            deadline = None
+            while len(batch) < self.batch_size:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                try:
+                    item = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            if stopping:
+                # Drain whatever was queued behind the sentinel as well
+                while True:
+                    try:
+                        item = self.queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is not _STOP:
+                        batch.append(item)
+
+            if batch:
+                self._flush(batch)
+
+    def _flush(self, batch):
+        """Write one batch, keeping only the latest record per (student_id, date)"""
+        latest = {}
+        for record in batch:
+            latest[(record[0], record[1])] = record
+        records = list(latest.values())
+
+        start = time.perf_counter()
+        ok = self.db.mark_attendance_batch(records)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        with self.stats_lock:
+            self.counters["coalesced"] += len(batch) - len(records)
+            self.counters["written" if ok else "failed"] += len(records)
+            self.counters["batches"] += 1
+            self.counters["last_flush_ms"] = elapsed_ms
+
+        callback = self.on_flush if ok else self.on_failure
+        if callback:
+            try:
+                callback(records)
+            except Exception as e:
+                print(f"Error in attendance flush callback: {e}")
@@ -0,0 +1,111 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# Applied to every new connection
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",    # readers no longer block the writer (and vice versa)
+    "PRAGMA synchronous = NORMAL",  # safe with WAL, far fewer fsyncs than FULL
+    "PRAGMA cache_size = -16000",   # 16 MB page cache per connection
+    "PRAGMA temp_store = MEMORY",
+)
+
+# Wait this long for a competing writer instead of failing with "database is locked"
+BUSY_TIMEOUT = 10.0
+
+# Prepared statements kept per connection; queries are reused with parameters
+STATEMENT_CACHE_SIZE = 256
+
+class ConnectionManager:
+    """Thread-safe access to one SQLite database
+
+    Every thread gets its own long-lived connection, opened on first use and
+    reused afterwards, so the Tk thread and the capture thread never share a
+    connection and nothing reconnects per query. Connections run in autocommit
+    mode; writes go through transaction(), which takes the write lock up front
+    so concurrent writers queue on the busy timeout instead of deadlocking.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def connection(self):
+        """Get the calling thread's connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=BUSY_TIMEOUT,
+                isolation_level=None,
+                check_same_thread=False,
+                cached_statements=STATEMENT_CACHE_SIZE,
+            )
+            for pragma in PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
+            self._local.depth = 0
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def cursor(self):
+        """Get a cursor on the calling thread's connection, for reads"""
+        return self.connection().cursor()
+
+    @contextmanager
+    def transaction(self):
+        """Run a block of statements in one transaction, yielding a cursor
+
+        Commits on success and rolls back if the block raises. Nested calls join
+        the outer transaction.
+        """
+        conn = self.connection()
+        cursor = conn.cursor()
+        if self._local.depth > 0:
+            self._local.depth += 1
+            try:
+                yield cursor
+            finally:
+                self._local.depth -= 1
+            return
+
+        cursor.execute("BEGIN IMMEDIATE")
+        self._local.depth = 1
+        try:
+            yield cursor
+        except BaseException:
+            conn.rollback()
+            raise
+        else:
+            conn.commit()
+        finally:
+            self._local.depth = 0
+
+    def close_thread(self):
+        """Close the calling thread's connection, e.g. when a worker thread exits"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+        with self._lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        self._local.conn = None
+        self._local.depth = 0
+
+    def close(self):
+        """Close every connection opened by this manager"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
@@ -1,177 +1,563 @@
 import sqlite3
-import os
-import numpy as np
 import pickle
+from attendance_system.database.connection import ConnectionManager
+from attendance_system.database.migrations import apply_migrations
+from attendance_system.database.face_template import MAGIC, TemplateError, encode_template, is_template
+from attendance_system.database.student_cache import StudentCache
+from attendance_system.utils import metrics
+
+# Face samples kept per student; the lowest quality ones are evicted first
+MAX_FACE_TEMPLATES = 10
+
+# Student record columns; the face data is read only where it is needed
+STUDENT_COLUMNS = "student_id, user_id, name, roll_number, department"
+
+# Rows read per query by the paginated attendance report
+REPORT_PAGE_SIZE = 500
 
 class DatabaseManager:
     def __init__(self, db_path='attendance.db'):
         self.db_path = db_path
+        # Per-thread connections shared by all methods (and the UI / capture threads)
+        self.connections = ConnectionManager(db_path)
+        # Student records by id and login, for the recognition path and the UI
+        self.student_cache = StudentCache()
         self.create_database()
+        self.migrate_face_templates()
     
     def create_database(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        # Apply the schema migrations this database has not seen yet
+        apply_migrations(self.connections.connection())
+    
+    def close(self):
+        """Close all database connections"""
+        self.connections.close()
+    
+    def migrate_face_templates(self):
+        """Convert face data stored as pickles into binary face templates (one-shot)"""
+        cursor = self.connections.cursor()
+        cursor.execute(
+            "SELECT student_id, face_encoding FROM students "
+            "WHERE face_encoding IS NOT NULL AND substr(face_encoding, 1, 4) != ?",
+            (MAGIC,)
+        )
+        rows = cursor.fetchall()
         
-        # Read schema.sql file
-        schema_path = os.path.join(os.path.dirname(__file__), 'schema.sql')
-        with open(schema_path, 'r') as f:
-            schema = f.read()
+        migrated = []
+        for student_id, face_pkl in rows:
+            if is_template(face_pkl):
+                continue
+            try:
+                # Legacy rows only; new data is never unpickled
+                migrated.append((encode_template(pickle.loads(face_pkl)), student_id))
+            except Exception as e:
+                print(f"Error migrating face of student {student_id}: {e}")
+                continue
         
-        # Execute schema
-        cursor.executescript(schema)
-        conn.commit()
-        conn.close()
+        with self.connections.transaction() as cursor:
+            cursor.executemany(
+                "UPDATE students SET face_encoding = ? WHERE student_id = ?",
+                migrated
+            )
+            
+            # Students enrolled before face_templates existed get their face as a sample
+            cursor.execute(
+                """
+                INSERT INTO face_templates (student_id, template)
+                SELECT s.student_id, s.face_encoding FROM students s
+                WHERE s.face_encoding IS NOT NULL AND substr(s.face_encoding, 1, 4) = ?
+                  AND NOT EXISTS (SELECT 1 FROM face_templates t WHERE t.student_id = s.student_id)
+                """,
+                (MAGIC,)
+            )
+        
+        return len(migrated)
     
     def add_user(self, username, password, role):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
         try:
-            cursor.execute(
-                "INSERT INTO users (username, password, role) VALUES (?, ?, ?)",
-                (username, password, role)
-            )
-            conn.commit()
-            user_id = cursor.lastrowid
+            with self.connections.transaction() as cursor:
+                cursor.execute(
+                    "INSERT INTO users (username, password, role) VALUES (?, ?, ?)",
+                    (username, password, role)
+                )
+                user_id = cursor.lastrowid
             return user_id
         except sqlite3.IntegrityError:
             return None
-        finally:
-            conn.close()
     
     def verify_user(self, username, password):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.connections.cursor()
         cursor.execute(
             "SELECT user_id, role FROM users WHERE username = ? AND password = ?",
             (username, password)
         )
         result = cursor.fetchone()
-        conn.close()
         return result if result else None
     
     def add_student(self, user_id, name, roll_number, department, face_image=None):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
         try:
-            # Convert face image to binary data
-            encoded_data = pickle.dumps(face_image) if face_image is not None else None
+            # Convert face image to a binary face template
+            encoded_data = encode_template(face_image) if face_image is not None else None
             
-            cursor.execute(
-                "INSERT INTO students (user_id, name, roll_number, department, face_encoding) VALUES (?, ?, ?, ?, ?)",
-                (user_id, name, roll_number, department, encoded_data)
-            )
-            conn.commit()
-            student_id = cursor.lastrowid
+            with self.connections.transaction() as cursor:
+                cursor.execute(
+                    "INSERT INTO students (user_id, name, roll_number, department, face_encoding) VALUES (?, ?, ?, ?, ?)",
+                    (user_id, name, roll_number, department, encoded_data)
+                )
+                student_id = cursor.lastrowid
+                if encoded_data is not None:
+                    self._insert_face_templates(cursor, student_id, [(encoded_data, 0.0)])
+            self.student_cache.invalidate(student_id)
             return student_id
         except sqlite3.IntegrityError:
             return None
-        finally:
-            conn.close()
+    
+    def add_students_bulk(self, students, max_templates=MAX_FACE_TEMPLATES):
+        """Add many students with their accounts and face samples in one transaction
+        
+        students are (username, password, name, roll_number, department,
+        samples) tuples, samples being (face_image, quality) pairs. Students
+        whose username or roll number is taken (in the database or earlier in
+        the list) are skipped. Returns (added roll numbers, [(index, reason)]
+        of the skipped ones), index being the position in students.
+        """
+        skipped = []
+        accepted = []
+        usernames = set()
+        roll_numbers = set()
+        taken_usernames = self._existing_values("users", "username", [s[0] for s in students])
+        taken_rolls = self._existing_values("students", "roll_number", [s[3] for s in students])
+        for index, student in enumerate(students):
+            username, roll_number = student[0], student[3]
+            if username in taken_usernames or username in usernames:
+                skipped.append((index, f"Username {username} already exists"))
+            elif roll_number in taken_rolls or roll_number in roll_numbers:
+                skipped.append((index, "Roll number already exists"))
+            else:
+                usernames.add(username)
+                roll_numbers.add(roll_number)
+                accepted.append((index, student))
+        
+        # Encoded before taking the write lock; the best samples first
+        users = []
+        rows = []
+        templates = []
+        for _, (username, password, name, roll_number, department, samples) in accepted:
+            best = sorted(samples, key=lambda sample: sample[1], reverse=True)[:max_templates]
+            encoded = [(encode_template(face), float(quality)) for face, quality in best]
+            users.append((username, password, "student"))
+            rows.append((username, name, roll_number, department, encoded[0][0] if encoded else None))
+            templates += [(roll_number, template, quality) for template, quality in encoded]
+        
+        try:
+            with self.connections.transaction() as cursor:
+                cursor.executemany("INSERT INTO users (username, password, role) VALUES (?, ?, ?)", users)
+                cursor.executemany(
+                    """
+                    INSERT INTO students (user_id, name, roll_number, department, face_encoding)
+                    VALUES ((SELECT user_id FROM users WHERE username = ?), ?, ?, ?, ?)
+                    """,
+                    rows
+                )
+                cursor.executemany(
+                    """
+                    INSERT INTO face_templates (student_id, template, quality)
+                    VALUES ((SELECT student_id FROM students WHERE roll_number = ?), ?, ?)
+                    """,
+                    templates
+                )
+                # One face change per student with samples, as _insert_face_templates logs
+                cursor.executemany(
+                    "INSERT INTO face_changes (student_id) SELECT student_id FROM students WHERE roll_number = ?",
+                    [(row[2],) for row in rows if row[4] is not None]
+                )
+        except Exception as e:
+            print(f"Error adding students: {e}")
+            return [], skipped + [(index, f"Database error: {e}") for index, _ in accepted]
+        
+        return [student[3] for _, student in accepted], skipped
+    
+    def _existing_values(self, table, column, values):
+        """The given values already present in a table's column"""
+        cursor = self.connections.cursor()
+        existing = set()
+        values = list(set(values))
+        # Stay under SQLite's default limit of 999 parameters per statement
+        for start in range(0, len(values), 900):
+            chunk = values[start:start + 900]
+            placeholders = ", ".join("?" * len(chunk))
+            cursor.execute(f"SELECT {column} FROM {table} WHERE {column} IN ({placeholders})", chunk)
+            existing.update(row[0] for row in cursor.fetchall())
+        return existing
     
     def update_student_face(self, student_id, face_image):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
         try:
-            # Convert face image to binary data
-            encoded_data = pickle.dumps(face_image)
+            # Convert face image to a binary face template
+            encoded_data = encode_template(face_image)
             
-            cursor.execute(
-                "UPDATE students SET face_encoding = ? WHERE student_id = ?",
-                (encoded_data, student_id)
-            )
-            conn.commit()
+            with self.connections.transaction() as cursor:
+                cursor.execute(
+                    "UPDATE students SET face_encoding = ? WHERE student_id = ?",
+                    (encoded_data, student_id)
+                )
+                # The new face replaces all previous samples
+                cursor.execute("DELETE FROM face_templates WHERE student_id = ?", (student_id,))
+                self._insert_face_templates(cursor, student_id, [(encoded_data, 0.0)])
+            self.student_cache.invalidate(student_id)
             return True
-        except:
+        except (sqlite3.Error, TemplateError) as e:
+            print(f"Error updating student face: {e}")
             return False
-        finally:
-            conn.close()
+    
+    def add_face_templates(self, student_id, samples, max_templates=MAX_FACE_TEMPLATES):
+        """Add (face_image, quality) samples for a student, keeping the best max_templates"""
+        try:
+            templates = [(encode_template(face), float(quality)) for face, quality in samples]
+            
+            with self.connections.transaction() as cursor:
+                self._insert_face_templates(cursor, student_id, templates)
+                
+                # Evict the lowest quality samples beyond the cap
+                cursor.execute(
+                    """
+                    DELETE FROM face_templates WHERE student_id = ? AND template_id NOT IN (
+                        SELECT template_id FROM face_templates WHERE student_id = ?
+                        ORDER BY quality DESC, template_id DESC LIMIT ?
+                    )
+                    """,
+                    (student_id, student_id, max_templates)
+                )
+                
+                # The best sample is also the student's primary face
+                cursor.execute(
+                    """
+                    UPDATE students SET face_encoding = (
+                        SELECT template FROM face_templates WHERE student_id = ?
+                        ORDER BY quality DESC, template_id DESC LIMIT 1
+                    ) WHERE student_id = ?
+                    """,
+                    (student_id, student_id)
+                )
+            return True
+        except Exception as e:
+            print(f"Error adding face templates: {e}")
+            return False
+    
+    def _insert_face_templates(self, cursor, student_id, templates):
+        """Insert encoded (template, quality) samples and log the face change"""
+        cursor.executemany(
+            "INSERT INTO face_templates (student_id, template, quality) VALUES (?, ?, ?)",
+            [(student_id, template, quality) for template, quality in templates]
+        )
+        self._log_face_change(cursor, student_id)
     
     def get_student_by_roll(self, roll_number):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        """Get (student_id, user_id, name, roll_number, department) of a roll number"""
+        cursor = self.connections.cursor()
         cursor.execute(
-            "SELECT * FROM students WHERE roll_number = ?",
+            f"SELECT {STUDENT_COLUMNS} FROM students WHERE roll_number = ?",
             (roll_number,)
         )
-        result = cursor.fetchone()
-        conn.close()
-        return result
+        return cursor.fetchone()
     
     def get_student_by_id(self, student_id):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT * FROM students WHERE student_id = ?",
-            (student_id,)
-        )
-        result = cursor.fetchone()
-        conn.close()
-        return result
+        """Get (student_id, user_id, name, roll_number, department), cached"""
+        student = self.student_cache.get(student_id)
+        if student is None:
+            cursor = self.connections.cursor()
+            cursor.execute(
+                f"SELECT {STUDENT_COLUMNS} FROM students WHERE student_id = ?",
+                (student_id,)
+            )
+            student = cursor.fetchone()
+            if student is not None:
+                self.student_cache.put(student)
+        return student
+    
+    def get_student_by_user_id(self, user_id):
+        """Get (student_id, user_id, name, roll_number, department) of a login, cached"""
+        student = self.student_cache.get_by_user_id(user_id)
+        if student is None:
+            cursor = self.connections.cursor()
+            cursor.execute(
+                f"SELECT {STUDENT_COLUMNS} FROM students WHERE user_id = ?",
+                (user_id,)
+            )
+            student = cursor.fetchone()
+            if student is not None:
+                self.student_cache.put(student)
+        return student
+    
+    def warm_student_cache(self):
+        """Load student records into the cache ahead of recognition (up to its size)"""
+        cursor = self.connections.cursor()
+        cursor.execute(f"SELECT {STUDENT_COLUMNS} FROM students LIMIT ?", (self.student_cache.maxsize,))
+        students = cursor.fetchall()
+        for student in students:
+            self.student_cache.put(student)
+        return len(students)
+    
+    def invalidate_student(self, student_id):
+        """Drop a student's cached record after changing or deleting it outside this class"""
+        self.student_cache.invalidate(student_id)
     
     def get_all_students(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.connections.cursor()
         cursor.execute("SELECT student_id, name, roll_number, department FROM students")
-        students = cursor.fetchall()
-        conn.close()
-        return students
+        return cursor.fetchall()
     
     def get_all_face_encodings(self):
         """Get all face encodings from the database for face recognition"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT student_id, face_encoding FROM students WHERE face_encoding IS NOT NULL")
-        results = cursor.fetchall()
-        conn.close()
-        return results  # Return raw data for processing by face detector
+        cursor = self.connections.cursor()
+        cursor.execute("SELECT student_id, template FROM face_templates")
+        return cursor.fetchall()  # Return raw data for processing by face detector
+    
+    def get_face_embeddings(self):
+        """Get (student_id, embedding) of the face samples with a cached encoding"""
+        cursor = self.connections.cursor()
+        cursor.execute(
+            """
+            SELECT t.student_id, e.embedding FROM face_embeddings e
+            JOIN face_templates t ON t.template_id = e.template_id
+            WHERE e.embedding IS NOT NULL
+            """
+        )
+        return cursor.fetchall()
+    
+    def get_unembedded_face_templates(self):
+        """Get (template_id, template) of the face samples not encoded yet"""
+        cursor = self.connections.cursor()
+        cursor.execute(
+            """
+            SELECT t.template_id, t.template FROM face_templates t
+            WHERE NOT EXISTS (SELECT 1 FROM face_embeddings e WHERE e.template_id = t.template_id)
+            """
+        )
+        return cursor.fetchall()
+    
+    def add_face_embeddings(self, embeddings):
+        """Cache (template_id, embedding) pairs and drop those of removed samples
+        
+        embedding is a KIND_EMBEDDING template, or None for a sample without a
+        usable face, so that it is not encoded again.
+        """
+        with self.connections.transaction() as cursor:
+            cursor.executemany(
+                "INSERT OR REPLACE INTO face_embeddings (template_id, embedding) VALUES (?, ?)",
+                embeddings
+            )
+            cursor.execute("DELETE FROM face_embeddings WHERE template_id NOT IN (SELECT template_id FROM face_templates)")
+    
+    def _log_face_change(self, cursor, student_id):
+        """Record that a student's face data changed (same transaction as the change)"""
+        cursor.execute("INSERT INTO face_changes (student_id) VALUES (?)", (student_id,))
+    
+    def get_face_set_state(self):
+        """Get (face_count, last_change_id, last_template_id) identifying the enrolled face set"""
+        cursor = self.connections.cursor()
+        cursor.execute("SELECT COUNT(*), COALESCE(MAX(template_id), 0) FROM face_templates")
+        face_count, last_template_id = cursor.fetchone()
+        cursor.execute("SELECT COALESCE(MAX(change_id), 0) FROM face_changes")
+        last_change_id = cursor.fetchone()[0]
+        return face_count, last_change_id, last_template_id
+    
+    def get_face_encodings_since(self, template_id):
+        """Get face samples added after the given template id"""
+        cursor = self.connections.cursor()
+        cursor.execute(
+            "SELECT student_id, template FROM face_templates WHERE template_id > ?",
+            (template_id,)
+        )
+        return cursor.fetchall()
     
     def mark_attendance(self, student_id, date, time, status="present"):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        return self.mark_attendance_batch([(student_id, date, time, status)])
+    
+    @metrics.timed("db_write")
+    def mark_attendance_batch(self, records):
+        """Mark (student_id, date, time, status) records in a single transaction"""
         try:
-            # Check if attendance already marked
-            cursor.execute(
-                "SELECT * FROM attendance WHERE student_id = ? AND date = ?",
-                (student_id, date)
-            )
-            if cursor.fetchone():
-                # Update existing attendance
-                cursor.execute(
-                    "UPDATE attendance SET time = ?, status = ? WHERE student_id = ? AND date = ?",
-                    (time, status, student_id, date)
+            with self.connections.transaction() as cursor:
+                # Add the day's attendance, or update it if already marked
+                cursor.executemany(
+                    """
+                    INSERT INTO attendance (student_id, date, time, status) VALUES (?, ?, ?, ?)
+                    ON CONFLICT (student_id, date) DO UPDATE SET time = excluded.time, status = excluded.status
+                    """,
+                    records
                 )
-            else:
-                # Add new attendance
-                cursor.execute(
-                    "INSERT INTO attendance (student_id, date, time, status) VALUES (?, ?, ?, ?)",
-                    (student_id, date, time, status)
-                )
-            conn.commit()
             return True
-        except:
+        except Exception as e:
+            print(f"Error marking attendance: {e}")
             return False
-        finally:
-            conn.close()
     
-    def get_attendance_report(self, from_date=None, to_date=None):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def get_student_attendance(self, student_id):
+        """Get the attendance history of one student, newest first"""
+        cursor = self.connections.cursor()
+        cursor.execute(
+            "SELECT date, time, status FROM attendance WHERE student_id = ? ORDER BY date DESC, time DESC",
+            (student_id,)
+        )
+        return cursor.fetchall()
+    
+    def get_attendance_report(self, from_date=None, to_date=None, department=None, status=None):
+        """Get the whole attendance report as a list (prefer iter_attendance_report for large ranges)"""
+        return list(self.iter_attendance_report(from_date, to_date, department, status))
+    
+    def iter_attendance_report(self, from_date=None, to_date=None, department=None, status=None,
+                               page_size=REPORT_PAGE_SIZE):
+        """Stream the attendance report row by row, reading page_size rows at a time"""
+        after = None
+        while True:
+            rows, after = self.get_attendance_report_page(
+                from_date, to_date, department, status, after, page_size
+            )
+            for row in rows:
+                yield row
+            if after is None:
+                return
+    
+    def get_attendance_report_page(self, from_date=None, to_date=None, department=None, status=None,
+                                   after=None, limit=REPORT_PAGE_SIZE):
+        """Get one page of the attendance report: (rows, key of the next page or None)
+        
+        Rows are (name, roll_number, department, date, time, status), newest
+        date first and by name within a day. Pages are found by key (the last
+        row's date, name and attendance id), not OFFSET, so every page costs
+        the same however deep into the report it is.
+        """
+        cursor = self.connections.cursor()
         
         query = """
-        SELECT s.name, s.roll_number, s.department, a.date, a.time, a.status
+        SELECT s.name, s.roll_number, s.department, a.date, a.time, a.status, a.attendance_id
         FROM attendance a
         JOIN students s ON a.student_id = s.student_id
         """
         
+        conditions = []
         params = []
+        lower = upper = None
         if from_date and to_date:
-            query += " WHERE a.date BETWEEN ? AND ?"
-            params = [from_date, to_date]
+            lower, upper = from_date, to_date
+        if after is not None:
+            date, name, attendance_id = after
+            # One upper bound on the date, so the index scan starts at the key's day
+            upper = date if upper is None else min(upper, date)
+            conditions.append("(a.date < ? OR (a.date = ? AND (s.name > ? OR (s.name = ? AND a.attendance_id > ?))))")
+            params += [date, date, name, name, attendance_id]
+        if lower is not None:
+            conditions.append("a.date >= ?")
+            params.append(lower)
+        if upper is not None:
+            conditions.append("a.date <= ?")
+            params.append(upper)
+        if department:
+            conditions.append("s.department = ?")
+            params.append(department)
+        if status:
+            conditions.append("a.status = ?")
+            params.append(status)
         
-        query += " ORDER BY a.date DESC, s.name"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY a.date DESC, s.name, a.attendance_id LIMIT ?"
+        params.append(limit)
         
         cursor.execute(query, params)
-        results = cursor.fetchall()
-        conn.close()
+        rows = cursor.fetchall()
         
-        return results 
\ No newline at end of file
+        next_key = None
+        if len(rows) == limit:
+            name, _, _, date, _, _, attendance_id = rows[-1]
+            next_key = (date, name, attendance_id)
+        return [row[:6] for row in rows], next_key
+    
+    def get_school_days(self, from_date, to_date):
+        """Number of days in the range on which any attendance was recorded"""
+        cursor = self.connections.cursor()
+        cursor.execute(
+            "SELECT COUNT(DISTINCT date) FROM daily_department_attendance WHERE date BETWEEN ? AND ?",
+            (from_date, to_date)
+        )
+        return cursor.fetchone()[0]
+    
+    def get_daily_attendance_summary(self, from_date, to_date, department=None):
+        """Get (date, present, absent) totals per day, newest first, from the rollup table"""
+        cursor = self.connections.cursor()
+        query = """
+        SELECT date, SUM(present), SUM(absent) FROM daily_department_attendance
+        WHERE date BETWEEN ? AND ?
+        """
+        params = [from_date, to_date]
+        if department:
+            query += " AND department = ?"
+            params.append(department)
+        query += " GROUP BY date ORDER BY date DESC"
+        cursor.execute(query, params)
+        return cursor.fetchall()
+    
+    def get_department_attendance_summary(self, from_date, to_date):
+        """Get (department, students, present, absent, attendance %) per department
+        
+        The percentage is present marks over students times school days.
+        """
+        school_days = self.get_school_days(from_date, to_date)
+        cursor = self.connections.cursor()
+        cursor.execute(
+            """
+            SELECT d.department, d.students, COALESCE(r.present, 0), COALESCE(r.absent, 0)
+            FROM (SELECT department, COUNT(*) AS students FROM students GROUP BY department) d
+            LEFT JOIN (
+                SELECT department, SUM(present) AS present, SUM(absent) AS absent
+                FROM daily_department_attendance WHERE date BETWEEN ? AND ?
+                GROUP BY department
+            ) r ON r.department = d.department
+            ORDER BY d.department
+            """,
+            (from_date, to_date)
+        )
+        return [
+            (department, students, present, absent, _percentage(present, students * school_days))
+            for department, students, present, absent in cursor.fetchall()
+        ]
+    
+    def get_student_attendance_summary(self, from_date, to_date, department=None, limit=None):
+        """Get (student_id, name, roll_number, department, present, absent, attendance %) per student
+        
+        Totals are kept per month, so the range covers the whole months of
+        from_date and to_date. Students come lowest attendance first.
+        """
+        from_month, to_month = from_date[:7], to_date[:7]
+        school_days = self.get_school_days(from_month + "-01", to_month + "-31")
+        cursor = self.connections.cursor()
+        
+        query = """
+        SELECT s.student_id, s.name, s.roll_number, s.department,
+               COALESCE(r.present, 0) AS present, COALESCE(r.absent, 0)
+        FROM students s
+        LEFT JOIN (
+            SELECT student_id, SUM(present) AS present, SUM(absent) AS absent
+            FROM student_monthly_attendance WHERE month BETWEEN ? AND ?
+            GROUP BY student_id
+        ) r ON r.student_id = s.student_id
+        """
+        params = [from_month, to_month]
+        if department:
+            query += " WHERE s.department = ?"
+            params.append(department)
+        query += " ORDER BY present, s.name"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        
+        cursor.execute(query, params)
+        return [row + (_percentage(row[4], school_days),) for row in cursor.fetchall()]
+    
+    def get_departments(self):
+        """Get the distinct departments of the enrolled students"""
+        cursor = self.connections.cursor()
+        cursor.execute("SELECT DISTINCT department FROM students ORDER BY department")
+        return [row[0] for row in cursor.fetchall()]
+
+def _percentage(count, total):
+    return round(100.0 * count / total, 1) if total else 0.0
@@ -0,0 +1,84 @@
+import struct
+
+# Binary face template stored in the database instead of a pickle:
+#
+#   magic "FTPL" | version u8 | kind u8 | dtype u8 | ndim u8 | shape u32 * ndim | raw array bytes
+#
+# All header fields are little-endian. The array bytes are C-ordered, so a
+# template decodes without copying through np.frombuffer.
+MAGIC = b'FTPL'
+VERSION = 1
+
+KIND_RAW_CROP = 1       # BGR face crop of any size, as captured
+KIND_GRAY_FACE = 2      # 100x100 preprocessed grayscale face (LBPH input)
+KIND_EMBEDDING = 3      # 128-d face_recognition encoding
+
+KIND_NAMES = {
+    KIND_RAW_CROP: 'raw_crop',
+    KIND_GRAY_FACE: 'gray_face',
+    KIND_EMBEDDING: 'embedding',
+}
+
+# numpy dtype strings; numpy itself is imported on first use so that the
+# database layer loads without it (it is on the application's startup path)
+DTYPES = {
+    1: '|u1',
+    2: '<f4',
+    3: '<f8',
+}
+DTYPE_CODES = {('u', 1): 1, ('f', 4): 2, ('f', 8): 3}
+
+_HEADER = struct.Struct('<4sBBBB')
+
+class TemplateError(ValueError):
+    """Raised for data that is not a valid face template"""
+
+def infer_kind(array):
+    """Guess the template kind of a face array"""
+    if array.ndim == 3:
+        return KIND_RAW_CROP
+    if array.ndim == 2:
+        return KIND_GRAY_FACE
+    if array.ndim == 1:
+        return KIND_EMBEDDING
+    raise TemplateError(f"Unsupported face array shape: {array.shape}")
+
+def encode_template(array, kind=None):
+    """Encode a face array as template bytes"""
+    import numpy as np
+    array = np.asarray(array)
+    dtype_code = DTYPE_CODES.get((array.dtype.kind, array.dtype.itemsize))
+    if dtype_code is None:
+        raise TemplateError(f"Unsupported face array dtype: {array.dtype}")
+    # Stored little-endian and C-ordered
+    array = np.ascontiguousarray(array, dtype=DTYPES[dtype_code])
+
+    kind = kind or infer_kind(array)
+    header = _HEADER.pack(MAGIC, VERSION, kind, dtype_code, array.ndim)
+    shape = struct.pack(f'<{array.ndim}I', *array.shape)
+    return header + shape + array.tobytes()
+
+def is_template(data):
+    """Whether the bytes start with a face template header"""
+    return data is not None and bytes(data[:4]) == MAGIC
+
+def decode_template(data):
+    """Decode template bytes into (kind, array)
+
+    The array is a read-only view on the given buffer; copy it before writing.
+    """
+    import numpy as np
+    if not is_template(data) or len(data) < _HEADER.size:
+        raise TemplateError("Not a face template")
+
+    _, version, kind, dtype_code, ndim = _HEADER.unpack_from(data)
+    if version != VERSION:
+        raise TemplateError(f"Unsupported face template version: {version}")
+    if kind not in KIND_NAMES or dtype_code not in DTYPES:
+        raise TemplateError("Corrupt face template header")
+
+    offset = _HEADER.size + 4 * ndim
+    shape = struct.unpack_from(f'<{ndim}I', data, _HEADER.size)
+    count = int(np.prod(shape))
+    array = np.frombuffer(data, dtype=DTYPES[dtype_code], count=count, offset=offset)
+    return kind, array.reshape(shape)
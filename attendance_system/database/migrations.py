@@ -0,0 +1,73 @@
+import os
+import re
+import sqlite3
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), 'migrations')
+# Version 1 is the original schema
+BASE_SCHEMA_PATH = os.path.join(os.path.dirname(__file__), 'schema.sql')
+
+_MIGRATION_FILE = re.compile(r'^(\d+)_\w+\.sql$')
+
+def get_migrations():
+    """List (version, path) of all schema migrations in order"""
+    migrations = [(1, BASE_SCHEMA_PATH)]
+    for name in os.listdir(MIGRATIONS_DIR):
+        match = _MIGRATION_FILE.match(name)
+        if match:
+            migrations.append((int(match.group(1)), os.path.join(MIGRATIONS_DIR, name)))
+    return sorted(migrations)
+
+def get_schema_version(conn):
+    """Current schema version of the database (0 for a new or unversioned one)"""
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS schema_version ("
+        "version INTEGER PRIMARY KEY, applied_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+    )
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+def split_statements(script):
+    """Split an SQL script into single statements (trigger bodies stay whole)"""
+    statements = []
+    statement = ""
+    for part in script.split(';'):
+        statement += part + ';'
+        if sqlite3.complete_statement(statement):
+            statements.append(statement)
+            statement = ""
+    return statements
+
+def apply_migrations(conn):
+    """Bring the database schema up to date, one transaction per migration
+
+    conn must be in autocommit mode (isolation_level None). Each migration
+    takes the write lock and checks schema_version again before running, so
+    processes starting at the same time apply it once. Returns the list of
+    versions that were applied.
+    """
+    current = get_schema_version(conn)
+    applied = []
+
+    for version, path in get_migrations():
+        if version <= current:
+            continue
+
+        with open(path, 'r') as f:
+            script = f.read()
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process may have applied it since the version was read
+            done = conn.execute("SELECT 1 FROM schema_version WHERE version = ?", (version,)).fetchone()
+            if done is None:
+                for statement in split_statements(script):
+                    conn.execute(statement)
+                conn.execute("INSERT INTO schema_version (version) VALUES (?)", (version,))
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        if done is None:
+            applied.append(version)
+
+    return applied
@@ -0,0 +1,12 @@
+-- One attendance row per student per day, so mark_attendance can upsert
+DELETE FROM attendance WHERE attendance_id NOT IN (
+    SELECT MAX(attendance_id) FROM attendance GROUP BY student_id, date
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_attendance_student_date ON attendance(student_id, date);
+
+-- Date range filter of the attendance report
+CREATE INDEX IF NOT EXISTS idx_attendance_date ON attendance(date);
+
+-- Student lookup by login
+CREATE INDEX IF NOT EXISTS idx_students_user_id ON students(user_id);
@@ -0,0 +1,104 @@
+-- Attendance totals kept up to date by triggers, so summaries never scan attendance
+
+-- Present/absent marks per day and department
+CREATE TABLE IF NOT EXISTS daily_department_attendance (
+    date TEXT NOT NULL,
+    department TEXT NOT NULL,
+    present INTEGER NOT NULL DEFAULT 0,
+    absent INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (date, department)
+) WITHOUT ROWID;
+
+-- Present/absent days per student and month (YYYY-MM)
+CREATE TABLE IF NOT EXISTS student_monthly_attendance (
+    student_id INTEGER NOT NULL,
+    month TEXT NOT NULL,
+    present INTEGER NOT NULL DEFAULT 0,
+    absent INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (student_id, month)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_student_monthly_attendance_month ON student_monthly_attendance(month);
+
+-- Totals of the attendance recorded so far
+INSERT INTO daily_department_attendance (date, department, present, absent)
+SELECT a.date, s.department, SUM(a.status = 'present'), SUM(a.status = 'absent')
+FROM attendance a JOIN students s ON a.student_id = s.student_id
+GROUP BY a.date, s.department;
+
+INSERT INTO student_monthly_attendance (student_id, month, present, absent)
+SELECT student_id, substr(date, 1, 7), SUM(status = 'present'), SUM(status = 'absent')
+FROM attendance
+GROUP BY student_id, substr(date, 1, 7);
+
+-- A mark is added to the totals of its day, department and month
+CREATE TRIGGER IF NOT EXISTS attendance_rollup_insert AFTER INSERT ON attendance
+BEGIN
+    INSERT INTO daily_department_attendance (date, department, present, absent)
+    SELECT NEW.date, department, NEW.status = 'present', NEW.status = 'absent'
+    FROM students WHERE student_id = NEW.student_id
+    ON CONFLICT (date, department) DO UPDATE SET
+        present = present + excluded.present, absent = absent + excluded.absent;
+
+    INSERT INTO student_monthly_attendance (student_id, month, present, absent)
+    VALUES (NEW.student_id, substr(NEW.date, 1, 7), NEW.status = 'present', NEW.status = 'absent')
+    ON CONFLICT (student_id, month) DO UPDATE SET
+        present = present + excluded.present, absent = absent + excluded.absent;
+END;
+
+-- A removed mark is taken out of them
+CREATE TRIGGER IF NOT EXISTS attendance_rollup_delete AFTER DELETE ON attendance
+BEGIN
+    UPDATE daily_department_attendance SET
+        present = present - (OLD.status = 'present'), absent = absent - (OLD.status = 'absent')
+    WHERE date = OLD.date
+      AND department = (SELECT department FROM students WHERE student_id = OLD.student_id);
+
+    UPDATE student_monthly_attendance SET
+        present = present - (OLD.status = 'present'), absent = absent - (OLD.status = 'absent')
+    WHERE student_id = OLD.student_id AND month = substr(OLD.date, 1, 7);
+END;
+
+-- A changed mark (e.g. mark_attendance's upsert changing the status) moves between totals
+CREATE TRIGGER IF NOT EXISTS attendance_rollup_update AFTER UPDATE OF student_id, date, status ON attendance
+BEGIN
+    UPDATE daily_department_attendance SET
+        present = present - (OLD.status = 'present'), absent = absent - (OLD.status = 'absent')
+    WHERE date = OLD.date
+      AND department = (SELECT department FROM students WHERE student_id = OLD.student_id);
+
+    UPDATE student_monthly_attendance SET
+        present = present - (OLD.status = 'present'), absent = absent - (OLD.status = 'absent')
+    WHERE student_id = OLD.student_id AND month = substr(OLD.date, 1, 7);
+
+    INSERT INTO daily_department_attendance (date, department, present, absent)
+    SELECT NEW.date, department, NEW.status = 'present', NEW.status = 'absent'
+    FROM students WHERE student_id = NEW.student_id
+    ON CONFLICT (date, department) DO UPDATE SET
+        present = present + excluded.present, absent = absent + excluded.absent;
+
+    INSERT INTO student_monthly_attendance (student_id, month, present, absent)
+    VALUES (NEW.student_id, substr(NEW.date, 1, 7), NEW.status = 'present', NEW.status = 'absent')
+    ON CONFLICT (student_id, month) DO UPDATE SET
+        present = present + excluded.present, absent = absent + excluded.absent;
+END;
+
+-- A student moving department takes their daily marks along
+CREATE TRIGGER IF NOT EXISTS students_rollup_department AFTER UPDATE OF department ON students
+WHEN OLD.department != NEW.department
+BEGIN
+    UPDATE daily_department_attendance SET
+        present = present - (SELECT COUNT(*) FROM attendance a WHERE a.student_id = NEW.student_id
+                             AND a.date = daily_department_attendance.date AND a.status = 'present'),
+        absent = absent - (SELECT COUNT(*) FROM attendance a WHERE a.student_id = NEW.student_id
+                           AND a.date = daily_department_attendance.date AND a.status = 'absent')
+    WHERE department = OLD.department
+      AND date IN (SELECT date FROM attendance WHERE student_id = NEW.student_id);
+
+    INSERT INTO daily_department_attendance (date, department, present, absent)
+    SELECT date, NEW.department, SUM(status = 'present'), SUM(status = 'absent')
+    FROM attendance WHERE student_id = NEW.student_id
+    GROUP BY date
+    ON CONFLICT (date, department) DO UPDATE SET
+        present = present + excluded.present, absent = absent + excluded.absent;
+END;
@@ -24,5 +24,31 @@ CREATE TABLE IF NOT EXISTS attendance (
     FOREIGN KEY (student_id) REFERENCES students(student_id)
 );
 
+-- Face samples used for recognition, several per student
+CREATE TABLE IF NOT EXISTS face_templates (
+    template_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_id INTEGER NOT NULL,
+    template BLOB NOT NULL,
+    quality REAL NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (student_id) REFERENCES students(student_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_face_templates_student ON face_templates(student_id);
+
+-- face_recognition encodings of the face samples, computed once per sample (NULL: no face found)
+CREATE TABLE IF NOT EXISTS face_embeddings (
+    template_id INTEGER PRIMARY KEY,
+    embedding BLOB,
+    FOREIGN KEY (template_id) REFERENCES face_templates(template_id)
+);
+
+-- Log of enrollment changes, used to update the recognizer model incrementally
+CREATE TABLE IF NOT EXISTS face_changes (
+    change_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_id INTEGER NOT NULL,
+    FOREIGN KEY (student_id) REFERENCES students(student_id)
+);
+
 -- Create default admin user
 INSERT OR IGNORE INTO users (username, password, role) VALUES ('admin', 'admin123', 'admin'); 
\ No newline at end of file
@@ -0,0 +1,90 @@
+import threading
+from collections import OrderedDict
+from attendance_system.utils import metrics
+
+# Students kept in memory; the least recently used are evicted beyond this
+STUDENT_CACHE_SIZE = 4096
+
+class StudentCache:
+    """Least-recently-used cache of student records, by student_id and by user_id
+
+    Records are the metadata rows of the students table (no face data).
+    Lookups that find nothing are not cached, so a student added later is
+    found without invalidation; changed or deleted students must be
+    invalidated.
+    """
+
+    def __init__(self, maxsize=STUDENT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        self.students = OrderedDict()  # student_id -> record
+        self.user_ids = {}             # user_id -> student_id
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, student_id):
+        """Cached record of a student, or None"""
+        with self.lock:
+            record = self.students.get(student_id)
+            if record is not None:
+                self.students.move_to_end(student_id)
+            self._count(record is not None)
+            return record
+
+    def get_by_user_id(self, user_id):
+        """Cached record of the student with this login, or None"""
+        with self.lock:
+            student_id = self.user_ids.get(user_id)
+            record = self.students.get(student_id) if student_id is not None else None
+            if record is not None:
+                self.students.move_to_end(student_id)
+            self._count(record is not None)
+            return record
+
+    def put(self, record):
+        """Cache a (student_id, user_id, ...) record"""
+        student_id, user_id = record[0], record[1]
+        with self.lock:
+            self._remove(student_id)
+            self.students[student_id] = record
+            if user_id is not None:
+                self.user_ids[user_id] = student_id
+            while len(self.students) > self.maxsize:
+                oldest = next(iter(self.students))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, student_id):
+        """Forget a student whose record changed or was deleted"""
+        with self.lock:
+            self._remove(student_id)
+
+    def clear(self):
+        with self.lock:
+            self.students.clear()
+            self.user_ids.clear()
+
+    def stats(self):
+        """Hits, misses, hit rate, evictions and size"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / float(lookups), 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "size": len(self.students),
+            }
+
+    def _remove(self, student_id):
+        record = self.students.pop(student_id, None)
+        if record is not None and self.user_ids.get(record[1]) == student_id:
+            del self.user_ids[record[1]]
+
+    def _count(self, hit):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        metrics.registry.inc("student_cache_hits" if hit else "student_cache_misses")
@@ -0,0 +1,68 @@
+import threading
+
+def roi_box(roi, frame_shape):
+    """Pixel (x, y, w, h) box of a region of interest given as fractions of the frame
+
+    roi is (x, y, w, h) with values between 0 and 1, e.g. (0.25, 0, 0.5, 1) for
+    the middle half of the image; None means the whole frame.
+    """
+    if roi is None:
+        return None
+    height, width = frame_shape[:2]
+    x, y, w, h = roi
+    x0 = min(max(int(x * width), 0), width - 1)
+    y0 = min(max(int(y * height), 0), height - 1)
+    x1 = min(max(int((x + w) * width), x0 + 1), width)
+    y1 = min(max(int((y + h) * height), y0 + 1), height)
+    return (x0, y0, x1 - x0, y1 - y0)
+
+class AdaptiveResolution:
+    """Choose the face detection width from the measured processing time
+
+    Each detection frame reports how long detection and recognition took. When
+    the moving average exceeds the time budget of target_fps the detection
+    width shrinks by step pixels; when it is well under budget the width grows
+    again, up to max_width, so small faces are found whenever there is time to.
+    A change waits for cooldown further measurements at the new width.
+    """
+
+    def __init__(self, target_fps=10, width=320, min_width=160, max_width=960, step=32,
+                 smoothing=0.2, cooldown=5):
+        self.budget = 1.0 / target_fps
+        self.width = width
+        self.min_width = min_width
+        self.max_width = max_width
+        self.step = step
+        self.smoothing = smoothing
+        self.cooldown = cooldown
+        self.average = None
+        self.samples = 0
+        self.lock = threading.Lock()
+
+    def update(self, seconds):
+        """Record one frame's processing time; returns the width to detect at next"""
+        with self.lock:
+            if self.average is None:
+                self.average = seconds
+            else:
+                self.average += self.smoothing * (seconds - self.average)
+            self.samples += 1
+            if self.samples < self.cooldown:
+                return self.width
+
+            width = self.width
+            if self.average > self.budget:
+                width = max(self.min_width, self.width - self.step)
+            elif self.average < 0.6 * self.budget:
+                width = min(self.max_width, self.width + self.step)
+
+            if width != self.width:
+                # Expected time at the new width, assuming time scales with pixel count
+                self.average *= (width / float(self.width)) ** 2
+                self.width = width
+                self.samples = 0
+            return self.width
+
+    def get_width(self):
+        with self.lock:
+            return self.width
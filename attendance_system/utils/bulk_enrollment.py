@@ -0,0 +1,192 @@
+import csv
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+# Manifest columns; username defaults to the roll number, photos to the student's own files
+MANIFEST_COLUMNS = ("name", "roll_number", "department", "username", "password", "photos")
+REQUIRED_COLUMNS = ("name", "roll_number", "department", "password")
+
+# Students written per database transaction
+INSERT_BATCH_SIZE = 500
+
+# Width photos are downscaled to for face detection; crops come from the full image
+DETECTION_WIDTH = 640
+
+# Longest side of a stored face crop, about what a camera enrollment yields
+MAX_FACE_SIZE = 256
+
+REPORT_COLUMNS = ("line", "roll_number", "photo", "error")
+
+def read_manifest(manifest_path, photo_dir):
+    """Read the enrollment manifest; returns (students, failures)
+
+    Each student is a dict of the manifest columns plus its line number and
+    the list of its photo paths. photos lists files (or directories of files)
+    relative to photo_dir, separated by ';'; when empty, the student's photos
+    are the directory named after the roll number or the files named
+    <roll_number>.<ext>. Failures are (line, roll_number, photo, error) rows.
+    """
+    students = []
+    failures = []
+    with open(manifest_path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+        missing = [column for column in REQUIRED_COLUMNS if column not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"Manifest is missing columns: {', '.join(missing)}")
+
+        for line, row in enumerate(reader, start=2):
+            student = {column: (row.get(column) or "").strip() for column in MANIFEST_COLUMNS}
+            student["line"] = line
+            student["username"] = student["username"] or student["roll_number"]
+
+            empty = [column for column in REQUIRED_COLUMNS if not student[column]]
+            if empty:
+                failures.append((line, student["roll_number"], "", f"Missing {', '.join(empty)}"))
+                continue
+
+            student["paths"] = find_photos(photo_dir, student["roll_number"], student["photos"])
+            if not student["paths"]:
+                failures.append((line, student["roll_number"], student["photos"], "No photos found"))
+                continue
+            students.append(student)
+    return students, failures
+
+def find_photos(photo_dir, roll_number, photos=""):
+    """Image paths of one student"""
+    if photos:
+        entries = [os.path.join(photo_dir, entry.strip()) for entry in photos.split(';') if entry.strip()]
+    else:
+        entries = [os.path.join(photo_dir, roll_number)]
+        if os.path.isdir(photo_dir):
+            entries += [os.path.join(photo_dir, name) for name in sorted(os.listdir(photo_dir))
+                        if os.path.splitext(name)[0] == roll_number and name != roll_number]
+
+    paths = []
+    for entry in entries:
+        if os.path.isdir(entry):
+            paths += [os.path.join(entry, name) for name in sorted(os.listdir(entry))
+                      if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS]
+        elif os.path.isfile(entry):
+            paths.append(entry)
+    return paths
+
+# Face detector of a worker process; only detection and cropping are needed, not the recognizer
+_detector = None
+
+def _init_worker(config):
+    global _detector
+    # Imported here so the parent process does not need OpenCV state to spawn
+    from attendance_system.utils.face_detectors import create_detector
+    try:
+        _detector = create_detector(config["face_detector"], **config["face_detector_options"])
+    except Exception as e:
+        print(f"Error loading face detector '{config['face_detector']}', using haar: {e}")
+        _detector = create_detector()
+
+def crop_faces(paths, width=DETECTION_WIDTH):
+    """Crop the largest face of each photo (worker process)
+
+    Returns ((face_crop, quality) samples, [(photo, error)] failures).
+    """
+    import cv2
+    from attendance_system.utils.frame_context import FrameContext
+    from attendance_system.utils.recognition_engine import enroll_sample
+
+    samples = []
+    failures = []
+    for path in paths:
+        frame = cv2.imread(path)
+        if frame is None:
+            failures.append((path, "Unreadable image"))
+            continue
+        try:
+            small_frame = FrameContext(frame).resized(width)
+            boxes = [tuple(int(v * small_frame.scale) for v in box) for box in _detector.detect(small_frame)]
+        except Exception as e:
+            failures.append((path, f"Detection failed: {e}"))
+            continue
+        if not boxes:
+            failures.append((path, "No face detected"))
+            continue
+        largest = max(boxes, key=lambda box: box[2] * box[3])
+        face, quality = enroll_sample(frame, largest)
+        if max(face.shape[:2]) > MAX_FACE_SIZE:
+            scale = MAX_FACE_SIZE / float(max(face.shape[:2]))
+            face = cv2.resize(face, (max(1, int(face.shape[1] * scale)), max(1, int(face.shape[0] * scale))),
+                              interpolation=cv2.INTER_AREA)
+        samples.append((face, quality))
+    return samples, failures
+
+def write_students(db, batch, failures):
+    """Add (student, samples) pairs in one transaction; returns the number added
+
+    Students the database skipped are added to failures at their manifest line.
+    """
+    added, skipped = db.add_students_bulk(
+        [(s["username"], s["password"], s["name"], s["roll_number"], s["department"], samples)
+         for s, samples in batch]
+    )
+    # Skips are reported by position, as a roll number can appear more than once in a batch
+    for index, reason in skipped:
+        student = batch[index][0]
+        failures.append((student["line"], student["roll_number"], "", reason))
+    return len(added)
+
+def enroll_students(db, manifest_path, photo_dir, config, engine=None, workers=None,
+                    width=DETECTION_WIDTH, progress=None, should_stop=None):
+    """Enroll every student of a manifest; returns (enrolled count, failures)
+
+    Faces are cropped in a process pool, students are written INSERT_BATCH_SIZE
+    at a time in one transaction each, and the recognition model (if an engine
+    is given) is brought up to date once at the end. progress(done, total) is
+    called every 50 students. Failures are (line, roll_number, photo, error)
+    rows, one per failed photo or student.
+
+    should_stop() is checked after each student; once it returns True, photos
+    not being cropped yet are dropped, the pending batch is not written and
+    the model is not updated (batches already written stay enrolled).
+    """
+    students, failures = read_manifest(manifest_path, photo_dir)
+    total = len(students)
+    enrolled = 0
+    batch = []
+    stopped = False
+
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker, initargs=(config,)) as pool:
+        results = pool.map(crop_faces, [s["paths"] for s in students], [width] * total, chunksize=4)
+        for done, (student, (samples, photo_failures)) in enumerate(zip(students, results), start=1):
+            if should_stop and should_stop():
+                pool.shutdown(wait=False, cancel_futures=True)
+                stopped = True
+                break
+
+            failures.extend((student["line"], student["roll_number"], path, error)
+                            for path, error in photo_failures)
+            if samples:
+                batch.append((student, samples))
+            else:
+                failures.append((student["line"], student["roll_number"], "", "No usable face photo"))
+
+            if len(batch) >= INSERT_BATCH_SIZE:
+                enrolled += write_students(db, batch, failures)
+                batch = []
+            if progress and (done % 50 == 0 or done == total):
+                progress(done, total)
+        if batch and not stopped:
+            enrolled += write_students(db, batch, failures)
+
+    # One model update for all the new face samples
+    if engine is not None and enrolled and not stopped:
+        engine.sync(db)
+    return enrolled, failures
+
+def write_report(failures, path):
+    """Write the failures of an enrollment run to a CSV file"""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(REPORT_COLUMNS)
+        writer.writerows(sorted(failures, key=lambda failure: failure[0]))
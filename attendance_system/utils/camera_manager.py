@@ -0,0 +1,223 @@
+import threading
+import time
+from attendance_system.utils.ui_utils import VideoCapture, LatestFrame, StageTimer
+from attendance_system.utils import metrics
+
+class FairFrameQueue:
+    """Shared inference queue holding at most one pending frame per camera
+
+    A camera's newer frame replaces its pending one, so the queue is bounded by
+    the number of cameras and never serves stale frames. Cameras are served
+    round-robin: the camera served last goes to the back of the line, so a
+    fast camera cannot starve the others.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.pending = {}
+        self.order = []
+        self.closed = False
+
+    def add_camera(self, camera_id):
+        with self.condition:
+            self.order.append(camera_id)
+
+    def put(self, camera_id, frame_id, frame, timestamp):
+        """Queue a camera's newest frame; returns True if it replaced an unserved one"""
+        with self.condition:
+            replaced = camera_id in self.pending
+            self.pending[camera_id] = (frame_id, frame, timestamp)
+            metrics.registry.set_gauge("inference_queue_depth", len(self.pending))
+            self.condition.notify()
+            return replaced
+
+    def get(self, timeout=0.5):
+        """Next (camera_id, frame_id, frame, timestamp) in round-robin order, None on timeout"""
+        with self.condition:
+            self.condition.wait_for(lambda: self.pending or self.closed, timeout)
+            if self.closed:
+                return None
+            for i, camera_id in enumerate(self.order):
+                if camera_id in self.pending:
+                    self.order.append(self.order.pop(i))
+                    return (camera_id,) + self.pending.pop(camera_id)
+            return None
+
+    def close(self):
+        """Wake up all waiting inference threads"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+class Camera:
+    """One camera of a CameraManager: its device, newest frame, detections and counters"""
+
+    def __init__(self, camera_id, source):
+        self.camera_id = camera_id
+        self.source = source
+        self.capture = VideoCapture(source)
+        self.latest = LatestFrame()
+        self.detections = None
+        self.detections_frame_id = 0
+        self.lock = threading.Lock()
+        self.counters = {"captured": 0, "inferred": 0, "dropped": 0}
+        self.timers = {name: StageTimer() for name in ("inference", "latency")}
+
+    def count(self, name):
+        with self.lock:
+            self.counters[name] += 1
+
+class CameraManager:
+    """Run several cameras concurrently on one shared recognition backend
+
+    Each camera has a capture thread and a render thread. Capture threads feed
+    a shared FairFrameQueue; a fixed number of inference threads serve it with
+    infer(camera_id, frame) -> detections, so all cameras share the loaded
+    model and the inference load is bounded whatever the number of cameras.
+    Render threads draw each camera's last detections on its fresh frames
+    with render(camera_id, frame, detections) and pass them to
+    callback(camera_id, frame). A frame replaced in the queue before being
+    served counts as dropped.
+    """
+
+    def __init__(self, infer, render, callback):
+        self.infer = infer
+        self.render = render
+        self.callback = callback
+        self.cameras = {}
+        self.queue = FairFrameQueue()
+        self.threads = []
+        self.is_running = False
+        self.stats_lock = threading.Lock()
+        self.last_stats = None
+
+    def add_camera(self, camera_id, source):
+        """Open a camera; returns False (and leaves it out) if it cannot be opened"""
+        camera = Camera(camera_id, source)
+        try:
+            camera.capture.start()
+        except Exception as e:
+            print(f"Error opening camera {source}: {e}")
+            return False
+
+        self.cameras[camera_id] = camera
+        self.queue.add_camera(camera_id)
+        return True
+
+    def frame_shape(self):
+        """Largest (height, width, 3) frame shape of the opened cameras"""
+        height = max((c.capture.height for c in self.cameras.values()), default=0)
+        width = max((c.capture.width for c in self.cameras.values()), default=0)
+        return (height, width, 3)
+
+    def start(self, inference_threads=1):
+        """Start the capture, render and shared inference threads"""
+        self.is_running = True
+        self.last_stats = (time.perf_counter(), self._snapshot())
+        stages = []
+        for camera in self.cameras.values():
+            stages += [(self._grab, (camera,)), (self._render, (camera,))]
+        stages += [(self._infer, ())] * inference_threads
+        for target, args in stages:
+            thread = threading.Thread(target=target, args=args, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def stop(self):
+        """Stop all threads and release the cameras"""
+        self.is_running = False
+        self.queue.close()
+        for camera in self.cameras.values():
+            camera.latest.close()
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+        for camera in self.cameras.values():
+            camera.capture.stop()
+
+    def _grab(self, camera):
+        """Capture thread: read frames as fast as the camera delivers them"""
+        frame_id = 0
+        while self.is_running:
+            frame = camera.capture.get_frame()
+            if frame is None:
+                time.sleep(0.01)
+                continue
+            frame_id += 1
+            camera.count("captured")
+            camera.latest.put(frame)
+            if self.queue.put(camera.camera_id, frame_id, frame, time.perf_counter()):
+                camera.count("dropped")
+                metrics.registry.inc("frames_dropped")
+
+    def _infer(self):
+        """Inference thread: serve the shared queue, cameras in turn"""
+        while self.is_running:
+            item = self.queue.get()
+            if item is None:
+                continue
+            camera_id, frame_id, frame, _ = item
+            camera = self.cameras[camera_id]
+
+            start = time.perf_counter()
+            try:
+                detections = self.infer(camera_id, frame)
+            except Exception as e:
+                print(f"Error recognizing faces on camera {camera_id}: {e}")
+                continue
+            elapsed = time.perf_counter() - start
+            camera.timers["inference"].add(elapsed)
+            camera.count("inferred")
+            metrics.registry.observe("inference", elapsed)
+            metrics.registry.inc("frames_inferred")
+            with camera.lock:
+                # Several inference threads can finish one camera's frames out of order
+                if frame_id > camera.detections_frame_id:
+                    camera.detections = detections
+                    camera.detections_frame_id = frame_id
+
+    def _render(self, camera):
+        """Render thread: overlay the camera's last detections on each fresh frame"""
+        last_id = 0
+        while self.is_running:
+            item = camera.latest.get_newer(last_id)
+            if item is None:
+                continue
+            last_id, frame, captured_at = item
+            with camera.lock:
+                detections = camera.detections
+            # The frame is shared with inference: render must draw on its own copy
+            with metrics.timer("render"):
+                self.callback(camera.camera_id, self.render(camera.camera_id, frame, detections))
+            camera.timers["latency"].add(time.perf_counter() - captured_at)
+            metrics.registry.observe("latency", time.perf_counter() - captured_at)
+
+    def _snapshot(self):
+        snapshot = {}
+        for camera_id, camera in self.cameras.items():
+            with camera.lock:
+                snapshot[camera_id] = dict(camera.counters)
+        return snapshot
+
+    def get_stats(self):
+        """Per-camera capture and recognition FPS since the last call, and drop rate"""
+        with self.stats_lock:
+            now = time.perf_counter()
+            snapshot = self._snapshot()
+            last_time, last_snapshot = self.last_stats or (now, snapshot)
+            self.last_stats = (now, snapshot)
+
+        elapsed = max(now - last_time, 1e-9)
+        stats = {}
+        for camera_id, counters in snapshot.items():
+            previous = last_snapshot.get(camera_id, counters)
+            camera = self.cameras[camera_id]
+            stats[camera_id] = {
+                "capture_fps": round((counters["captured"] - previous["captured"]) / elapsed, 1),
+                "inference_fps": round((counters["inferred"] - previous["inferred"]) / elapsed, 1),
+                "drop_rate": round(counters["dropped"] / float(counters["captured"] or 1), 3),
+                "dropped_frames": counters["dropped"],
+                "inference_ms": round(camera.timers["inference"].average_ms, 2),
+                "latency_ms": round(camera.timers["latency"].average_ms, 2),
+            }
+        return stats
@@ -0,0 +1,158 @@
+import abc
+import os
+import threading
+import cv2
+import numpy as np
+from attendance_system.utils.frame_context import as_context
+
+# Model files of the non-Haar detectors are bundled locally, never downloaded:
+#   lbpcascade_frontalface_improved.xml           (opencv/data/lbpcascades)
+#   deploy.prototxt
+#   res10_300x300_ssd_iter_140000.caffemodel      (opencv/samples/dnn/face_detector)
+#   face_detection_yunet_2023mar.onnx             (opencv_zoo/models/face_detection_yunet)
+DETECTOR_MODEL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models', 'detectors')
+
+def detector_model_path(file_name):
+    """Path of a bundled detector model file, which must exist"""
+    path = file_name if os.path.isabs(file_name) else os.path.join(DETECTOR_MODEL_DIR, file_name)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Face detector model not found: {path}")
+    return path
+
+class FaceDetectorBackend(abc.ABC):
+    """Base class of the face detectors: detect(frame) -> [(x, y, w, h), ...]
+
+    input_width sets the resolution the detector works at: frames wider than
+    that are downscaled first and the boxes scaled back to frame coordinates.
+    None detects at full resolution.
+    """
+
+    name = None
+
+    def __init__(self, input_width=None):
+        self.input_width = input_width
+
+    def detect(self, frame):
+        """Detect faces in a frame (array or FrameContext)"""
+        frame = as_context(frame)
+        small = frame.resized(self.input_width)
+        boxes = self._detect(small)
+        if small is frame:
+            return boxes
+
+        scale = small.scale / frame.scale
+        return [(int(x * scale), int(y * scale), int(w * scale), int(h * scale)) for (x, y, w, h) in boxes]
+
+    @abc.abstractmethod
+    def _detect(self, frame):
+        """Detect faces in a FrameContext at its own resolution"""
+
+class HaarDetector(FaceDetectorBackend):
+    """OpenCV Haar cascade, the original detector"""
+
+    name = 'haar'
+    cascade_file = 'haarcascade_frontalface_default.xml'
+
+    def __init__(self, input_width=None, scale_factor=1.1, min_neighbors=4, min_size=None, cascade_file=None):
+        super().__init__(input_width)
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.min_size = tuple(min_size) if min_size else None
+        self.cascade = cv2.CascadeClassifier(self._cascade_path(cascade_file or self.cascade_file))
+
+    def _cascade_path(self, cascade_file):
+        return cv2.data.haarcascades + cascade_file
+
+    def _detect(self, frame):
+        if self.min_size:
+            faces = self.cascade.detectMultiScale(frame.gray, self.scale_factor, self.min_neighbors, minSize=self.min_size)
+        else:
+            faces = self.cascade.detectMultiScale(frame.gray, self.scale_factor, self.min_neighbors)
+        return [tuple(int(v) for v in face) for face in faces]
+
+class LBPCascadeDetector(HaarDetector):
+    """OpenCV LBP cascade: several times faster than Haar, slightly less accurate"""
+
+    name = 'lbp'
+    cascade_file = 'lbpcascade_frontalface_improved.xml'
+
+    def _cascade_path(self, cascade_file):
+        return detector_model_path(cascade_file)
+
+class DnnSsdDetector(FaceDetectorBackend):
+    """OpenCV DNN ResNet-10 SSD face detector (Caffe), run on CPU"""
+
+    name = 'dnn'
+
+    def __init__(self, input_width=300, confidence=0.5,
+                 prototxt='deploy.prototxt', model='res10_300x300_ssd_iter_140000.caffemodel'):
+        # The network input is input_width square; the frame is resized by blobFromImage
+        super().__init__(None)
+        self.input_size = (input_width, input_width)
+        self.confidence = confidence
+        self.net = cv2.dnn.readNetFromCaffe(detector_model_path(prototxt), detector_model_path(model))
+        self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+        # setInput/forward keep state on the network; the camera and enrollment threads share it
+        self.lock = threading.Lock()
+
+    def _detect(self, frame):
+        h, w = frame.shape[:2]
+        blob = cv2.dnn.blobFromImage(frame.frame, 1.0, self.input_size, (104.0, 177.0, 123.0))
+        with self.lock:
+            self.net.setInput(blob)
+            detections = self.net.forward()[0, 0]
+
+        boxes = []
+        for detection in detections[detections[:, 2] >= self.confidence]:
+            x1, y1, x2, y2 = np.clip(detection[3:7], 0.0, 1.0) * [w, h, w, h]
+            if x2 > x1 and y2 > y1:
+                boxes.append((int(x1), int(y1), int(x2 - x1), int(y2 - y1)))
+        return boxes
+
+class YuNetDetector(FaceDetectorBackend):
+    """OpenCV YuNet (cv2.FaceDetectorYN): fast CNN detector, handles angled faces"""
+
+    name = 'yunet'
+
+    def __init__(self, input_width=320, score_threshold=0.7, nms_threshold=0.3, top_k=500,
+                 model='face_detection_yunet_2023mar.onnx'):
+        super().__init__(input_width)
+        self.detector = cv2.FaceDetectorYN.create(
+            detector_model_path(model), "", (320, 320), score_threshold, nms_threshold, top_k
+        )
+        self.current_size = None
+        # Resizing the input and detecting must not interleave between threads
+        self.lock = threading.Lock()
+
+    def _detect(self, frame):
+        h, w = frame.shape[:2]
+        with self.lock:
+            if self.current_size != (w, h):
+                self.detector.setInputSize((w, h))
+                self.current_size = (w, h)
+            _, faces = self.detector.detect(frame.frame)
+        if faces is None:
+            return []
+
+        boxes = []
+        # Faces at the frame edge get boxes partly outside it
+        for x, y, fw, fh in faces[:, :4]:
+            x1, y1 = np.clip([x, y], 0, [w, h])
+            x2, y2 = np.clip([x + fw, y + fh], 0, [w, h])
+            if x2 > x1 and y2 > y1:
+                boxes.append((int(x1), int(y1), int(x2 - x1), int(y2 - y1)))
+        return boxes
+
+DETECTOR_TYPES = {
+    HaarDetector.name: HaarDetector,
+    LBPCascadeDetector.name: LBPCascadeDetector,
+    DnnSsdDetector.name: DnnSsdDetector,
+    YuNetDetector.name: YuNetDetector,
+}
+
+def create_detector(name='haar', **options):
+    """Create a face detector backend by name ('haar', 'lbp', 'dnn' or 'yunet')"""
+    if name not in DETECTOR_TYPES:
+        raise ValueError(f"Unknown face detector: {name}")
+    return DETECTOR_TYPES[name](**options)
@@ -0,0 +1,78 @@
+import numpy as np
+from attendance_system.utils.face_index import create_index, load_index
+
+ENCODING_SIZE = 128
+
+class FaceGallery:
+    """Resident set of enrolled face encodings for batched matching
+
+    Encodings are kept in one contiguous float32 matrix with a parallel array of
+    student ids, inside a search index ('brute' for exact search, 'ivf' for
+    approximate search on large galleries), so every face in a frame is matched
+    in one call instead of a Python loop over the gallery per face.
+    """
+
+    def __init__(self, encoding_size=ENCODING_SIZE, index_kind='brute', **index_options):
+        self.encoding_size = encoding_size
+        self.index_kind = index_kind
+        self.index_options = index_options
+        self.reset()
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def encodings(self):
+        return self.index.encodings
+
+    @property
+    def student_ids(self):
+        return self.index.student_ids
+
+    def reset(self):
+        """Empty the gallery, keeping the configured index type"""
+        self.index = create_index(self.index_kind, encoding_size=self.encoding_size, **self.index_options)
+
+    def load(self, student_ids, encodings):
+        """Replace the gallery contents with the given ids and encodings"""
+        self.index.build(student_ids, encodings)
+
+    def add(self, student_id, encoding):
+        """Add (or replace) the encoding of one student"""
+        self.index.remove(student_id)
+        self.index.add(student_id, encoding)
+
+    def remove(self, student_id):
+        """Remove every encoding of a student"""
+        self.index.remove(student_id)
+
+    def save(self, path):
+        """Save the gallery and its index next to the database"""
+        self.index.save(path)
+
+    def load_saved(self, path):
+        """Replace the gallery with one saved by save(); False if none exists"""
+        index = load_index(path, self.index_kind, encoding_size=self.encoding_size, **self.index_options)
+        if index is None:
+            return False
+        self.index = index
+        return True
+
+    def match(self, probes, tolerance=0.6):
+        """Match a batch of probe encodings against the gallery
+
+        Returns one (student_id, distance) pair per probe, with student_id -1 when
+        the nearest enrolled face is farther than the tolerance.
+        """
+        probes = np.asarray(probes, dtype=np.float32).reshape(-1, self.encoding_size)
+        if len(probes) == 0:
+            return []
+
+        ids, distances = self.index.search(probes)
+        results = []
+        for student_id, distance in zip(ids, distances):
+            if distance <= tolerance:
+                results.append((int(student_id), float(distance)))
+            else:
+                results.append((-1, float(distance)))
+        return results
@@ -0,0 +1,248 @@
+import os
+import numpy as np
+
+INDEX_FILE_NAME = 'face_index.npz'
+
+def default_index_path(db_path):
+    """Location of the saved face index, next to the attendance database"""
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), INDEX_FILE_NAME)
+
+def squared_norms(vectors):
+    """Row-wise squared L2 norms"""
+    return np.einsum('ij,ij->i', vectors, vectors)
+
+def pairwise_distances(probes, encodings, encoding_sq_norms=None):
+    """Euclidean distance matrix between probes (M x D) and encodings (N x D)"""
+    if encoding_sq_norms is None:
+        encoding_sq_norms = squared_norms(encodings)
+    # |p - g|^2 = |p|^2 + |g|^2 - 2 p.g, computed for all pairs in one product
+    sq = squared_norms(probes)[:, None] + encoding_sq_norms[None, :]
+    sq -= 2.0 * (probes @ encodings.T)
+    np.maximum(sq, 0.0, out=sq)
+    return np.sqrt(sq)
+
+class BruteForceIndex:
+    """Exact nearest-neighbour search over every enrolled encoding"""
+
+    kind = 'brute'
+
+    def __init__(self, encoding_size=128):
+        self.encoding_size = encoding_size
+        self.encodings = np.empty((0, encoding_size), dtype=np.float32)
+        self.student_ids = np.empty(0, dtype=np.int64)
+        self.sq_norms = np.empty(0, dtype=np.float32)
+        # get_face_set_state() of the database the index was built from
+        self.face_set_state = None
+
+    def __len__(self):
+        return len(self.student_ids)
+
+    def build(self, student_ids, encodings):
+        """Index the given ids and encodings, replacing the current contents"""
+        encodings = np.ascontiguousarray(encodings, dtype=np.float32).reshape(-1, self.encoding_size)
+        student_ids = np.asarray(student_ids, dtype=np.int64).reshape(-1)
+        if len(encodings) != len(student_ids):
+            raise ValueError("student_ids and encodings must have the same length")
+
+        self.encodings = encodings
+        self.student_ids = student_ids
+        self.sq_norms = squared_norms(encodings)
+
+    def add(self, student_id, encoding):
+        """Add one encoding"""
+        encoding = np.asarray(encoding, dtype=np.float32).reshape(1, self.encoding_size)
+        self.build(np.append(self.student_ids, student_id), np.vstack([self.encodings, encoding]))
+
+    def remove(self, student_id):
+        """Remove every encoding of a student"""
+        keep = self.student_ids != student_id
+        if not keep.all():
+            self.build(self.student_ids[keep], self.encodings[keep])
+
+    def search(self, probes):
+        """Nearest neighbour of each probe as (student_ids, distances) arrays"""
+        probes = np.asarray(probes, dtype=np.float32).reshape(-1, self.encoding_size)
+        if len(self) == 0:
+            return np.full(len(probes), -1, dtype=np.int64), np.full(len(probes), np.inf, dtype=np.float32)
+
+        dist = pairwise_distances(probes, self.encodings, self.sq_norms)
+        best = np.argmin(dist, axis=1)
+        return self.student_ids[best], dist[np.arange(len(probes)), best]
+
+    def _state(self):
+        return {'student_ids': self.student_ids, 'encodings': self.encodings}
+
+    def _restore(self, state):
+        """Rebuild from a saved state; False if it does not fit this index's settings"""
+        if state['encodings'].ndim != 2 or state['encodings'].shape[1] != self.encoding_size:
+            return False
+        self.build(state['student_ids'], state['encodings'])
+        return True
+
+    def save(self, path):
+        """Save the index to an .npz file"""
+        state = self._state()
+        if self.face_set_state is not None:
+            state['face_set_state'] = np.asarray(self.face_set_state, dtype=np.int64)
+        np.savez(path, kind=self.kind, **state)
+
+class IVFIndex(BruteForceIndex):
+    """Approximate search over k-means partitions of the gallery (inverted file)
+
+    Encodings are clustered into n_lists partitions; a probe is compared only
+    with the encodings in its n_probe nearest partitions. n_probe is the
+    recall-vs-latency knob: n_probe == n_lists is exact search.
+    """
+
+    kind = 'ivf'
+
+    def __init__(self, encoding_size=128, n_lists=None, n_probe=8, n_iter=10, seed=0):
+        super().__init__(encoding_size)
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.n_iter = n_iter
+        self.seed = seed
+        self.centroids = np.empty((0, encoding_size), dtype=np.float32)
+        self.assignments = np.empty(0, dtype=np.int64)
+        self.offsets = np.zeros(1, dtype=np.int64)
+
+    def build(self, student_ids, encodings, centroids=None):
+        """Cluster the encodings and lay them out contiguously per partition"""
+        super().build(student_ids, encodings)
+        if centroids is None:
+            centroids = self._train_centroids(self.encodings)
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float32).reshape(-1, self.encoding_size)
+        self._assign()
+
+    def add(self, student_id, encoding):
+        """Add one encoding to its nearest partition without reclustering"""
+        encoding = np.asarray(encoding, dtype=np.float32).reshape(1, self.encoding_size)
+        centroids = self.centroids if len(self.centroids) else None
+        self.build(np.append(self.student_ids, student_id), np.vstack([self.encodings, encoding]), centroids)
+
+    def remove(self, student_id):
+        """Remove every encoding of a student, keeping the partitions"""
+        keep = self.student_ids != student_id
+        if not keep.all():
+            centroids = self.centroids if len(self.centroids) else None
+            self.build(self.student_ids[keep], self.encodings[keep], centroids)
+
+    def _train_centroids(self, encodings):
+        """Plain k-means on (a sample of) the encodings"""
+        if len(encodings) == 0:
+            return np.empty((0, self.encoding_size), dtype=np.float32)
+
+        n_lists = self.n_lists or int(np.sqrt(len(encodings)))
+        n_lists = max(1, min(n_lists, len(encodings)))
+
+        rng = np.random.default_rng(self.seed)
+        # A few hundred points per partition are enough to place the centroids
+        sample_size = min(len(encodings), n_lists * 256)
+        sample = encodings[rng.choice(len(encodings), sample_size, replace=False)]
+        centroids = sample[rng.choice(sample_size, n_lists, replace=False)].copy()
+
+        for _ in range(self.n_iter):
+            labels = np.argmin(pairwise_distances(sample, centroids), axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            counts = np.bincount(labels, minlength=n_lists)
+            filled = counts > 0
+            # Empty partitions keep their previous centroid
+            centroids[filled] = sums[filled] / counts[filled, None]
+
+        return centroids
+
+    def _assign(self):
+        """Assign every encoding to a partition and sort the rows by partition"""
+        n_lists = len(self.centroids)
+        if len(self.encodings) == 0 or n_lists == 0:
+            self.assignments = np.empty(0, dtype=np.int64)
+            self.offsets = np.zeros(n_lists + 1, dtype=np.int64)
+            return
+
+        assignments = np.argmin(pairwise_distances(self.encodings, self.centroids), axis=1)
+        order = np.argsort(assignments, kind='stable')
+        self.encodings = np.ascontiguousarray(self.encodings[order])
+        self.student_ids = self.student_ids[order]
+        self.sq_norms = self.sq_norms[order]
+        self.assignments = assignments[order]
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(self.assignments, minlength=n_lists))])
+
+    def search(self, probes, n_probe=None):
+        """Approximate nearest neighbour of each probe as (student_ids, distances)"""
+        probes = np.asarray(probes, dtype=np.float32).reshape(-1, self.encoding_size)
+        ids = np.full(len(probes), -1, dtype=np.int64)
+        distances = np.full(len(probes), np.inf, dtype=np.float32)
+        if len(self) == 0:
+            return ids, distances
+
+        n_lists = len(self.centroids)
+        n_probe = min(n_probe or self.n_probe, n_lists)
+        centroid_dist = pairwise_distances(probes, self.centroids)
+        if n_probe < n_lists:
+            probed = np.argpartition(centroid_dist, n_probe - 1, axis=1)[:, :n_probe]
+        else:
+            probed = np.broadcast_to(np.arange(n_lists), (len(probes), n_lists))
+
+        for i, lists in enumerate(probed):
+            rows = np.concatenate([np.arange(self.offsets[l], self.offsets[l + 1]) for l in lists])
+            if len(rows) == 0:
+                continue
+            dist = pairwise_distances(probes[i:i + 1], self.encodings[rows], self.sq_norms[rows])[0]
+            best = np.argmin(dist)
+            ids[i] = self.student_ids[rows[best]]
+            distances[i] = dist[best]
+
+        return ids, distances
+
+    def _state(self):
+        state = super()._state()
+        state.update(centroids=self.centroids)
+        return state
+
+    def _restore(self, state):
+        # n_probe is a search setting and stays as configured; other partition counts need reclustering
+        encodings, centroids = state['encodings'], state['centroids']
+        if encodings.ndim != 2 or encodings.shape[1] != self.encoding_size:
+            return False
+        if self.n_lists and len(encodings) and len(centroids) != max(1, min(self.n_lists, len(encodings))):
+            return False
+        self.build(state['student_ids'], encodings, centroids)
+        return True
+
+INDEX_TYPES = {
+    BruteForceIndex.kind: BruteForceIndex,
+    IVFIndex.kind: IVFIndex,
+}
+
+def create_index(kind='brute', **kwargs):
+    """Create an empty index of the given kind ('brute' or 'ivf')"""
+    if kind not in INDEX_TYPES:
+        raise ValueError(f"Unknown face index type: {kind}")
+    return INDEX_TYPES[kind](**kwargs)
+
+def load_index(path, kind=None, **kwargs):
+    """Load an index saved with save(), or None if there is no usable file
+
+    kwargs are the settings of the index (as for create_index); a saved index
+    of another kind, or one that does not fit the settings, is not usable.
+    """
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with np.load(path) as data:
+            state = {key: data[key] for key in data.files}
+        saved_kind = str(state.pop('kind'))
+        if kind is not None and saved_kind != kind:
+            return None
+        index = create_index(saved_kind, **kwargs)
+        face_set_state = state.pop('face_set_state', None)
+        if not index._restore(state):
+            return None
+        if face_set_state is not None:
+            index.face_set_state = tuple(int(v) for v in face_set_state)
+        return index
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error loading face index: {e}")
+        return None
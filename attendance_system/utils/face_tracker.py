@@ -0,0 +1,144 @@
+import itertools
+import threading
+from collections import Counter
+
+def box_iou(a, b):
+    """Intersection over union of two (x, y, w, h) boxes"""
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    iw = min(ax + aw, bx + bw) - max(ax, bx)
+    ih = min(ay + ah, by + bh) - max(ay, by)
+    if iw <= 0 or ih <= 0:
+        return 0.0
+    inter = iw * ih
+    return inter / float(aw * ah + bw * bh - inter)
+
+def box_shift(a, b):
+    """Distance between the centres of two (x, y, w, h) boxes, relative to the first one's width"""
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    dx = (bx + bw / 2.0) - (ax + aw / 2.0)
+    dy = (by + bh / 2.0) - (ay + ah / 2.0)
+    return (dx * dx + dy * dy) ** 0.5 / max(aw, 1)
+
+class Track:
+    """A face followed across frames"""
+    def __init__(self, track_id, box, frame_index):
+        self.track_id = track_id
+        self.box = box
+        self.last_seen = frame_index
+        # Whether the box moved noticeably on the last detection
+        self.moved = False
+        self.last_recognized = None
+        self.votes = Counter()
+        self.identity = None
+
+class FaceTracker:
+    """Associate face boxes across frames by IoU and vote on each track's identity
+
+    A face is recognized on every frame until its track has min_votes votes,
+    then only every reverify_interval frames, so a person standing in front of
+    the camera costs a handful of recognizer calls instead of one per frame.
+    The identity is the student with most votes once it has min_votes votes and
+    at least min_agreement of them; it is reported once per track. A track
+    whose box shifted by more than move_threshold of its width since the
+    previous detection counts as moving.
+    """
+
+    def __init__(self, iou_threshold=0.3, max_missed=10, min_votes=3,
+                 min_agreement=0.6, reverify_interval=30, move_threshold=0.1):
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.min_votes = min_votes
+        self.min_agreement = min_agreement
+        self.reverify_interval = reverify_interval
+        self.move_threshold = move_threshold
+        self.tracks = []
+        self.frame_index = 0
+        self.track_ids = itertools.count(1)
+        self.lock = threading.Lock()
+        self.stats = {"faces": 0, "recognitions": 0, "tracks": 0, "identified": 0}
+
+    def update(self, boxes):
+        """Match this frame's boxes to tracks; returns one track per box"""
+        with self.lock:
+            self.frame_index += 1
+            self.stats["faces"] += len(boxes)
+
+            # Greedy matching, best overlaps first
+            pairs = []
+            for i, box in enumerate(boxes):
+                for track in self.tracks:
+                    iou = box_iou(box, track.box)
+                    if iou >= self.iou_threshold:
+                        pairs.append((iou, i, track))
+            pairs.sort(key=lambda pair: pair[0], reverse=True)
+
+            matched = [None] * len(boxes)
+            used = set()
+            for _, i, track in pairs:
+                if matched[i] is None and track.track_id not in used:
+                    matched[i] = track
+                    used.add(track.track_id)
+
+            for i, box in enumerate(boxes):
+                track = matched[i]
+                if track is None:
+                    track = Track(next(self.track_ids), box, self.frame_index)
+                    self.tracks.append(track)
+                    matched[i] = track
+                    self.stats["tracks"] += 1
+                else:
+                    track.moved = box_shift(track.box, box) > self.move_threshold
+                track.box = box
+                track.last_seen = self.frame_index
+
+            # Forget faces that left the scene
+            self.tracks = [t for t in self.tracks if self.frame_index - t.last_seen <= self.max_missed]
+            return matched
+
+    def has_tracks(self):
+        """Whether any face is currently being tracked"""
+        with self.lock:
+            return bool(self.tracks)
+
+    def is_moving(self):
+        """Whether a face seen in the latest detection moved since the one before"""
+        with self.lock:
+            return any(t.moved for t in self.tracks if t.last_seen == self.frame_index)
+
+    def current_boxes(self):
+        """Last known boxes of the faces seen in the latest detection"""
+        with self.lock:
+            return [t.box for t in self.tracks if t.last_seen == self.frame_index]
+
+    def needs_recognition(self, track):
+        """Whether the track's face should go through the recognizer this frame"""
+        if sum(track.votes.values()) < self.min_votes:
+            return True
+        return self.frame_index - track.last_recognized >= self.reverify_interval
+
+    def add_vote(self, track, student_id):
+        """Record a recognition result (-1 for unknown) for a track
+
+        Returns the student id the first time the track's identity is decided,
+        None otherwise.
+        """
+        with self.lock:
+            self.stats["recognitions"] += 1
+            track.last_recognized = self.frame_index
+            track.votes[student_id] += 1
+
+            student_id, count = track.votes.most_common(1)[0]
+            total = sum(track.votes.values())
+            if (student_id != -1 and total >= self.min_votes
+                    and count >= self.min_agreement * total and track.identity != student_id):
+                track.identity = student_id
+                self.stats["identified"] += 1
+                return student_id
+            return None
+
+    def get_stats(self):
+        """Faces seen, recognizer calls made, tracks created and identities decided"""
+        with self.lock:
+            return dict(self.stats)
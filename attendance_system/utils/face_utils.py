@@ -3,16 +3,22 @@ import face_recognition
 import numpy as np
 from PIL import Image
 import io
+from attendance_system.database.face_template import decode_template, encode_template, KIND_RAW_CROP, KIND_EMBEDDING
+from attendance_system.utils.face_gallery import FaceGallery
+from attendance_system.utils.face_index import default_index_path
+from attendance_system.utils.face_detectors import HaarDetector
+from attendance_system.utils.frame_context import as_array
 
 class FaceDetector:
-    def __init__(self):
-        self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+    def __init__(self, index_kind='brute', detector=None, **index_options):
+        # Face detector backend (see face_detectors); the Haar cascade by default
+        self.detector = detector or HaarDetector()
+        # Enrolled encodings, loaded once with load_gallery()
+        self.gallery = FaceGallery(index_kind=index_kind, **index_options)
     
     def detect_faces(self, frame):
         """Detect faces in a frame and return the face locations"""
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = self.face_cascade.detectMultiScale(gray, 1.1, 4)
-        return faces
+        return self.detector.detect(frame)
     
     def draw_faces(self, frame, faces):
         """Draw rectangles around detected faces"""
@@ -33,26 +39,120 @@ class FaceDetector:
     
     def compare_faces(self, known_encodings, face_encoding, tolerance=0.6):
         """Compare a face encoding with a list of known encodings"""
-        if not known_encodings or not face_encoding:
+        if known_encodings is None or len(known_encodings) == 0 or face_encoding is None:
             return False, -1
         
-        # Convert list to numpy array if needed
-        if isinstance(known_encodings, list):
-            known_encodings = np.array(known_encodings)
+        # Single distance pass; a match is any encoding within the tolerance
+        known_encodings = np.asarray(known_encodings, dtype=np.float64)
+        face_distances = np.linalg.norm(known_encodings - face_encoding, axis=1)
         
-        # Compare faces and return the closest match
-        matches = face_recognition.compare_faces(known_encodings, face_encoding, tolerance=tolerance)
-        face_distances = face_recognition.face_distance(known_encodings, face_encoding)
-        
-        if not any(matches):
-            return False, -1
-        
-        best_match_index = np.argmin(face_distances)
-        if matches[best_match_index]:
+        best_match_index = int(np.argmin(face_distances))
+        if face_distances[best_match_index] <= tolerance:
             return True, best_match_index
         
         return False, -1
     
+    def encode_faces(self, frame, face_locations, margin=0.25):
+        """Compute the 128-d encodings of detected (x, y, w, h) faces
+        
+        Each face is encoded from its own crop of the frame (with a margin for the
+        landmark model), so only the faces are converted to RGB, never the frame.
+        """
+        frame = as_array(frame)
+        height, width = frame.shape[:2]
+        encodings = []
+        for (x, y, w, h) in face_locations:
+            x0, y0 = max(0, int(x - margin * w)), max(0, int(y - margin * h))
+            x1, y1 = min(width, int(x + w + margin * w)), min(height, int(y + h + margin * h))
+            rgb_crop = cv2.cvtColor(frame[y0:y1, x0:x1], cv2.COLOR_BGR2RGB)
+            # face_recognition takes (top, right, bottom, left) boxes
+            location = (y - y0, x + w - x0, y + h - y0, x - x0)
+            found = face_recognition.face_encodings(rgb_crop, [location])
+            encodings.append(found[0] if found else None)
+        return encodings
+    
+    def encode_face_image(self, face_image):
+        """Compute the 128-d encoding of a face crop (BGR) covering the whole image"""
+        rgb_face = cv2.cvtColor(face_image, cv2.COLOR_BGR2RGB)
+        h, w = rgb_face.shape[:2]
+        encodings = face_recognition.face_encodings(rgb_face, [(0, w, h, 0)])
+        return encodings[0] if encodings else None
+    
+    def template_encoding(self, face_template):
+        """Encoding of a stored face template (a face crop is encoded first), or None"""
+        kind, face = decode_template(face_template)
+        # Stored data is either an encoding or a face crop to be encoded
+        if kind == KIND_RAW_CROP:
+            face = self.encode_face_image(face)
+        elif kind != KIND_EMBEDDING:
+            return None
+        if face is None or face.size != self.gallery.encoding_size:
+            return None
+        return face.reshape(-1)
+    
+    def load_gallery(self, face_data):
+        """Load the enrolled faces from get_all_face_encodings() into the gallery"""
+        student_ids = []
+        encodings = []
+        
+        for student_id, face_template in face_data:
+            if not face_template:
+                continue
+            try:
+                encoding = self.template_encoding(face_template)
+            except Exception as e:
+                print(f"Error loading face: {e}")
+                continue
+            if encoding is not None:
+                student_ids.append(student_id)
+                encodings.append(encoding)
+        
+        self.gallery.load(student_ids, encodings)
+        return len(self.gallery)
+    
+    def cache_face_embeddings(self, db):
+        """Encode the face samples without a cached encoding and store their encodings"""
+        embeddings = []
+        for template_id, face_template in db.get_unembedded_face_templates():
+            try:
+                encoding = self.template_encoding(face_template)
+            except Exception as e:
+                print(f"Error encoding face: {e}")
+                encoding = None
+            if encoding is not None:
+                encoding = encode_template(encoding, KIND_EMBEDDING)
+            embeddings.append((template_id, encoding))
+        db.add_face_embeddings(embeddings)
+        return len(embeddings)
+    
+    def load_gallery_from_database(self, db, index_path=None):
+        """Load the saved index next to the database, rebuilding it if stale
+        
+        A rebuild runs the encoder only on face samples added since the last
+        one; the encodings of the others are cached in the database.
+        """
+        index_path = index_path or default_index_path(db.db_path)
+        face_set_state = db.get_face_set_state()
+        
+        if self.gallery.load_saved(index_path) and self.gallery.index.face_set_state == face_set_state:
+            return len(self.gallery)
+        
+        self.cache_face_embeddings(db)
+        self.gallery.reset()
+        self.load_gallery(db.get_face_embeddings())
+        self.gallery.index.face_set_state = face_set_state
+        self.gallery.save(index_path)
+        return len(self.gallery)
+    
+    def match_faces(self, face_encodings, tolerance=0.6):
+        """Match every face of a frame against the gallery in one batch
+        
+        Returns a (student_id, distance) pair per face, student_id -1 if unknown.
+        """
+        if face_encodings is None or len(face_encodings) == 0:
+            return []
+        return self.gallery.match(np.asarray(face_encodings), tolerance)
+    
     def resize_frame(self, frame, width=None, height=None):
         """Resize a frame while keeping aspect ratio"""
         if width is None and height is None:
@@ -1,54 +1,66 @@
 import cv2
 import numpy as np
-from PIL import Image
-import io
 import os
-import pickle
+import json
+import threading
+from attendance_system.database.face_template import decode_template, KIND_RAW_CROP, KIND_GRAY_FACE
+from attendance_system.utils.frame_context import FrameContext, as_context
+from attendance_system.utils.face_detectors import HaarDetector
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models')
+MODEL_PATH = os.path.join(MODEL_DIR, 'lbph_model.yml')
+# Fingerprint of the face set the saved model was trained on
+MODEL_META_PATH = os.path.join(MODEL_DIR, 'lbph_model.json')
 
 class FaceDetector:
-    def __init__(self):
-        # Load the pre-trained Haar cascade classifier for face detection
-        self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+    def __init__(self, detector=None):
+        # Face detector backend (see face_detectors); the Haar cascade by default
+        self.detector = detector or HaarDetector()
         # Use LBPH recognizer for face recognition - simpler than dlib/face_recognition
         self.recognizer = cv2.face.LBPHFaceRecognizer_create()
         self.trained = False
+        self.model_meta = None
+        # The recognizer is updated from the Tk thread while the camera thread predicts
+        self.lock = threading.Lock()
         
         # Try to load a pre-trained model if it exists
-        model_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models', 'lbph_model.yml')
-        if os.path.exists(model_path):
+        if os.path.exists(MODEL_PATH):
             try:
-                self.recognizer.read(model_path)
+                self.recognizer.read(MODEL_PATH)
                 self.trained = True
+                self.model_meta = self._load_model_meta()
             except:
                 self.trained = False
     
     def detect_faces(self, frame):
-        """Detect faces in a frame and return the face locations"""
+        """Detect faces in a frame (array or FrameContext) and return the face locations"""
         if frame is None:
             return []
             
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = self.face_cascade.detectMultiScale(gray, 1.1, 4)
-        return faces
+        # The backend reuses the frame context's grayscale/resized views
+        return self.detector.detect(frame)
     
-    def draw_faces(self, frame, faces):
-        """Draw rectangles around detected faces"""
+    def draw_faces(self, frame, faces, copy=True):
+        """Draw rectangles around detected faces (in place with copy=False)"""
         if frame is None:
             return frame
             
-        frame_copy = frame.copy()
+        frame_copy = frame.copy() if copy else frame
         for (x, y, w, h) in faces:
             cv2.rectangle(frame_copy, (x, y), (x+w, y+h), (255, 0, 0), 2)
         return frame_copy
     
     def extract_face(self, frame, face_location):
-        """Extract a face from a frame and preprocess it for recognition"""
+        """Extract a face from a frame (array or FrameContext) and preprocess it for recognition"""
         if frame is None or len(face_location) != 4:
             return None
             
         x, y, w, h = face_location
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        face_roi = gray[y:y+h, x:x+w]
+        if isinstance(frame, FrameContext):
+            face_roi = frame.gray[y:y+h, x:x+w]
+        else:
+            # Convert only the face, not the whole frame
+            face_roi = cv2.cvtColor(frame[y:y+h, x:x+w], cv2.COLOR_BGR2GRAY)
         
         # Resize to standard size
         face_roi = cv2.resize(face_roi, (100, 100))
@@ -60,6 +72,7 @@ class FaceDetector:
     
     def get_face_encodings(self, frame):
         """Get face locations and return preprocessed faces for recognition"""
+        frame = as_context(frame)
         faces = self.detect_faces(frame)
         
         # Preprocess each detected face
@@ -71,22 +84,104 @@ class FaceDetector:
         
         return faces, face_samples
     
-    def train_recognizer(self, faces, labels):
+    def reload_model(self):
+        """Reload the saved model written by another instance"""
+        if not os.path.exists(MODEL_PATH):
+            return False
+        
+        with self.lock:
+            self.recognizer.read(MODEL_PATH)
+            self.trained = True
+        self.model_meta = self._load_model_meta()
+        return True
+    
+    def train_recognizer(self, faces, labels, face_set_state=None, save=True):
         """Train the face recognizer with labeled face samples"""
         if not faces or not labels or len(faces) != len(labels):
             return False
             
         # Train LBPH recognizer
-        self.recognizer.train(faces, np.array(labels))
-        self.trained = True
+        with self.lock:
+            self.recognizer.train(faces, np.array(labels))
+            self.trained = True
         
         # Save the model
-        model_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models')
-        os.makedirs(model_path, exist_ok=True)
-        self.recognizer.write(os.path.join(model_path, 'lbph_model.yml'))
+        if save:
+            self._save_model(face_set_state)
         
         return True
     
+    def update_recognizer(self, faces, labels, face_set_state=None):
+        """Add labeled face samples to the trained model without retraining it"""
+        if len(faces) != len(labels):
+            return False
+        
+        if faces:
+            with self.lock:
+                self.recognizer.update(faces, np.array(labels))
+                self.trained = True
+        
+        self._save_model(face_set_state)
+        return True
+    
+    def sync_recognizer(self, db):
+        """Bring the recognizer up to date with the faces enrolled in the database
+        
+        Does nothing when the saved model already matches the enrolled face set,
+        applies only newly added face samples through LBPH update() when the model
+        is behind, and falls back to a full training run when there is no usable
+        saved model or samples were removed.
+        """
+        face_count, last_change_id, last_template_id = db.get_face_set_state()
+        face_set_state = {
+            "face_count": face_count,
+            "last_change_id": last_change_id,
+            "last_template_id": last_template_id,
+        }
+        
+        meta = self.model_meta
+        if self.trained and meta and "last_template_id" in meta:
+            if meta == face_set_state:
+                return True
+            
+            face_data = db.get_face_encodings_since(meta["last_template_id"])
+            # Removed (evicted or replaced) samples cannot be taken out of an
+            # LBPH model, so only pure additions are applied incrementally
+            if meta["face_count"] + len(face_data) == face_count:
+                faces, labels = self.prepare_faces_for_training(face_data)
+                return self.update_recognizer(faces, labels, face_set_state)
+        
+        face_data = db.get_all_face_encodings()
+        faces, labels = self.prepare_faces_for_training(face_data)
+        return self.train_recognizer(faces, labels, face_set_state)
+    
+    def _save_model(self, face_set_state=None):
+        """Write the model and the fingerprint of the face set it was trained on"""
+        os.makedirs(MODEL_DIR, exist_ok=True)
+        with self.lock:
+            self.recognizer.write(MODEL_PATH)
+        
+        self.model_meta = face_set_state
+        if face_set_state is None:
+            # Unknown face set, force a full retrain on the next sync
+            if os.path.exists(MODEL_META_PATH):
+                os.remove(MODEL_META_PATH)
+            return
+        
+        with open(MODEL_META_PATH, 'w') as f:
+            json.dump(face_set_state, f)
+    
+    def _load_model_meta(self):
+        """Load the face set fingerprint stored next to the model"""
+        if not os.path.exists(MODEL_META_PATH):
+            return None
+        
+        try:
+            with open(MODEL_META_PATH, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
     def compare_faces(self, known_encodings, face_encoding, tolerance=70):
         """Compare a face with known faces and return the closest match"""
         if not self.trained or face_encoding is None:
@@ -94,7 +189,8 @@ class FaceDetector:
         
         try:
             # Predict the face using LBPH
-            label, confidence = self.recognizer.predict(face_encoding)
+            with self.lock:
+                label, confidence = self.recognizer.predict(face_encoding)
             
             # Lower confidence is better in LBPH (unlike face_recognition)
             if confidence < tolerance:
@@ -111,21 +207,27 @@ class FaceDetector:
         faces = []
         labels = []
         
-        for student_id, face_pkl in face_data:
-            if face_pkl:
+        for student_id, face_template in face_data:
+            if face_template:
                 try:
-                    # Unpack the face data stored in the database
-                    face_img = pickle.loads(face_pkl)
+                    # Decode the face template stored in the database (no copy)
+                    kind, face_img = decode_template(face_template)
                     
-                    # For LBPH, we need grayscale images
-                    if isinstance(face_img, np.ndarray):
-                        if len(face_img.shape) == 3 and face_img.shape[2] == 3:
-                            # Convert color image to grayscale
-                            face_gray = cv2.cvtColor(face_img, cv2.COLOR_BGR2GRAY)
-                            # Resize to standard size
+                    # For LBPH, we need 100x100 grayscale images
+                    if kind == KIND_RAW_CROP and face_img.ndim == 3 and face_img.shape[2] == 3:
+                        # Convert color image to grayscale
+                        face_gray = cv2.cvtColor(face_img, cv2.COLOR_BGR2GRAY)
+                        # Resize to standard size
+                        face_gray = cv2.resize(face_gray, (100, 100))
+                    elif kind == KIND_GRAY_FACE:
+                        # Already preprocessed
+                        face_gray = face_img
+                        if face_gray.shape != (100, 100):
                             face_gray = cv2.resize(face_gray, (100, 100))
-                            faces.append(face_gray)
-                            labels.append(student_id)
+                    else:
+                        continue
+                    faces.append(face_gray)
+                    labels.append(student_id)
                 except Exception as e:
                     print(f"Error preparing face: {e}")
                     continue
@@ -0,0 +1,63 @@
+import cv2
+
+class FrameContext:
+    """One camera frame plus the derived views computed from it, each at most once
+
+    Detection, face extraction, drawing and display all need some variant of
+    the same frame (grayscale, downscaled, RGB). Passing a FrameContext instead
+    of the bare array lets them share those views instead of recomputing them.
+    The views are cached on first access and must be treated as read-only.
+    """
+
+    def __init__(self, frame, scale=1.0):
+        self.frame = frame
+        # Ratio of the original frame width to this frame's width
+        self.scale = scale
+        self._gray = None
+        self._rgb = None
+        self._resized = {}
+
+    @property
+    def shape(self):
+        return self.frame.shape
+
+    @property
+    def gray(self):
+        """Grayscale view of the frame"""
+        if self._gray is None:
+            if self.frame.ndim == 2:
+                self._gray = self.frame
+            else:
+                self._gray = cv2.cvtColor(self.frame, cv2.COLOR_BGR2GRAY)
+        return self._gray
+
+    @property
+    def rgb(self):
+        """RGB view of the frame"""
+        if self._rgb is None:
+            self._rgb = cv2.cvtColor(self.frame, cv2.COLOR_BGR2RGB)
+        return self._rgb
+
+    def resized(self, width):
+        """Context for a copy of the frame downscaled to the given width"""
+        h, w = self.frame.shape[:2]
+        if width is None or width >= w:
+            return self
+
+        if width not in self._resized:
+            height = max(1, int(h * width / float(w)))
+            small = cv2.resize(self.frame, (width, height), interpolation=cv2.INTER_AREA)
+            self._resized[width] = FrameContext(small, self.scale * w / float(width))
+        return self._resized[width]
+
+def as_context(frame):
+    """Wrap a frame in a FrameContext unless it already is one"""
+    if isinstance(frame, FrameContext):
+        return frame
+    return FrameContext(frame)
+
+def as_array(frame):
+    """The frame array of a FrameContext or a bare frame"""
+    if isinstance(frame, FrameContext):
+        return frame.frame
+    return frame
@@ -0,0 +1,70 @@
+import os
+import cv2
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+class FrameSource:
+    """Frames of a video file, a stream URL or a directory of images
+
+    Frames are decoded one at a time, never loaded all at once. With a stride
+    of N only every Nth frame is returned; the frames in between are skipped
+    with grab(), which reads the stream without converting the frame to an
+    image. Iterating yields (frame_index, timestamp_ms, frame); for image
+    directories the timestamp is None.
+    """
+
+    def __init__(self, source, stride=1):
+        self.source = source
+        self.stride = max(1, stride)
+        self.is_image_dir = os.path.isdir(source)
+        self.frames_read = 0
+        self.fps = None
+        self.frame_count = None
+
+    def __iter__(self):
+        if self.is_image_dir:
+            return self._iter_images()
+        return self._iter_video()
+
+    def _iter_images(self):
+        names = sorted(n for n in os.listdir(self.source) if os.path.splitext(n)[1].lower() in IMAGE_EXTENSIONS)
+        self.frame_count = len(names)
+        for index, name in enumerate(names):
+            if index % self.stride:
+                continue
+            frame = cv2.imread(os.path.join(self.source, name))
+            self.frames_read += 1
+            if frame is None:
+                print(f"Error reading image {name}")
+                continue
+            yield index, None, frame
+
+    def _iter_video(self):
+        # Digit strings are camera indexes, anything else a file path or URL
+        cap = cv2.VideoCapture(int(self.source) if self.source.isdigit() else self.source)
+        if not cap.isOpened():
+            raise ValueError("Unable to open video source", self.source)
+
+        self.fps = cap.get(cv2.CAP_PROP_FPS) or None
+        self.frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or None
+        index = -1
+        try:
+            while True:
+                index += 1
+                if not cap.grab():
+                    break
+                self.frames_read += 1
+                if index % self.stride:
+                    continue
+                ret, frame = cap.retrieve()
+                if not ret:
+                    continue
+                yield index, cap.get(cv2.CAP_PROP_POS_MSEC), frame
+        finally:
+            cap.release()
+
+    def duration(self):
+        """Length of the frames read so far in seconds of video, None if unknown"""
+        if not self.fps:
+            return None
+        return self.frames_read / self.fps
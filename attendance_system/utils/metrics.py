@@ -0,0 +1,218 @@
+import functools
+import json
+import os
+import threading
+import time
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, float('inf'))
+
+class Histogram:
+    """Latency distribution of one stage in fixed buckets"""
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS_MS)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms):
+        for i, bound in enumerate(BUCKETS_MS):
+            if ms <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def quantile(self, q):
+        """Approximate quantile: linear interpolation inside the bucket holding it"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for bound, count in zip(BUCKETS_MS, self.counts):
+            if count and seen + count >= rank:
+                upper = min(bound, self.max_ms)
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+            lower = bound
+        return self.max_ms
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": round(self.quantile(0.5), 3),
+            "p95_ms": round(self.quantile(0.95), 3),
+            "max_ms": round(self.max_ms, 3),
+        }
+
+class MetricsRegistry:
+    """Stage timings, counters and gauges of the running application
+
+    Every recording call returns immediately while the registry is disabled,
+    which is the default: instrumented code then pays one attribute check.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.histograms = {}
+            self.counters = {}
+            self.gauges = {}
+            self.started_at = time.time()
+
+    def observe(self, name, seconds):
+        """Record one duration of a stage"""
+        if not self.enabled:
+            return
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(seconds * 1000)
+
+    def inc(self, name, amount=1):
+        """Add to a counter"""
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def set_gauge(self, name, value):
+        """Set a current value, e.g. a queue depth"""
+        if not self.enabled:
+            return
+        with self.lock:
+            self.gauges[name] = value
+
+    def snapshot(self):
+        """All metrics as a JSON-serializable dict"""
+        with self.lock:
+            return {
+                "timestamp": round(time.time(), 3),
+                "uptime_s": round(time.time() - self.started_at, 1),
+                "stages": {name: h.snapshot() for name, h in sorted(self.histograms.items())},
+                "counters": dict(sorted(self.counters.items())),
+                "gauges": dict(sorted(self.gauges.items())),
+            }
+
+    def to_prometheus(self):
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        with self.lock:
+            lines.append("# HELP attendance_stage_seconds Duration of a processing stage")
+            lines.append("# TYPE attendance_stage_seconds histogram")
+            for name, histogram in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, count in zip(BUCKETS_MS, histogram.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float('inf') else repr(bound / 1000.0)
+                    lines.append(f'attendance_stage_seconds_bucket{{stage="{name}",le="{le}"}} {cumulative}')
+                lines.append(f'attendance_stage_seconds_sum{{stage="{name}"}} {histogram.total_ms / 1000.0}')
+                lines.append(f'attendance_stage_seconds_count{{stage="{name}"}} {histogram.count}')
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"# TYPE attendance_{name}_total counter")
+                lines.append(f"attendance_{name}_total {value}")
+            for name, value in sorted(self.gauges.items()):
+                lines.append(f"# TYPE attendance_{name} gauge")
+                lines.append(f"attendance_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+# The application-wide registry
+registry = MetricsRegistry()
+
+class _Timer:
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        registry.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+def timer(name):
+    """Context manager timing a block as stage `name` (a shared no-op when disabled)"""
+    return _Timer(name) if registry.enabled else _NULL_TIMER
+
+def timed(name):
+    """Decorator timing every call of a function as stage `name`"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not registry.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                registry.observe(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+def format_overlay(snapshot, stages=None):
+    """One-line summary of stage timings for the on-screen overlay"""
+    parts = []
+    for name, stage in snapshot["stages"].items():
+        if stages is None or name in stages:
+            parts.append(f"{name} {stage['avg_ms']:.1f}/{stage['p95_ms']:.1f} ms")
+    return "avg/p95: " + ", ".join(parts) if parts else ""
+
+class MetricsReporter:
+    """Write the registry periodically to a JSON-lines log and a Prometheus text file
+
+    The Prometheus file is replaced atomically, so it can be served by the
+    node_exporter textfile collector or any static file server.
+    """
+
+    def __init__(self, json_path=None, prometheus_path=None, interval=10.0):
+        self.json_path = json_path
+        self.prometheus_path = prometheus_path
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        """Stop the reporter after writing a last report"""
+        self.stop_event.set()
+        if self.thread.is_alive():
+            self.thread.join()
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            self.write()
+        self.write()
+
+    def write(self):
+        try:
+            if self.json_path:
+                with open(self.json_path, 'a') as f:
+                    f.write(json.dumps(registry.snapshot()) + "\n")
+            if self.prometheus_path:
+                tmp_path = self.prometheus_path + ".tmp"
+                with open(tmp_path, 'w') as f:
+                    f.write(registry.to_prometheus())
+                os.replace(tmp_path, self.prometheus_path)
+        except OSError as e:
+            print(f"Error writing metrics: {e}")
@@ -0,0 +1,79 @@
+import threading
+import cv2
+from attendance_system.utils.frame_context import as_context
+
+class MotionGate:
+    """Cheap scene-change test on a tiny grayscale copy of the frame
+
+    The frame is shrunk to a thumbnail, blurred and compared with the last
+    frame that counted as a change; the scene changed when more than
+    min_changed_fraction of its pixels differ by more than pixel_threshold.
+    """
+
+    def __init__(self, width=80, pixel_threshold=25, min_changed_fraction=0.01):
+        self.width = width
+        self.pixel_threshold = pixel_threshold
+        self.min_changed_fraction = min_changed_fraction
+        self.reference = None
+
+    def changed(self, frame):
+        """Whether the frame (array or FrameContext) differs enough from the reference frame"""
+        # Shrink before converting: the colour conversion then costs almost nothing
+        gray = as_context(frame).resized(self.width).gray
+        gray = cv2.GaussianBlur(gray, (5, 5), 0)
+
+        if self.reference is None or self.reference.shape != gray.shape:
+            self.reference = gray
+            return True
+
+        diff = cv2.absdiff(gray, self.reference)
+        _, mask = cv2.threshold(diff, self.pixel_threshold, 255, cv2.THRESH_BINARY)
+        if cv2.countNonZero(mask) < self.min_changed_fraction * mask.size:
+            return False
+
+        self.reference = gray
+        return True
+
+class DetectionScheduler:
+    """Decide per frame whether to run the face detector
+
+    'detect' runs detection; 'track' reuses the boxes of the last detection
+    as they are (faces are present but this is not a detection frame of the
+    stride); 'idle' skips the frame entirely because nobody is tracked and the
+    scene is static. Reused boxes are not re-localised, so they are only
+    good while the faces hold still: when a tracked face moved on the last
+    detection, detection runs on every frame until it stops. A detection is
+    still forced every max_idle_frames frames as a safety net.
+    """
+
+    def __init__(self, stride=3, motion_gate=None, max_idle_frames=50):
+        self.stride = max(1, stride)
+        self.motion_gate = motion_gate
+        self.max_idle_frames = max_idle_frames
+        self.frames_since_detection = 0
+        self.lock = threading.Lock()
+        self.stats = {"frames": 0, "detect": 0, "track": 0, "idle": 0}
+
+    def decide(self, frame, has_tracks, tracks_moving=False):
+        """Return 'detect', 'track' or 'idle' for this frame"""
+        with self.lock:
+            self.stats["frames"] += 1
+            self.frames_since_detection += 1
+
+            if has_tracks:
+                stride = 1 if tracks_moving else self.stride
+                decision = "detect" if self.frames_since_detection >= stride else "track"
+            elif self.motion_gate is None or self.frames_since_detection >= self.max_idle_frames:
+                decision = "detect"
+            else:
+                decision = "detect" if self.motion_gate.changed(frame) else "idle"
+
+            if decision == "detect":
+                self.frames_since_detection = 0
+            self.stats[decision] += 1
+            return decision
+
+    def get_stats(self):
+        """Number of frames per decision"""
+        with self.lock:
+            return dict(self.stats)
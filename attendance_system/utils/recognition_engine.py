@@ -0,0 +1,253 @@
+import abc
+import cv2
+from attendance_system.utils.face_detectors import HaarDetector, create_detector
+from attendance_system.utils.frame_context import FrameContext, as_context, as_array
+from attendance_system.utils import metrics
+
+class RecognitionEngine(abc.ABC):
+    """Common API of the face recognition engines
+
+    An engine detects faces (through a face_detectors backend), turns detected
+    faces into its own representation (embed), learns the enrolled faces
+    (train from face data, sync from the database) and matches faces to
+    student ids, -1 meaning unknown. The *_batch methods handle every face of
+    a frame in one call. Enrolled samples are stored as raw face crops, so any
+    engine can be trained from the same database.
+    """
+
+    name = None
+    default_tolerance = None
+
+    def __init__(self, detector=None, tolerance=None):
+        self.detector = detector or HaarDetector()
+        self.tolerance = self.default_tolerance if tolerance is None else tolerance
+
+    @metrics.timed("detect")
+    def detect(self, frame):
+        """Detect faces in a frame (array or FrameContext); returns (x, y, w, h) boxes"""
+        if frame is None:
+            return []
+        return self.detector.detect(frame)
+
+    def detect_frame(self, frame, width=320):
+        """Detect faces on a copy of the frame resized to the given width
+
+        Returns (small_frame, small_boxes, boxes), small_frame being the
+        FrameContext of the resized copy, with boxes scaled back to original
+        frame coordinates.
+        """
+        frame = as_context(frame)
+        small_frame = frame.resized(width)
+        small_boxes = self.detect(small_frame)
+
+        scale = small_frame.scale / frame.scale
+        boxes = [(int(x * scale), int(y * scale), int(w * scale), int(h * scale))
+                 for (x, y, w, h) in small_boxes]
+        return small_frame, small_boxes, boxes
+
+    def detect_boxes(self, frame, width=320, roi=None):
+        """Detect faces on a copy of the frame, or of its region of interest, resized to width
+
+        roi is an (x, y, w, h) pixel box; the rest of the image is ignored.
+        Returns boxes in original frame coordinates.
+        """
+        frame = as_context(frame)
+        if roi is None:
+            return self.detect_frame(frame, width)[2]
+
+        x, y, w, h = roi
+        region = FrameContext(frame.frame[y:y+h, x:x+w])
+        _, _, boxes = self.detect_frame(region, width)
+        return [(bx + x, by + y, bw, bh) for (bx, by, bw, bh) in boxes]
+
+    def draw_faces(self, frame, faces, copy=True):
+        """Draw rectangles around detected faces (in place with copy=False)"""
+        if frame is None:
+            return frame
+
+        frame_copy = frame.copy() if copy else frame
+        for (x, y, w, h) in faces:
+            cv2.rectangle(frame_copy, (x, y), (x+w, y+h), (255, 0, 0), 2)
+        return frame_copy
+
+    def face_quality(self, frame, face_location):
+        """Score a detected face for enrollment: sharp, large faces score higher"""
+        return face_quality(frame, face_location)
+
+    def enroll_sample(self, frame, face_location):
+        """Crop a detected face for enrollment; returns (face_crop, quality)"""
+        return enroll_sample(frame, face_location)
+
+    def enroll(self, db, student_id, samples):
+        """Store (face_crop, quality) samples for a student and update the model"""
+        if not db.add_face_templates(student_id, samples):
+            return False
+        return self.sync(db)
+
+    def embed(self, frame, face_location):
+        """Representation of one detected face, None if it cannot be computed"""
+        return self.embed_batch(frame, [face_location])[0]
+
+    @abc.abstractmethod
+    def embed_batch(self, frame, face_locations):
+        """Representations of all detected faces of a frame"""
+
+    def match(self, embedding):
+        """Student id of one face representation, or -1"""
+        return self.match_batch([embedding])[0]
+
+    @abc.abstractmethod
+    def match_batch(self, embeddings):
+        """Student ids of face representations, -1 for unknown faces"""
+
+    def recognize_face(self, frame, face_location):
+        """Recognize one detected face; returns the student id or -1"""
+        return self.recognize_batch(frame, [face_location])[0]
+
+    def recognize_batch(self, frame, face_locations):
+        """Recognize all detected faces of a frame; returns a student id or -1 per face"""
+        if len(face_locations) == 0:
+            return []
+        with metrics.timer("embed"):
+            embeddings = self.embed_batch(frame, face_locations)
+        with metrics.timer("match"):
+            return self.match_batch(embeddings)
+
+    def recognize_frame(self, frame, width=320, roi=None):
+        """Detect and recognize all faces in a frame
+
+        Detection runs on a copy (of the roi box, if given) resized to the given
+        width; recognition runs on crops of the full-resolution frame. Returns a
+        list of ((x, y, w, h), student_id) in original frame coordinates, with
+        student_id -1 for unrecognized faces.
+        """
+        boxes = self.detect_boxes(frame, width, roi)
+        return list(zip(boxes, self.recognize_batch(frame, boxes)))
+
+    @abc.abstractmethod
+    def train(self, face_data):
+        """Learn the faces of (student_id, face_template) rows, in memory only"""
+
+    @abc.abstractmethod
+    def sync(self, db):
+        """Bring the model up to date with the faces enrolled in the database"""
+
+    @abc.abstractmethod
+    def reload_model(self):
+        """Reload the model saved by another instance"""
+
+def face_quality(frame, face_location):
+    """Score a detected face for enrollment: sharp, large faces score higher"""
+    x, y, w, h = face_location
+    gray = as_context(frame).gray[y:y+h, x:x+w]
+    if gray.size == 0:
+        return 0.0
+
+    # Variance of the Laplacian measures focus / motion blur
+    sharpness = cv2.Laplacian(gray, cv2.CV_64F).var()
+    # Faces smaller than the 100x100 training size lose detail
+    size_factor = min(1.0, (w * h) / float(100 * 100))
+    return float(sharpness * size_factor)
+
+def enroll_sample(frame, face_location):
+    """Crop a detected face for enrollment; returns (face_crop, quality)"""
+    x, y, w, h = face_location
+    frame = as_context(frame)
+    return frame.frame[y:y+h, x:x+w].copy(), face_quality(frame, face_location)
+
+class LBPHEngine(RecognitionEngine):
+    """OpenCV LBPH recognizer on equalized gray face crops: fast, no extra dependencies"""
+
+    name = 'lbph'
+    # LBPH confidence is a distance: lower is better
+    default_tolerance = 70
+
+    def __init__(self, detector=None, tolerance=None):
+        super().__init__(detector, tolerance)
+        from attendance_system.utils.face_utils_simple import FaceDetector
+        self.face_detector = FaceDetector(self.detector)
+
+    def embed_batch(self, frame, face_locations):
+        # Equalized 100x100 grayscale crops; only the crops are converted, not the frame
+        frame = as_array(frame)
+        return [self.face_detector.extract_face(frame, face_location) for face_location in face_locations]
+
+    def match_batch(self, embeddings):
+        student_ids = []
+        for face in embeddings:
+            match_found, student_id = self.face_detector.compare_faces(None, face, self.tolerance)
+            student_ids.append(student_id if match_found else -1)
+        return student_ids
+
+    def train(self, face_data):
+        faces, labels = self.face_detector.prepare_faces_for_training(face_data)
+        return self.face_detector.train_recognizer(faces, labels, save=False)
+
+    def sync(self, db):
+        return self.face_detector.sync_recognizer(db)
+
+    def reload_model(self):
+        return self.face_detector.reload_model()
+
+class EmbeddingEngine(RecognitionEngine):
+    """face_recognition (dlib) 128-d embeddings matched in a face index: slower, more accurate"""
+
+    name = 'embedding'
+    # Euclidean distance between embeddings
+    default_tolerance = 0.6
+
+    def __init__(self, detector=None, tolerance=None, index_kind='brute', index_path=None, **index_options):
+        super().__init__(detector, tolerance)
+        # Imported here: dlib is only needed when this engine is selected
+        from attendance_system.utils.face_utils import FaceDetector
+        from attendance_system.utils.face_index import default_index_path
+        self.face_detector = FaceDetector(index_kind, detector=self.detector, **index_options)
+        self.fixed_index_path = index_path
+        self.index_path = index_path or default_index_path('attendance.db')
+
+    def embed_batch(self, frame, face_locations):
+        return self.face_detector.encode_faces(frame, face_locations)
+
+    def match_batch(self, embeddings):
+        student_ids = [-1] * len(embeddings)
+        valid = [i for i, embedding in enumerate(embeddings) if embedding is not None]
+        if valid:
+            matches = self.face_detector.match_faces([embeddings[i] for i in valid], self.tolerance)
+            for i, (student_id, _) in zip(valid, matches):
+                student_ids[i] = student_id
+        return student_ids
+
+    def train(self, face_data):
+        self.face_detector.gallery.reset()
+        return self.face_detector.load_gallery(face_data) > 0
+
+    def sync(self, db):
+        from attendance_system.utils.face_index import default_index_path
+        if self.fixed_index_path is None:
+            self.index_path = default_index_path(db.db_path)
+        self.face_detector.load_gallery_from_database(db, self.index_path)
+        return True
+
+    def reload_model(self):
+        return self.face_detector.gallery.load_saved(self.index_path)
+
+ENGINE_TYPES = {
+    LBPHEngine.name: LBPHEngine,
+    EmbeddingEngine.name: EmbeddingEngine,
+}
+
+def create_engine(name='lbph', detector=None, **options):
+    """Create a recognition engine by name ('lbph' or 'embedding')"""
+    if name not in ENGINE_TYPES:
+        raise ValueError(f"Unknown recognition engine: {name}")
+    return ENGINE_TYPES[name](detector, **options)
+
+def create_engine_from_config(config):
+    """Create the recognition engine and face detector selected in the config"""
+    try:
+        detector = create_detector(config["face_detector"], **config["face_detector_options"])
+    except Exception as e:
+        print(f"Error loading face detector '{config['face_detector']}', using haar: {e}")
+        detector = create_detector()
+
+    return create_engine(config["recognition_engine"], detector, **config["recognition_engine_options"])
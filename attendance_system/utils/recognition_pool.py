@@ -0,0 +1,147 @@
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+from multiprocessing import shared_memory
+import numpy as np
+
+def _worker_main(shm_name, slot_bytes, tasks, results, engine_config=None):
+    """Recognition worker process: loads the engine once, then serves frames"""
+    # Imported here so the parent process does not need OpenCV state to fork/spawn
+    from attendance_system.config import DEFAULTS
+    from attendance_system.utils.recognition_engine import create_engine_from_config
+
+    engine = create_engine_from_config(engine_config or DEFAULTS)
+    engine.reload_model()
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            if task[0] == 'reload':
+                engine.reload_model()
+                continue
+
+            _, frame_id, slot, shape, width, roi = task
+            # View on the frame in shared memory, no copy
+            frame = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=slot * slot_bytes)
+            try:
+                faces = engine.recognize_frame(frame, width=width, roi=roi)
+            except Exception as e:
+                print(f"Error in recognition worker: {e}")
+                faces = []
+            del frame
+            results.put((frame_id, slot, faces))
+    finally:
+        shm.close()
+
+class RecognitionPool:
+    """Face recognition on a pool of worker processes
+
+    Each worker loads the configured recognition engine and its model once. Frames
+    are copied into a shared-memory slot and only (frame id, slot, shape) is
+    sent to a worker, so no frame is pickled. recognize() blocks the calling
+    thread until its own frame is done, so several inference threads can keep
+    all workers busy; every result carries the frame id it belongs to.
+    """
+
+    def __init__(self, num_workers=None, max_frame_shape=(1080, 1920, 3), width=320, engine_config=None):
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.width = width
+        # Two slots per worker: one being processed, one being filled
+        self.num_slots = self.num_workers * 2
+        self.slot_bytes = int(np.prod(max_frame_shape))
+        self.shm = shared_memory.SharedMemory(create=True, size=self.slot_bytes * self.num_slots)
+
+        self.free_slots = queue.Queue()
+        for slot in range(self.num_slots):
+            self.free_slots.put(slot)
+
+        self.frame_ids = itertools.count(1)
+        self.pending = {}
+        self.pending_lock = threading.Lock()
+
+        # spawn: forking a process that runs Tk and worker threads is unsafe
+        context = multiprocessing.get_context('spawn')
+        self.results = context.Queue()
+        self.task_queues = []
+        self.workers = []
+        for _ in range(self.num_workers):
+            tasks = context.Queue()
+            worker = context.Process(
+                target=_worker_main,
+                args=(self.shm.name, self.slot_bytes, tasks, self.results, engine_config),
+                daemon=True,
+            )
+            worker.start()
+            self.task_queues.append(tasks)
+            self.workers.append(worker)
+        self.next_worker = itertools.cycle(self.task_queues)
+        self.dispatch_lock = threading.Lock()
+
+        self.collector = threading.Thread(target=self._collect, daemon=True)
+        self.collector.start()
+
+    def recognize(self, frame, timeout=5.0, width=None, roi=None):
+        """Recognize the faces in a frame on a worker process
+
+        Detection runs at the given width (the pool's default if None), inside
+        the optional (x, y, w, h) roi box.
+
+        Returns (frame_id, [((x, y, w, h), student_id), ...]), with an empty face
+        list if the frame could not be processed in time.
+        """
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        if frame.nbytes > self.slot_bytes:
+            raise ValueError(f"Frame {frame.shape} is larger than the pool's frame slots")
+
+        slot = self.free_slots.get(timeout=timeout)
+        view = np.ndarray(frame.shape, dtype=np.uint8, buffer=self.shm.buf, offset=slot * self.slot_bytes)
+        view[...] = frame
+        del view
+
+        done = threading.Event()
+        with self.dispatch_lock:
+            frame_id = next(self.frame_ids)
+            with self.pending_lock:
+                self.pending[frame_id] = [done, None]
+            next(self.next_worker).put(('frame', frame_id, slot, frame.shape, width or self.width, roi))
+
+        finished = done.wait(timeout)
+        with self.pending_lock:
+            _, faces = self.pending.pop(frame_id)
+        return frame_id, (faces if finished else [])
+
+    def reload_model(self):
+        """Make every worker reload the saved recognizer model"""
+        for tasks in self.task_queues:
+            tasks.put(('reload',))
+
+    def _collect(self):
+        """Hand results back to the waiting threads and free their slots"""
+        while True:
+            item = self.results.get()
+            if item is None:
+                break
+            frame_id, slot, faces = item
+            self.free_slots.put(slot)
+            with self.pending_lock:
+                entry = self.pending.get(frame_id)
+                if entry is not None:
+                    entry[1] = faces
+                    entry[0].set()
+
+    def close(self):
+        """Stop the workers and release the shared memory"""
+        for tasks in self.task_queues:
+            tasks.put(None)
+        for worker in self.workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+        self.results.put(None)
+        self.collector.join(timeout=5)
+        self.shm.close()
+        self.shm.unlink()
@@ -0,0 +1,58 @@
+import csv
+
+REPORT_COLUMNS = ("Name", "Roll Number", "Department", "Date", "Time", "Status")
+
+# Rows read from the database and written out at a time
+EXPORT_BATCH_SIZE = 5000
+
+def export_csv(rows, path, columns=REPORT_COLUMNS):
+    """Write report rows to a CSV file as they come; returns the number of rows"""
+    count = 0
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+def export_parquet(rows, path, columns=REPORT_COLUMNS, batch_size=EXPORT_BATCH_SIZE):
+    """Write report rows to a Parquet file one row group per batch; returns the number of rows
+
+    Needs the optional pyarrow package. All report columns are strings.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export needs the pyarrow package (pip install pyarrow)")
+
+    schema = pa.schema([(column, pa.string()) for column in columns])
+    count = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == batch_size:
+                writer.write_table(_to_table(pa, schema, batch))
+                count += len(batch)
+                batch = []
+        if batch:
+            writer.write_table(_to_table(pa, schema, batch))
+            count += len(batch)
+    return count
+
+def _to_table(pa, schema, batch):
+    return pa.Table.from_arrays(
+        [pa.array([row[i] for row in batch], pa.string()) for i in range(len(schema))],
+        schema=schema,
+    )
+
+EXPORTERS = {'.csv': export_csv, '.parquet': export_parquet}
+
+def export_report(rows, path):
+    """Write report rows to a file, in the format given by its extension (.csv or .parquet)"""
+    for extension, exporter in EXPORTERS.items():
+        if path.lower().endswith(extension):
+            return exporter(rows, path)
+    raise ValueError(f"Unsupported export format: {path}")
@@ -0,0 +1,136 @@
+import queue
+import time
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+
+# How often the Tk thread picks up finished work (about one 60 Hz frame)
+POLL_MS = 16
+
+# Time the Tk thread spends on callbacks per poll, so it keeps drawing during floods of results
+POLL_BUDGET = 0.008
+
+# Treeview rows inserted per Tk tick by fill_tree
+FILL_CHUNK = 200
+
+class UiExecutor:
+    """Run blocking work (database queries, model updates) off the Tk thread
+
+    submit() runs a function on a small thread pool; its result or exception
+    is put on a thread-safe queue that the Tk thread drains every POLL_MS with
+    root.after, and on_done / on_error are called there, so callbacks may
+    touch widgets. Requests with the same key supersede each other: once a
+    newer one is submitted, an older one that has not started is skipped and
+    the result of one already running is dropped. Other threads hand widget
+    updates to the Tk thread with call_soon(). on_busy(True / False) is called
+    on the Tk thread when the first task starts and the last one finishes.
+    """
+
+    def __init__(self, root, max_workers=2, on_busy=None):
+        self.root = root
+        self.pool = ThreadPoolExecutor(max_workers, thread_name_prefix="ui-task")
+        self.results = queue.Queue()
+        self.generations = {}
+        self.pending = 0
+        self.on_busy = on_busy
+        self.closed = False
+        self.after_id = self.root.after(POLL_MS, self._poll)
+
+    def submit(self, key, func, *args, on_done=None, on_error=None, **kwargs):
+        """Run func(*args, **kwargs) on a worker thread (Tk thread only)
+
+        key names what the request is for, e.g. "report"; None means the
+        request is never superseded.
+        """
+        if self.closed:
+            return
+        generation = None
+        if key is not None:
+            generation = self.generations.get(key, 0) + 1
+            self.generations[key] = generation
+        self._set_pending(self.pending + 1)
+        self.pool.submit(self._run, key, generation, func, args, kwargs, on_done, on_error)
+
+    def cancel(self, key=None):
+        """Drop the results of pending requests for key, or for every key"""
+        for name in ([key] if key is not None else list(self.generations)):
+            self.generations[name] = self.generations.get(name, 0) + 1
+
+    def is_current(self, key, generation):
+        return key is None or self.generations.get(key) == generation
+
+    def call_soon(self, func, *args):
+        """Call func(*args) on the Tk thread (safe from any thread)"""
+        self.results.put((None, None, func, args, False))
+
+    def _run(self, key, generation, func, args, kwargs, on_done, on_error):
+        if not self.is_current(key, generation):
+            self.results.put((key, generation, None, (), True))
+            return
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            print(f"Error in background task {key or func.__name__}: {e}")
+            self.results.put((key, generation, on_error, (e,), True))
+        else:
+            self.results.put((key, generation, on_done, (result,), True))
+
+    def _poll(self):
+        if self.closed:
+            return
+        # Rescheduled first: a callback may open a modal dialog, which runs its own event loop
+        self.after_id = self.root.after(POLL_MS, self._poll)
+        deadline = time.perf_counter() + POLL_BUDGET
+        while time.perf_counter() < deadline:
+            try:
+                key, generation, callback, args, is_task = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if is_task:
+                self._set_pending(self.pending - 1)
+            if callback is None or not self.is_current(key, generation):
+                continue
+            try:
+                callback(*args)
+            except tk.TclError:
+                # The widget was destroyed meanwhile, e.g. by a logout
+                pass
+            except Exception as e:
+                print(f"Error in UI callback: {e}")
+
+    def _set_pending(self, pending):
+        was_busy = self.pending > 0
+        self.pending = pending
+        if self.on_busy and was_busy != (pending > 0):
+            try:
+                self.on_busy(pending > 0)
+            except tk.TclError:
+                pass
+
+    def fill_tree(self, key, tree, rows, chunk_size=FILL_CHUNK):
+        """Insert rows into a Treeview a chunk per Tk tick; stops if key gets a newer request"""
+        generation = self.generations.get(key)
+
+        def insert_chunk(start):
+            if self.closed or self.generations.get(key) != generation or not tree.winfo_exists():
+                return
+            for row in rows[start:start + chunk_size]:
+                tree.insert("", "end", values=row)
+            if start + chunk_size < len(rows):
+                self.root.after(1, insert_chunk, start + chunk_size)
+
+        insert_chunk(0)
+
+    def cancelled(self):
+        """True once shut down; long tasks check it between steps and stop early (any thread)"""
+        return self.closed
+
+    def shutdown(self):
+        """Stop polling and drop queued tasks without waiting for running ones
+
+        A running task finishes on its own, so long ones (exports, bulk
+        enrollment) poll cancelled() to stop early; their results are
+        discarded.
+        """
+        self.closed = True
+        self.root.after_cancel(self.after_id)
+        self.pool.shutdown(wait=False, cancel_futures=True)
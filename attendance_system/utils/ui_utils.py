@@ -1,11 +1,10 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import cv2
-from PIL import Image, ImageTk
 import datetime
 import time
 import os
 import threading
+from attendance_system.utils import metrics
 
 def center_window(window, width, height):
     """Center a tkinter window on the screen"""
@@ -68,6 +67,49 @@ def create_video_frame(parent, width=640, height=480):
     
     return frame, video_label
 
+class LatestFrame:
+    """Single-slot frame buffer: writers replace the frame, readers get only the newest"""
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.frame = None
+        self.frame_id = 0
+        self.timestamp = 0.0
+        self.closed = False
+    
+    def put(self, frame):
+        """Replace the held frame with a newer one"""
+        with self.condition:
+            self.frame = frame
+            self.frame_id += 1
+            self.timestamp = time.perf_counter()
+            self.condition.notify_all()
+    
+    def get_newer(self, last_id, timeout=0.5):
+        """Wait for a frame newer than last_id; returns (frame_id, frame, timestamp) or None"""
+        with self.condition:
+            self.condition.wait_for(lambda: self.frame_id > last_id or self.closed, timeout)
+            if self.closed or self.frame_id <= last_id:
+                return None
+            return self.frame_id, self.frame, self.timestamp
+    
+    def close(self):
+        """Wake up all waiting readers"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+class StageTimer:
+    """Moving average of a pipeline stage's duration in milliseconds"""
+    def __init__(self, smoothing=0.1):
+        self.smoothing = smoothing
+        self.average_ms = 0.0
+        self.count = 0
+    
+    def add(self, seconds):
+        ms = seconds * 1000
+        self.average_ms = ms if self.count == 0 else self.average_ms + self.smoothing * (ms - self.average_ms)
+        self.count += 1
+
 class VideoCapture:
     def __init__(self, video_source=0):
         self.video_source = video_source
@@ -77,10 +119,15 @@ class VideoCapture:
         
     def start(self):
         """Start video capture"""
+        # OpenCV is imported on first use, not when the login screen is built
+        import cv2
         self.cap = cv2.VideoCapture(self.video_source)
         if not self.cap.isOpened():
             raise ValueError("Unable to open video source", self.video_source)
         
+        # Keep the driver queue short so reads return recent frames
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        
         # Get video properties
         self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
         self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
@@ -94,6 +141,7 @@ class VideoCapture:
         if self.cap and self.cap.isOpened():
             self.cap.release()
         
+    @metrics.timed("capture")
     def get_frame(self):
         """Get a frame from the video source"""
         if self.cap is None or not self.cap.isOpened():
@@ -103,6 +151,7 @@ class VideoCapture:
         if not ret:
             return None
         
+        metrics.registry.inc("frames_captured")
         return frame
     
     def start_update_thread(self, callback, process_frame=None, delay=15):
@@ -122,16 +171,64 @@ class VideoCapture:
                 callback(frame)
             time.sleep(delay / 1000)  # delay in milliseconds
 
-def convert_cv_to_tkinter(cv_img, target_width=None, target_height=None):
-    """Convert an OpenCV image to a tkinter-compatible photo image"""
-    if target_width and target_height:
+@metrics.timed("display_convert")
+def convert_cv_to_pil(cv_img, target_width=None, target_height=None):
+    """Convert an OpenCV image to a PIL image (safe off the Tk thread, unlike PhotoImage)"""
+    import cv2
+    import numpy as np
+    from PIL import Image
+    
+    if target_width and target_height and cv_img.shape[:2] != (target_height, target_width):
         cv_img = cv2.resize(cv_img, (target_width, target_height))
     
-    # Convert to RGB (from BGR)
-    rgb_img = cv2.cvtColor(cv_img, cv2.COLOR_BGR2RGB)
-    pil_img = Image.fromarray(rgb_img)
-    tk_img = ImageTk.PhotoImage(image=pil_img)
-    return tk_img
+    # Let PIL read the BGR bytes directly instead of converting to RGB first
+    cv_img = np.ascontiguousarray(cv_img)
+    height, width = cv_img.shape[:2]
+    return Image.frombuffer("RGB", (width, height), cv_img, "raw", "BGR", 0, 1)
+
+class LabelFeed:
+    """Show frames produced by another thread in a Tk label
+    
+    Producer threads put() PIL images into a single slot, the newest replacing
+    any not shown yet; the Tk thread picks it up every interval ms and sets it
+    on the label. No Tk call is made from the producer thread.
+    """
+    def __init__(self, label, interval=15):
+        self.label = label
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.image = None
+        self.after_id = None
+    
+    def put(self, image):
+        """Offer a new frame (any thread)"""
+        with self.lock:
+            self.image = image
+    
+    def start(self):
+        self._show()
+    
+    def stop(self):
+        """Stop updating and clear the label (Tk thread)"""
+        if self.after_id:
+            self.label.after_cancel(self.after_id)
+            self.after_id = None
+        with self.lock:
+            self.image = None
+        if self.label.winfo_exists():
+            self.label.configure(image='')
+            self.label.image = None
+    
+    def _show(self):
+        from PIL import ImageTk
+        
+        with self.lock:
+            image, self.image = self.image, None
+        if image is not None:
+            tk_img = ImageTk.PhotoImage(image=image)
+            self.label.configure(image=tk_img)
+            self.label.image = tk_img
+        self.after_id = self.label.after(self.interval, self._show)
 
 def get_current_datetime():
     """Get current date and time as strings"""
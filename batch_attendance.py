@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Headless attendance from recorded video files, streams and image folders
+
+Usage:
+    python batch_attendance.py SOURCE [SOURCE ...] [--stride N] [--width W]
+                               [--roi X,Y,W,H] [--start "YYYY-MM-DD HH:MM:SS"] [--db PATH] [--config PATH]
+
+A SOURCE is a video file, a stream URL (rtsp://..., http://...), a camera
+index or a directory of images. Every --stride'th video frame goes through
+detection (on a --width pixels wide copy of the image, or of the --roi
+region given as fractions of the image if set) and recognition on full-resolution face crops; in videos
+each face is tracked and must be recognized as the same student --min-votes
+times.
+Attendance is recorded once per student and day at the time the student was
+first seen: --start plus the video position (default: now).
+"""
+import argparse
+import datetime
+import os
+import time
+
+from attendance_system.config import CONFIG_PATH, load_config
+from attendance_system.database.db_manager import DatabaseManager
+from attendance_system.database.attendance_writer import AttendanceWriter
+from attendance_system.utils.face_tracker import FaceTracker
+from attendance_system.utils.frame_sources import FrameSource
+from attendance_system.utils.recognition_engine import create_engine_from_config
+from attendance_system.utils.adaptive_detection import roi_box
+
+def recognize_frame(engine, tracker, frame, width, roi=None):
+    """Detect and recognize the faces of a frame; returns (faces, newly identified student ids)"""
+    boxes = engine.detect_boxes(frame, width, roi_box(roi, frame.shape))
+    if tracker is None:
+        # Unrelated images: every recognized face counts
+        student_ids = engine.recognize_batch(frame, boxes)
+        return len(boxes), [student_id for student_id in student_ids if student_id != -1]
+
+    tracks = tracker.update(boxes)
+    due = [(track, box) for track, box in zip(tracks, boxes) if tracker.needs_recognition(track)]
+    student_ids = engine.recognize_batch(frame, [box for _, box in due])
+    identities = [tracker.add_vote(track, student_id) for (track, _), student_id in zip(due, student_ids)]
+    return len(boxes), [identity for identity in identities if identity is not None]
+
+def process_source(source, engine, writer, marked, args):
+    """Run one source through the recognizer and queue its attendance"""
+    # Images of a folder are unrelated shots: none is skipped
+    frames = FrameSource(source, 1 if os.path.isdir(source) else args.stride)
+    tracker = FaceTracker(min_votes=args.min_votes)
+    start_time = args.start or datetime.datetime.now()
+    processed = faces = students = 0
+
+    start = time.perf_counter()
+    try:
+        for _, timestamp_ms, frame in frames:
+            processed += 1
+            frame_faces, identities = recognize_frame(
+                engine, None if frames.is_image_dir else tracker, frame, args.width, args.roi
+            )
+            faces += frame_faces
+
+            seen_at = start_time + datetime.timedelta(milliseconds=timestamp_ms or 0)
+            date_str = seen_at.strftime("%Y-%m-%d")
+            for student_id in identities:
+                # First sighting of the day only; the database would keep the last one
+                if (student_id, date_str) not in marked:
+                    # A record dropped by a full queue is retried on the student's next sighting
+                    if writer.submit(student_id, date_str, seen_at.strftime("%H:%M:%S")):
+                        marked.add((student_id, date_str))
+                        students += 1
+    except Exception as e:
+        print(f"Error processing {source}: {e}")
+    elapsed = max(time.perf_counter() - start, 1e-9)
+
+    report = (f"{source}: {frames.frames_read} frames read, {processed} processed in {elapsed:.1f} s "
+              f"({frames.frames_read / elapsed:.1f} frames/s, {processed / elapsed:.1f} processed/s), "
+              f"{faces} faces, {students} students marked")
+    duration = frames.duration()
+    if duration:
+        report += f", {duration / elapsed:.1f}x real time"
+    print(report)
+    return frames.frames_read, elapsed
+
+def parse_roi(value):
+    return tuple(float(v) for v in value.split(','))
+
+def parse_start(value):
+    return datetime.datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('sources', nargs='+')
+    parser.add_argument('--stride', type=int, default=5, help="process every Nth frame")
+    parser.add_argument('--width', type=int, default=320, help="detection width in pixels")
+    parser.add_argument('--roi', type=parse_roi, default=None, help="region of interest x,y,w,h as fractions")
+    parser.add_argument('--min-votes', type=int, default=3, help="recognitions needed per tracked face")
+    parser.add_argument('--start', type=parse_start, default=None, help="recording start time")
+    parser.add_argument('--db', default='attendance.db')
+    parser.add_argument('--config', default=CONFIG_PATH)
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    db = DatabaseManager(args.db)
+    engine = create_engine_from_config(config)
+    engine.sync(db)
+
+    marked = set()
+    failed = set()
+
+    def on_failure(records):
+        # Writer thread: students of a batch that could not be written are submitted again if seen again
+        for student_id, date_str, _, _ in records:
+            marked.discard((student_id, date_str))
+            failed.add((student_id, date_str))
+
+    writer = AttendanceWriter(db, on_failure=on_failure)
+
+    total_frames = 0
+    total_elapsed = 0.0
+    try:
+        for source in args.sources:
+            frames_read, elapsed = process_source(source, engine, writer, marked, args)
+            total_frames += frames_read
+            total_elapsed += elapsed
+    finally:
+        writer.close()
+        db.close()
+
+    stats = writer.stats()
+    # Failed records not written by a later retry
+    unrecorded = failed - marked
+    print(f"total: {total_frames} frames in {total_elapsed:.1f} s "
+          f"({total_frames / max(total_elapsed, 1e-9):.1f} frames/s), "
+          f"{stats['written']} attendance records written, {len(unrecorded)} could not be written, "
+          f"{stats['dropped']} dropped by a full queue")
+    for student_id, date_str in sorted(unrecorded):
+        print(f"not recorded: student {student_id} on {date_str}")
+
+if __name__ == "__main__":
+    main()
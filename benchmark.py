@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""Performance benchmarks for the attendance system
+
+Usage:
+    python benchmark.py index [--size N] [--queries M] [--lists L]
+    python benchmark.py frame [--frames N] [--faces F]
+    python benchmark.py detectors IMAGE_DIR [--annotations CSV] [--detectors haar,lbp,dnn,yunet] [--widths 320,640]
+    python benchmark.py engines PEOPLE_DIR [--engines lbph,embedding] [--enroll K] [--detector haar]
+    python benchmark.py startup [--runs N] [--budget-ms MS]
+
+The detectors benchmark reads images from a local directory. Ground truth is an
+optional CSV of "file,x,y,w,h" rows (one per face); without it every image is
+assumed to hold at least one face and recall is the share of images with a
+detection.
+
+The engines benchmark reads PEOPLE_DIR/<person>/<image>: the first K images of
+each person are enrolled, the others are recognized.
+
+The startup benchmark imports the application in fresh interpreters with
+`python -X importtime`, lists the slowest imports and exits with status 1 if
+the import takes longer than the budget or loads one of the heavy vision
+modules, which must stay deferred until after login.
+"""
+import argparse
+import csv
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+import cv2
+import numpy as np
+
+from attendance_system.utils.face_index import create_index
+from attendance_system.utils.face_detectors import create_detector
+from attendance_system.utils.face_tracker import box_iou
+from attendance_system.utils.recognition_engine import create_engine
+from attendance_system.database.face_template import encode_template
+from attendance_system.utils.frame_context import FrameContext
+
+def synthetic_encodings(count, dim=128, seed=0):
+    """Random unit-scale encodings with some cluster structure, like real faces"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(1, count // 500), dim)).astype(np.float32)
+    encodings = centers[rng.integers(len(centers), size=count)]
+    encodings += 0.5 * rng.normal(size=(count, dim)).astype(np.float32)
+    return encodings / np.linalg.norm(encodings, axis=1, keepdims=True)
+
+def benchmark_index(args):
+    """Report latency and recall@1 of the IVF index against exact search"""
+    encodings = synthetic_encodings(args.size)
+    student_ids = np.arange(args.size)
+    rng = np.random.default_rng(1)
+    # Probes are noisy copies of enrolled faces, as from a camera
+    probes = encodings[rng.integers(args.size, size=args.queries)]
+    probes = probes + 0.05 * rng.normal(size=probes.shape).astype(np.float32)
+
+    exact = create_index('brute')
+    exact.build(student_ids, encodings)
+    start = time.perf_counter()
+    exact_ids, _ = exact.search(probes)
+    exact_time = time.perf_counter() - start
+    print(f"gallery={args.size} queries={args.queries}")
+    print(f"{'brute':>12}: {exact_time / args.queries * 1000:8.3f} ms/query  recall@1 1.000")
+
+    start = time.perf_counter()
+    ivf = create_index('ivf', n_lists=args.lists)
+    ivf.build(student_ids, encodings)
+    print(f"ivf build ({len(ivf.centroids)} lists): {time.perf_counter() - start:.2f} s")
+
+    for n_probe in (1, 2, 4, 8, 16, 32):
+        if n_probe > len(ivf.centroids):
+            break
+        start = time.perf_counter()
+        ids, _ = ivf.search(probes, n_probe=n_probe)
+        elapsed = time.perf_counter() - start
+        recall = np.mean(ids == exact_ids)
+        print(f"{'ivf n_probe=' + str(n_probe):>12}: {elapsed / args.queries * 1000:8.3f} ms/query  recall@1 {recall:.3f}")
+
+def legacy_frame_path(detector, frame, boxes):
+    """Approximation of the camera loop's per-frame work before FrameContext
+
+    Rebuilt from the steps the old loop took (a gray conversion per
+    detection and per face, a full-size render copy, an RGB copy for
+    display), not the replaced code itself, so "before" figures are an
+    estimate of the old cost.
+    """
+    small = detector.resize_frame(frame, width=320)
+    gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)                   # detect_faces
+    for (x, y, w, h) in boxes:
+        face = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)[y:y+h, x:x+w]   # extract_face, per face
+        face = cv2.equalizeHist(cv2.resize(face, (100, 100)))
+    drawn = frame.copy()                                              # render copy
+    for (x, y, w, h) in boxes:
+        cv2.rectangle(drawn, (x, y), (x+w, y+h), (0, 255, 0), 2)
+    display = cv2.resize(drawn, (400, 300))                           # display conversion
+    return cv2.cvtColor(display, cv2.COLOR_BGR2RGB), gray
+
+def frame_context_path(detector, frame, boxes):
+    """Per-frame work of the camera loop with a shared FrameContext"""
+    small = FrameContext(frame).resized(320)
+    gray = small.gray                                                 # computed once
+    for box in boxes:
+        face = detector.extract_face(small, box)
+    display = cv2.resize(frame, (400, 300))
+    for (x, y, w, h) in boxes:
+        cv2.rectangle(display, (x, y), (x+w, y+h), (0, 255, 0), 2)
+    # convert_cv_to_pil reads BGR directly, no RGB copy
+    return display, gray
+
+def benchmark_frame(args):
+    """Time and allocations per frame of the frame-processing hot path (no cascade)"""
+    from attendance_system.utils.face_utils_simple import FaceDetector
+
+    detector = FaceDetector()
+    frame = np.random.default_rng(0).integers(0, 255, (720, 1280, 3), dtype=np.uint8)
+    boxes = [(20 + 45 * i % 260, 20 + 30 * (i // 6), 40, 40) for i in range(args.faces)]
+
+    print(f"frame=1280x720 faces={args.faces} frames={args.frames} (before: approximate, see legacy_frame_path)")
+    for name, path in (("before", legacy_frame_path), ("after", frame_context_path)):
+        path(detector, frame, boxes)
+        start = time.perf_counter()
+        for _ in range(args.frames):
+            path(detector, frame, boxes)
+        elapsed = time.perf_counter() - start
+
+        tracemalloc.start()
+        for _ in range(args.frames):
+            path(detector, frame, boxes)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        # numpy reports its buffers to tracemalloc; peak covers one frame's live arrays
+        print(f"{name:>7}: {elapsed / args.frames * 1000:7.3f} ms/frame  peak {peak / 1024:8.1f} KiB")
+
+def load_images(image_dir):
+    """(file name, image) of every readable image in a directory"""
+    images = []
+    for name in sorted(os.listdir(image_dir)):
+        if os.path.splitext(name)[1].lower() in ('.jpg', '.jpeg', '.png', '.bmp'):
+            image = cv2.imread(os.path.join(image_dir, name))
+            if image is not None:
+                images.append((name, image))
+    return images
+
+def load_annotations(path):
+    """Ground-truth boxes per file name from a file,x,y,w,h CSV"""
+    annotations = {}
+    with open(path, newline='') as f:
+        for row in csv.reader(f):
+            if len(row) != 5 or not row[1].strip().lstrip('-').isdigit():
+                continue   # header or malformed row
+            annotations.setdefault(row[0], []).append(tuple(int(v) for v in row[1:]))
+    return annotations
+
+def detection_recall(boxes, truth, iou_threshold=0.5):
+    """Number of ground-truth faces matched by a detection"""
+    unmatched = list(boxes)
+    found = 0
+    for face in truth:
+        best = max(unmatched, key=lambda box: box_iou(box, face), default=None)
+        if best is not None and box_iou(best, face) >= iou_threshold:
+            unmatched.remove(best)
+            found += 1
+    return found
+
+def benchmark_detectors(args):
+    """Throughput and recall of each face detector backend at each input width"""
+    images = load_images(args.image_dir)
+    if not images:
+        print(f"No images found in {args.image_dir}")
+        return
+    annotations = load_annotations(args.annotations) if args.annotations else None
+    widths = [int(w) if w != 'full' else None for w in args.widths.split(',')]
+    print(f"images={len(images)} ground truth={'yes' if annotations else 'no (1+ face per image)'}")
+
+    for name in args.detectors.split(','):
+        for width in widths:
+            label = f"{name}@{width or 'full'}"
+            try:
+                detector = create_detector(name, input_width=width) if width else create_detector(name)
+            except Exception as e:
+                print(f"{label:>12}: unavailable ({e})")
+                continue
+
+            detector.detect(images[0][1])   # warm-up
+            found = total = detections = 0
+            start = time.perf_counter()
+            for file_name, image in images:
+                boxes = detector.detect(image)
+                detections += len(boxes)
+                if annotations is None:
+                    found += bool(boxes)
+                    total += 1
+                else:
+                    truth = annotations.get(file_name, [])
+                    found += detection_recall(boxes, truth)
+                    total += len(truth)
+            elapsed = time.perf_counter() - start
+            recall = found / float(total) if total else 0.0
+            print(f"{label:>12}: {len(images) / elapsed:8.1f} images/s  "
+                  f"{elapsed / len(images) * 1000:7.2f} ms/image  recall {recall:.3f}  detections {detections}")
+
+def largest_box(boxes):
+    """The largest (x, y, w, h) box, None if there are none"""
+    return max(boxes, key=lambda box: box[2] * box[3], default=None)
+
+def benchmark_engines(args):
+    """Enrollment, training and recognition cost and accuracy of each recognition engine"""
+    people = sorted(d for d in os.listdir(args.people_dir) if os.path.isdir(os.path.join(args.people_dir, d)))
+    images = {person: load_images(os.path.join(args.people_dir, person)) for person in people}
+    print(f"people={len(people)} images={sum(len(v) for v in images.values())} enroll={args.enroll}/person")
+
+    for name in args.engines.split(','):
+        try:
+            engine = create_engine(name, create_detector(args.detector))
+        except Exception as e:
+            print(f"{name:>10}: unavailable ({e})")
+            continue
+
+        # Enrollment: detect and crop, as the capture window does
+        start = time.perf_counter()
+        face_data = []
+        for student_id, person in enumerate(people, 1):
+            for _, image in images[person][:args.enroll]:
+                box = largest_box(engine.detect(image))
+                if box is not None:
+                    face, _ = engine.enroll_sample(image, box)
+                    face_data.append((student_id, encode_template(face)))
+        enroll_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        engine.train(face_data)
+        train_time = time.perf_counter() - start
+
+        correct = unknown = total = 0
+        detect_time = recognize_time = 0.0
+        for student_id, person in enumerate(people, 1):
+            for _, image in images[person][args.enroll:]:
+                frame = FrameContext(image)
+                start = time.perf_counter()
+                boxes = engine.detect(frame)
+                detect_time += time.perf_counter() - start
+                total += 1
+                box = largest_box(boxes)
+                if box is None:
+                    unknown += 1
+                    continue
+                start = time.perf_counter()
+                predicted = engine.recognize_batch(frame, [box])[0]
+                recognize_time += time.perf_counter() - start
+                correct += predicted == student_id
+                unknown += predicted == -1
+
+        total = max(total, 1)
+        print(f"{name:>10}: enroll {len(face_data)} faces {enroll_time:.2f} s, train {train_time:.2f} s | "
+              f"detect {detect_time / total * 1000:.1f} ms, recognize {recognize_time / total * 1000:.1f} ms per image | "
+              f"accuracy {correct / total:.3f}, unknown {unknown / total:.3f}")
+
+# Modules that must not be imported before the login screen is shown
+DEFERRED_MODULES = ('cv2', 'numpy', 'PIL', 'face_recognition', 'dlib')
+
+def import_times(module):
+    """(module, self us, cumulative us) of every import done by a fresh interpreter importing module"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        times.append((name.strip(), int(self_us), int(cumulative_us)))
+    return times
+
+def benchmark_startup(args):
+    """Import time of the application module, as on the way to the login screen"""
+    module = 'attendance_system.app'
+    runs = [import_times(module) for _ in range(args.runs)]
+    totals = [next(c for name, _, c in times if name == module) for times in runs]
+    best = min(range(args.runs), key=lambda i: totals[i])
+    times = runs[best]
+
+    print(f"import {module}: best {totals[best] / 1000:.1f} ms, "
+          f"median {sorted(totals)[len(totals) // 2] / 1000:.1f} ms over {args.runs} runs")
+    print("slowest imports (self time):")
+    for name, self_us, cumulative_us in sorted(times, key=lambda t: t[1], reverse=True)[:10]:
+        print(f"  {self_us / 1000:7.1f} ms  (cumulative {cumulative_us / 1000:7.1f} ms)  {name}")
+
+    loaded = sorted({name for name, _, _ in times if name.split('.')[0] in DEFERRED_MODULES})
+    failed = False
+    if loaded:
+        print(f"FAIL: heavy modules imported at startup: {', '.join(loaded)}")
+        failed = True
+    if totals[best] / 1000 > args.budget_ms:
+        print(f"FAIL: startup import exceeds the {args.budget_ms:.0f} ms budget")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("OK")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    index_parser = subparsers.add_parser('index', help="face index recall vs latency")
+    index_parser.add_argument('--size', type=int, default=50000)
+    index_parser.add_argument('--queries', type=int, default=200)
+    index_parser.add_argument('--lists', type=int, default=None)
+    index_parser.set_defaults(func=benchmark_index)
+
+    frame_parser = subparsers.add_parser('frame', help="per-frame conversions and copies")
+    frame_parser.add_argument('--frames', type=int, default=200)
+    frame_parser.add_argument('--faces', type=int, default=12)
+    frame_parser.set_defaults(func=benchmark_frame)
+
+    detectors_parser = subparsers.add_parser('detectors', help="face detector throughput and recall")
+    detectors_parser.add_argument('image_dir')
+    detectors_parser.add_argument('--annotations', default=None)
+    detectors_parser.add_argument('--detectors', default='haar,lbp,dnn,yunet')
+    detectors_parser.add_argument('--widths', default='320,640,full')
+    detectors_parser.set_defaults(func=benchmark_detectors)
+
+    engines_parser = subparsers.add_parser('engines', help="recognition engine cost and accuracy")
+    engines_parser.add_argument('people_dir')
+    engines_parser.add_argument('--engines', default='lbph,embedding')
+    engines_parser.add_argument('--enroll', type=int, default=3)
+    engines_parser.add_argument('--detector', default='haar')
+    engines_parser.set_defaults(func=benchmark_engines)
+
+    startup_parser = subparsers.add_parser('startup', help="application import time (-X importtime)")
+    startup_parser.add_argument('--runs', type=int, default=5)
+    startup_parser.add_argument('--budget-ms', type=float, default=300.0)
+    startup_parser.set_defaults(func=benchmark_startup)
+
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Enroll many students at once from a CSV manifest and a folder of photos
+
+Usage:
+    python bulk_enroll.py MANIFEST.csv PHOTO_DIR [--workers N] [--report PATH] [--db PATH] [--config PATH]
+
+The manifest has a header row with the columns name, roll_number,
+department and password, and optionally username (default: the roll number)
+and photos: image files or folders relative to PHOTO_DIR separated by ';'
+(default: PHOTO_DIR/<roll_number>/ or PHOTO_DIR/<roll_number>.jpg).
+The largest face of every photo becomes one of the student's face samples.
+Photos and students that could not be enrolled are listed in the --report
+CSV file.
+"""
+import argparse
+import time
+
+from attendance_system.config import CONFIG_PATH, load_config
+from attendance_system.database.db_manager import DatabaseManager
+from attendance_system.utils.bulk_enrollment import DETECTION_WIDTH, enroll_students, write_report
+from attendance_system.utils.recognition_engine import create_engine_from_config
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('manifest')
+    parser.add_argument('photo_dir')
+    parser.add_argument('--workers', type=int, default=None, help="face cropping processes (default: CPU count)")
+    parser.add_argument('--width', type=int, default=DETECTION_WIDTH, help="detection width in pixels")
+    parser.add_argument('--report', default='enrollment_failures.csv', help="CSV file listing the failures")
+    parser.add_argument('--db', default='attendance.db')
+    parser.add_argument('--config', default=CONFIG_PATH)
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    db = DatabaseManager(args.db)
+    engine = create_engine_from_config(config)
+
+    start = time.perf_counter()
+    try:
+        enrolled, failures = enroll_students(
+            db, args.manifest, args.photo_dir, config, engine, args.workers, args.width,
+            progress=lambda done, total: print(f"{done}/{total} students processed")
+        )
+    finally:
+        db.close()
+    elapsed = time.perf_counter() - start
+
+    print(f"{enrolled} students enrolled in {elapsed:.1f} s, {len(failures)} failures")
+    if failures:
+        write_report(failures, args.report)
+        print(f"Failures written to {args.report}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+# The tests import the application package from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from attendance_system.database.db_manager import DatabaseManager
+
+@pytest.fixture
+def db(tmp_path):
+    """A DatabaseManager on a fresh database file"""
+    db = DatabaseManager(str(tmp_path / "attendance.db"))
+    yield db
+    db.close()
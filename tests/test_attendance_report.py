@@ -0,0 +1,63 @@
+import pytest
+
+def add_students(db, students):
+    """Add (name, department) students; returns their ids"""
+    ids = []
+    for i, (name, department) in enumerate(students):
+        user_id = db.add_user(f"user{i}", "password", "student")
+        ids.append(db.add_student(user_id, name, f"R{i:03d}", department))
+    return ids
+
+@pytest.fixture
+def report_db(db):
+    # Students share names and days so the key has to break ties on all three columns
+    ids = add_students(db, [("Ann", "CS"), ("Bob", "EE"), ("Ann", "EE"), ("Cid", "CS")])
+    records = []
+    for day in range(1, 6):
+        for n, student_id in enumerate(ids):
+            if (day + n) % 4:
+                status = "absent" if (day * n) % 3 == 1 else "present"
+                records.append((student_id, f"2026-01-{day:02d}", f"09:{n:02d}:00", status))
+    assert db.mark_attendance_batch(records)
+    return db
+
+def expected_report(db, **filters):
+    """The report built with one unpaged query, in report order"""
+    query = """
+    SELECT s.name, s.roll_number, s.department, a.date, a.time, a.status, a.attendance_id
+    FROM attendance a JOIN students s ON a.student_id = s.student_id
+    """
+    rows = db.connections.cursor().execute(query).fetchall()
+    rows = [row for row in rows
+            if (not filters.get("from_date") or filters["from_date"] <= row[3] <= filters["to_date"])
+            and (not filters.get("department") or row[2] == filters["department"])
+            and (not filters.get("status") or row[5] == filters["status"])]
+    rows.sort(key=lambda row: (row[0], row[6]))
+    rows.sort(key=lambda row: row[3], reverse=True)
+    return [row[:6] for row in rows]
+
+@pytest.mark.parametrize("page_size", [1, 2, 3, 7, 100])
+def test_pages_cover_the_report_in_order(report_db, page_size):
+    rows = list(report_db.iter_attendance_report(page_size=page_size))
+    assert rows == expected_report(report_db)
+
+@pytest.mark.parametrize("filters", [
+    {"from_date": "2026-01-02", "to_date": "2026-01-04"},
+    {"department": "EE"},
+    {"status": "absent"},
+    {"from_date": "2026-01-01", "to_date": "2026-01-03", "department": "CS", "status": "present"},
+])
+def test_filtered_pages_match_the_unpaged_report(report_db, filters):
+    rows = list(report_db.iter_attendance_report(page_size=2, **filters))
+    assert rows == expected_report(report_db, **filters)
+    assert report_db.get_attendance_report(**filters) == rows
+
+def test_last_page_has_no_next_key(report_db):
+    total = len(expected_report(report_db))
+    rows, after = report_db.get_attendance_report_page(limit=total + 1)
+    assert len(rows) == total and after is None
+
+    rows, after = report_db.get_attendance_report_page(limit=total - 1)
+    assert len(rows) == total - 1 and after is not None
+    rows, after = report_db.get_attendance_report_page(after=after, limit=total - 1)
+    assert len(rows) == 1 and after is None
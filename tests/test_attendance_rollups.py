@@ -0,0 +1,91 @@
+import sqlite3
+
+from attendance_system.database import migrations
+from attendance_system.database.migrations import apply_migrations, get_migrations
+
+DAILY = "SELECT date, department, present, absent FROM daily_department_attendance WHERE present OR absent"
+MONTHLY = "SELECT student_id, month, present, absent FROM student_monthly_attendance WHERE present OR absent"
+
+def recount(conn):
+    """The rollup totals computed from scratch: (daily, monthly)"""
+    daily = conn.execute("""
+        SELECT a.date, s.department, SUM(a.status = 'present'), SUM(a.status = 'absent')
+        FROM attendance a JOIN students s ON a.student_id = s.student_id
+        GROUP BY a.date, s.department
+    """).fetchall()
+    monthly = conn.execute("""
+        SELECT student_id, substr(date, 1, 7), SUM(status = 'present'), SUM(status = 'absent')
+        FROM attendance GROUP BY student_id, substr(date, 1, 7)
+    """).fetchall()
+    return sorted(daily), sorted(monthly)
+
+def rollups(conn):
+    return sorted(conn.execute(DAILY).fetchall()), sorted(conn.execute(MONTHLY).fetchall())
+
+def add_student(db, name, department):
+    user_id = db.add_user(name, "password", "student")
+    return db.add_student(user_id, name, f"R-{name}", department)
+
+def test_marks_are_added_to_the_totals(db):
+    ann = add_student(db, "ann", "CS")
+    bob = add_student(db, "bob", "EE")
+    db.mark_attendance_batch([
+        (ann, "2026-01-30", "09:00:00", "present"),
+        (ann, "2026-02-02", "09:00:00", "absent"),
+        (bob, "2026-01-30", "09:05:00", "present"),
+    ])
+    conn = db.connections.connection()
+    assert rollups(conn) == recount(conn)
+    assert db.get_daily_attendance_summary("2026-01-01", "2026-02-28") == [
+        ("2026-02-02", 0, 1), ("2026-01-30", 2, 0)
+    ]
+
+def test_changed_and_deleted_marks_move_between_totals(db):
+    ann = add_student(db, "ann", "CS")
+    db.mark_attendance(ann, "2026-03-02", "09:00:00")
+    db.mark_attendance(ann, "2026-03-03", "09:00:00")
+    # The upsert changes the status of an existing mark
+    db.mark_attendance(ann, "2026-03-02", "11:00:00", "absent")
+    conn = db.connections.connection()
+    assert rollups(conn) == recount(conn)
+    assert conn.execute(MONTHLY).fetchall() == [(ann, "2026-03", 1, 1)]
+
+    with db.connections.transaction() as cursor:
+        cursor.execute("UPDATE attendance SET date = '2026-04-01' WHERE date = '2026-03-03'")
+        cursor.execute("DELETE FROM attendance WHERE date = '2026-03-02'")
+    assert rollups(conn) == recount(conn)
+    assert conn.execute(MONTHLY).fetchall() == [(ann, "2026-04", 1, 0)]
+
+def test_department_change_moves_daily_marks(db):
+    ann = add_student(db, "ann", "CS")
+    bob = add_student(db, "bob", "CS")
+    db.mark_attendance_batch([
+        (ann, "2026-05-04", "09:00:00", "present"),
+        (ann, "2026-05-05", "09:00:00", "absent"),
+        (bob, "2026-05-04", "09:00:00", "present"),
+    ])
+    with db.connections.transaction() as cursor:
+        cursor.execute("UPDATE students SET department = 'EE' WHERE student_id = ?", (ann,))
+    conn = db.connections.connection()
+    assert rollups(conn) == recount(conn)
+    assert sorted(conn.execute(DAILY).fetchall()) == [
+        ("2026-05-04", "CS", 1, 0), ("2026-05-04", "EE", 1, 0), ("2026-05-05", "EE", 0, 1)
+    ]
+
+def test_migration_counts_existing_attendance(tmp_path, monkeypatch):
+    conn = sqlite3.connect(str(tmp_path / "old.db"), isolation_level=None)
+    # A database from before the rollup migration
+    all_migrations = get_migrations()
+    monkeypatch.setattr(migrations, "get_migrations", lambda: [m for m in all_migrations if m[0] < 3])
+    apply_migrations(conn)
+    user_id = conn.execute("INSERT INTO users (username, password, role) VALUES ('ann', 'pw', 'student')").lastrowid
+    student_id = conn.execute("INSERT INTO students (user_id, name, roll_number, department) VALUES (?, 'ann', 'R1', 'CS')",
+                              (user_id,)).lastrowid
+    marks = [("2026-06-01", "present"), ("2026-06-02", "absent"), ("2026-07-01", "present")]
+    conn.executemany("INSERT INTO attendance (student_id, date, time, status) VALUES (?, ?, '09:00:00', ?)",
+                     [(student_id, date, status) for date, status in marks])
+
+    monkeypatch.setattr(migrations, "get_migrations", lambda: all_migrations)
+    assert apply_migrations(conn) == [3]
+    assert rollups(conn) == recount(conn)
+    assert sorted(conn.execute(MONTHLY).fetchall()) == [(student_id, "2026-06", 1, 1), (student_id, "2026-07", 1, 0)]
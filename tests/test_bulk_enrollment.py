@@ -0,0 +1,112 @@
+import sqlite3
+
+import numpy as np
+import pytest
+
+from attendance_system.utils.bulk_enrollment import read_manifest, write_students
+
+HEADER = "name,roll_number,department,username,password,photos\n"
+
+def write_manifest(tmp_path, rows, header=HEADER):
+    path = tmp_path / "manifest.csv"
+    path.write_text(header + "".join(row + "\n" for row in rows), encoding="utf-8")
+    return str(path)
+
+@pytest.fixture
+def photo_dir(tmp_path):
+    photos = tmp_path / "photos"
+    (photos / "R2").mkdir(parents=True)
+    for name in ("R1.jpg", "R2/a.png", "R2/b.jpg", "R2/notes.txt", "group.jpg"):
+        (photos / name).write_bytes(b"")
+    return str(photos)
+
+def face(value=0):
+    return np.full((4, 4, 3), value, dtype=np.uint8)
+
+def test_manifest_rows_and_photo_resolution(tmp_path, photo_dir):
+    manifest = write_manifest(tmp_path, [
+        "Ann,R1,CS,,pw,",
+        "Bob,R2,EE,bob,pw,",
+        "Cid,R3,CS,,pw,group.jpg; R2",
+    ])
+    students, failures = read_manifest(manifest, photo_dir)
+    assert failures == []
+    assert [(s["line"], s["username"]) for s in students] == [(2, "R1"), (3, "bob"), (4, "R3")]
+
+    paths = [[p[len(photo_dir) + 1:] for p in s["paths"]] for s in students]
+    # Own file by roll number, own directory (images only), then the listed entries
+    assert paths == [["R1.jpg"], ["R2/a.png", "R2/b.jpg"], ["group.jpg", "R2/a.png", "R2/b.jpg"]]
+
+def test_bad_manifest_rows_are_reported_at_their_line(tmp_path, photo_dir):
+    manifest = write_manifest(tmp_path, [
+        "Ann,R1,CS,,,",
+        ",R2,EE,,pw,",
+        "Dee,R4,CS,,pw,",
+        "Eve,R1,CS,eve,pw,missing.jpg",
+    ])
+    students, failures = read_manifest(manifest, photo_dir)
+    assert students == []
+    assert failures == [
+        (2, "R1", "", "Missing password"),
+        (3, "R2", "", "Missing name"),
+        (4, "R4", "", "No photos found"),
+        (5, "R1", "missing.jpg", "No photos found"),
+    ]
+
+def test_manifest_without_required_columns_is_rejected(tmp_path, photo_dir):
+    manifest = write_manifest(tmp_path, ["Ann,R1"], header="name,roll_number\n")
+    with pytest.raises(ValueError, match="department, password"):
+        read_manifest(manifest, photo_dir)
+
+def test_bulk_add_skips_taken_and_repeated_students(db):
+    user_id = db.add_user("taken", "pw", "student")
+    db.add_student(user_id, "Old", "R0", "CS")
+
+    added, skipped = db.add_students_bulk([
+        ("ann", "pw", "Ann", "R1", "CS", [(face(1), 0.2), (face(2), 0.9)]),
+        ("taken", "pw", "Bob", "R2", "CS", [(face(), 0.5)]),
+        ("cid", "pw", "Cid", "R0", "CS", [(face(), 0.5)]),
+        ("dee", "pw", "Dee", "R1", "EE", [(face(), 0.5)]),
+        ("eve", "pw", "Eve", "R5", "EE", []),
+    ])
+    assert added == ["R1", "R5"]
+    assert skipped == [
+        (1, "Username taken already exists"),
+        (2, "Roll number already exists"),
+        (3, "Roll number already exists"),
+    ]
+
+    ann = db.get_student_by_roll("R1")
+    assert db.verify_user("ann", "pw") is not None
+    qualities = db.connections.cursor().execute(
+        "SELECT quality FROM face_templates WHERE student_id = ? ORDER BY template_id", (ann[0],)
+    ).fetchall()
+    # Best sample first; it also becomes the student's face_encoding
+    assert qualities == [(0.9,), (0.2,)]
+    assert db.get_student_by_roll("R5") is not None
+
+def test_write_students_reports_skips_at_their_own_line(db):
+    batch = [
+        ({"line": 2, "username": "a", "password": "pw", "name": "A", "roll_number": "R1", "department": "CS"},
+         [(face(), 0.5)]),
+        ({"line": 3, "username": "b", "password": "pw", "name": "B", "roll_number": "R1", "department": "CS"},
+         [(face(), 0.5)]),
+        ({"line": 4, "username": "c", "password": "pw", "name": "C", "roll_number": "R2", "department": "CS"},
+         [(face(), 0.5)]),
+    ]
+    failures = []
+    assert write_students(db, batch, failures) == 2
+    # The repeated roll number is reported at its second line, not the first
+    assert failures == [(3, "R1", "", "Roll number already exists")]
+
+def test_database_error_fails_every_accepted_student(db, monkeypatch):
+    def locked():
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(db.connections, "transaction", locked)
+    added, skipped = db.add_students_bulk([
+        ("ann", "pw", "Ann", "R1", "CS", [(face(), 0.5)]),
+        ("bob", "pw", "Bob", "R2", "CS", [(face(), 0.5)]),
+    ])
+    assert added == []
+    assert skipped == [(0, "Database error: database is locked"), (1, "Database error: database is locked")]
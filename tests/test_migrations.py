@@ -0,0 +1,71 @@
+import sqlite3
+
+from attendance_system.database import migrations
+from attendance_system.database.migrations import apply_migrations, get_migrations, get_schema_version, split_statements
+
+def latest_version():
+    return get_migrations()[-1][0]
+
+def connect(path):
+    return sqlite3.connect(path, isolation_level=None)
+
+def test_new_database_gets_every_migration(tmp_path):
+    conn = connect(str(tmp_path / "new.db"))
+    assert apply_migrations(conn) == [version for version, _ in get_migrations()]
+    assert get_schema_version(conn) == latest_version()
+
+def test_migrations_are_applied_once(tmp_path):
+    conn = connect(str(tmp_path / "once.db"))
+    apply_migrations(conn)
+    assert apply_migrations(conn) == []
+    count = conn.execute("SELECT COUNT(*) FROM schema_version").fetchone()[0]
+    assert count == len(get_migrations())
+
+def test_migration_applied_by_another_process_is_skipped(tmp_path, monkeypatch):
+    path = str(tmp_path / "race.db")
+    apply_migrations(connect(path))
+
+    # A second process that read the version before the first one migrated
+    monkeypatch.setattr(migrations, "get_schema_version", lambda conn: 0)
+    conn = connect(path)
+    assert apply_migrations(conn) == []
+    assert not conn.in_transaction
+
+def test_failed_migration_is_rolled_back(tmp_path, monkeypatch):
+    bad = tmp_path / "9999_broken.sql"
+    bad.write_text("CREATE TABLE partial (x INTEGER);\nINSERT INTO missing_table VALUES (1);\n")
+    monkeypatch.setattr(migrations, "get_migrations", lambda: get_migrations() + [(9999, str(bad))])
+
+    conn = connect(str(tmp_path / "rollback.db"))
+    try:
+        apply_migrations(conn)
+    except sqlite3.OperationalError:
+        pass
+    else:
+        raise AssertionError("the broken migration did not fail")
+
+    assert get_schema_version(conn) == latest_version()
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert "partial" not in tables
+
+def test_unique_attendance_per_day(db):
+    user_id = db.add_user("s1", "pw", "student")
+    db.add_student(user_id, "Student", "R1", "CS")
+    student_id = db.get_student_by_roll("R1")[0]
+
+    assert db.mark_attendance(student_id, "2026-01-05", "09:00:00")
+    assert db.mark_attendance(student_id, "2026-01-05", "10:30:00", "absent")
+    rows = db.connections.cursor().execute("SELECT time, status FROM attendance").fetchall()
+    assert rows == [("10:30:00", "absent")]
+
+def test_split_statements_keeps_trigger_bodies():
+    script = (
+        "CREATE TABLE a (x INTEGER);\n"
+        "CREATE TRIGGER t AFTER INSERT ON a BEGIN\n"
+        "    INSERT INTO a VALUES (1);\n"
+        "    DELETE FROM a WHERE x = ';';\n"
+        "END;\n"
+    )
+    statements = [s.strip() for s in split_statements(script) if s.strip(" \n;")]
+    assert len(statements) == 2
+    assert statements[1].startswith("CREATE TRIGGER") and statements[1].endswith("END;")
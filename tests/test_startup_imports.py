@@ -0,0 +1,27 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded after login by the warm-up thread, never before the login window
+HEAVY_MODULES = ("cv2", "numpy", "PIL", "dlib", "face_recognition")
+
+def imported_modules(statement):
+    """Modules imported by a statement in a fresh interpreter, from -X importtime"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    modules = set()
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if line.startswith("import time:") and "|" in line:
+            modules.add(line.rsplit("|", 1)[1].strip())
+    return modules
+
+def test_app_import_does_not_load_the_vision_stack():
+    modules = imported_modules("import attendance_system.app")
+    assert "attendance_system.app" in modules
+    heavy = sorted(m for m in modules if m.split(".")[0] in HEAVY_MODULES)
+    assert heavy == []
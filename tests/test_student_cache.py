@@ -0,0 +1,53 @@
+from attendance_system.database.student_cache import StudentCache
+
+def record(student_id, user_id=None, name="Student"):
+    return (student_id, user_id, name, f"R{student_id}", "CS")
+
+def test_lookup_by_id_and_login():
+    cache = StudentCache()
+    cache.put(record(1, user_id=10))
+    assert cache.get(1) == record(1, user_id=10)
+    assert cache.get_by_user_id(10) == record(1, user_id=10)
+    assert cache.get(2) is None and cache.get_by_user_id(20) is None
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 2
+
+def test_least_recently_used_is_evicted():
+    cache = StudentCache(maxsize=2)
+    cache.put(record(1, user_id=10))
+    cache.put(record(2, user_id=20))
+    cache.get(1)
+    cache.put(record(3, user_id=30))
+    assert cache.get(2) is None and cache.get_by_user_id(20) is None
+    assert cache.get(1) is not None and cache.get(3) is not None
+    assert cache.stats()["evictions"] == 1 and cache.stats()["size"] == 2
+
+def test_replaced_record_drops_its_old_login():
+    cache = StudentCache()
+    cache.put(record(1, user_id=10))
+    cache.put(record(1, user_id=11, name="Renamed"))
+    assert cache.get_by_user_id(10) is None
+    assert cache.get_by_user_id(11)[2] == "Renamed"
+
+    cache.invalidate(1)
+    assert cache.get(1) is None and cache.get_by_user_id(11) is None
+
+def test_database_reads_through_the_cache(db):
+    user_id = db.add_user("ann", "password", "student")
+    student_id = db.add_student(user_id, "Ann", "R1", "CS")
+    assert db.get_student_by_id(student_id) == (student_id, user_id, "Ann", "R1", "CS")
+    assert db.student_cache.get(student_id) is not None
+
+    # A change made outside DatabaseManager is seen once invalidated
+    with db.connections.transaction() as cursor:
+        cursor.execute("UPDATE students SET name = 'Anne' WHERE student_id = ?", (student_id,))
+    assert db.get_student_by_user_id(user_id)[2] == "Ann"
+    db.invalidate_student(student_id)
+    assert db.get_student_by_user_id(user_id)[2] == "Anne"
+
+def test_warm_loads_every_student(db):
+    for i in range(3):
+        user_id = db.add_user(f"user{i}", "password", "student")
+        db.add_student(user_id, f"Student {i}", f"R{i}", "CS")
+    db.student_cache.clear()
+    assert db.warm_student_cache() == 3
+    assert db.student_cache.stats()["size"] == 3